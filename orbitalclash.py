@@ -12,6 +12,31 @@ import random
 import math
 import sys
 import os
+import struct
+import zlib
+import pickle
+import io
+import mmap
+import bisect
+import argparse
+import time
+import logging
+import json
+import copy
+import operator
+import gc
+import heapq
+import atexit
+import queue
+import tracemalloc
+import socket
+import threading
+from collections import ChainMap, deque, namedtuple
+from typing import NamedTuple
+try:
+    import numpy as np
+except ImportError:  # only the particle effects need it
+    np = None
 
 # === CONFIG ===
 WIDTH, HEIGHT = 600, 600
@@ -60,31 +85,51 @@ WEAPON_CONFIG = {
     "missile": {"windup": 1.0, "cooldown": 3.0, "capacity": 3, "explosion_radius": 150, "damage": 100},
 }
 
-# Asteroid tiers (5)
+# Asteroid tiers (5); weight = spawn weight before the level shift (+1 tier every 10 levels)
 ASTEROID_TIERS = [
-    {"name": "Tiny", "radius": 12, "hp": 2, "speed": (6, 9), "color": (220, 220, 220)},
-    {"name": "Small", "radius": 20, "hp": 5, "speed": (4, 7), "color": (180, 180, 180)},
-    {"name": "Medium", "radius": 32, "hp": 12, "speed": (2, 5), "color": (120, 120, 120)},
-    {"name": "Large", "radius": 48, "hp": 28, "speed": (1, 3), "color": (100, 100, 100)},
-    {"name": "Titan", "radius": 64, "hp": 60, "speed": (1, 2), "color": (80, 80, 80)},
+    {"name": "Tiny", "radius": 12, "hp": 2, "speed": (6, 9), "color": (220, 220, 220), "weight": 6},
+    {"name": "Small", "radius": 20, "hp": 5, "speed": (4, 7), "color": (180, 180, 180), "weight": 5},
+    {"name": "Medium", "radius": 32, "hp": 12, "speed": (2, 5), "color": (120, 120, 120), "weight": 3},
+    {"name": "Large", "radius": 48, "hp": 28, "speed": (1, 3), "color": (100, 100, 100), "weight": 2},
+    {"name": "Titan", "radius": 64, "hp": 60, "speed": (1, 2), "color": (80, 80, 80), "weight": 1},
 ]
 
-# Alien types (4)
+# Alien types (4); spawn weight grows by 1 every weight_every levels (Tank & Dart ramp fastest)
+# behaviour (see ALIEN_BEHAVIOURS) steers them sideways at up to lateral px/frame:
+#   "formation" = every alien of the type holds a slot in one line centred on the player,
+#   "strafe" = sweeps across the player and turns back reach px past them, "chase" = closes on the
+#   player's column, "evade" = slides out of it when within reach px, "fall" = straight down
 ALIEN_TYPES = [
-    {"name": "Normal", "color": (255, 80, 80), "hp": 8, "speed": 3, "fire_rate": 1.8, "damage": 0.5},
-    {"name": "Rapid", "color": (255, 180, 80), "hp": 5, "speed": 4, "fire_rate": 0.8, "damage": 0.5},
-    {"name": "Tank", "color": (120, 255, 120), "hp": 20, "speed": 2, "fire_rate": 2.6, "damage": 1.0},
-    {"name": "Dart", "color": (80, 180, 255), "hp": 6, "speed": 7, "fire_rate": 1.5, "damage": 0.5},
+    {"name": "Normal", "color": (255, 80, 80), "hp": 8, "speed": 3, "fire_rate": 1.8, "damage": 0.5, "weight": 3, "weight_every": 0, "pattern": "aimed_fan",
+     "behaviour": "formation", "lateral": 2.0, "reach": 0},
+    {"name": "Rapid", "color": (255, 180, 80), "hp": 5, "speed": 4, "fire_rate": 0.8, "damage": 0.5, "weight": 2, "weight_every": 12, "pattern": "spiral",
+     "behaviour": "strafe", "lateral": 3.0, "reach": 120},
+    {"name": "Tank", "color": (120, 255, 120), "hp": 20, "speed": 2, "fire_rate": 2.6, "damage": 1.0, "weight": 4, "weight_every": 10, "pattern": "ring",
+     "behaviour": "chase", "lateral": 1.2, "reach": 0},
+    {"name": "Dart", "color": (80, 180, 255), "hp": 6, "speed": 7, "fire_rate": 1.5, "damage": 0.5, "weight": 5, "weight_every": 8, "pattern": "wave",
+     "behaviour": "evade", "lateral": 4.0, "reach": 80},
 ]
 
-# Powerups
+# Bullet patterns, fired by each alien type's "pattern" in the bullet-hell tier (--difficulty hell).
+# kind: "radial" = count bullets evenly round the circle, turned spin deg/s over time (a spiral when
+#       count is small and interval short); "fan" = count bullets spread degrees wide, aimed at the
+#       nearest player; "wave" = a downward fan whose bullets sway sideways by amp px/frame at freq Hz.
+# speed is px/frame, interval is seconds between volleys (stress fire_rate divides it).
+BULLET_PATTERNS = {
+    "aimed_fan": {"kind": "fan", "count": 5, "spread": 40, "speed": 5, "interval": 0.9},
+    "spiral": {"kind": "radial", "count": 4, "spin": 160, "speed": 4, "interval": 0.12},
+    "ring": {"kind": "radial", "count": 24, "spin": 7, "speed": 3.5, "interval": 1.4},
+    "wave": {"kind": "wave", "count": 9, "spread": 120, "speed": 4, "amp": 2.5, "freq": 1.5, "interval": 0.6},
+}
+
+# Powerups; weight = chance in a random drop, special_weight = chance in a guaranteed special drop
 POWERUP_TYPES = [
-    {"type": "shield", "color": (0, 200, 255)},
-    {"type": "firerate", "color": (255, 200, 0)},
-    {"type": "heal", "color": (0, 255, 0)},
-    {"type": "heal1.5", "color": (255, 120, 200)},
-    {"type": "fuel", "color": (255, 255, 120)},
-    {"type": "missile", "color": (255, 120, 0)},
+    {"type": "shield", "color": (0, 200, 255), "weight": 2, "special_weight": 0},
+    {"type": "firerate", "color": (255, 200, 0), "weight": 2, "special_weight": 0},
+    {"type": "heal", "color": (0, 255, 0), "weight": 4, "special_weight": 5},
+    {"type": "heal1.5", "color": (255, 120, 200), "weight": 3, "special_weight": 3},
+    {"type": "fuel", "color": (255, 255, 120), "weight": 3, "special_weight": 0},
+    {"type": "missile", "color": (255, 120, 0), "weight": 2, "special_weight": 2},
 ]
 
 # Planets keys (images)
@@ -92,7 +137,9 @@ PLANET_KEYS = ["rocky", "blue", "green"]
 PLANET_COLORS = [(180, 180, 255), (255, 220, 120), (120, 255, 180), (255, 120, 180), (200, 200, 200)]
 
 # Spawn tuning
+LEVEL_SECONDS = 20  # level goes up every LEVEL_SECONDS of play
 CHUNK_HEIGHT = 180
+ACTIVATION_MARGIN = 24  # px above the top edge where a dormant entity's leading edge wakes it
 STAR_COUNT = 90
 PLANET_CHANCE = 0.06
 
@@ -100,12 +147,130 @@ CHUNK_ASTEROID_BASE = 2
 CHUNK_ASTEROID_VARIANCE = 3
 # increase overall alien chance and increase Tank & Dart presence
 ALIEN_BASE_CHANCE = 0.192
+ALIEN_WAVE_EVERY = 6  # every this many levels an alien spawn brings one more wingman...
+ALIEN_WAVE_MAX = 5    # ... up to this many aliens per wave
+# Alien steering (needs numpy; without it aliens fall straight and Darts hop). Lateral speeds and pushes
+# are scaled by min(1, SWARM_SMARTS_BASE + SWARM_SMARTS_PER_LEVEL * level): later levels steer harder
+SWARM_SMARTS_BASE = 0.4
+SWARM_SMARTS_PER_LEVEL = 0.06
+SWARM_ACCEL = 0.25      # px/frame an alien's sideways speed may change by per frame
+SWARM_SPACING = 70      # px between neighbouring slots of a formation
+SWARM_AVOID_GAP = 24    # px of clearance aliens try to keep from asteroids and from each other
+SWARM_AVOID_PUSH = 4.0  # px/frame sideways push at contact, fading to nothing at the gap
+FIRERATE_BOOST = 1.4     # the firerate powerup multiplies minigun and shotgun rps by this...
+FIRERATE_SECONDS = 10.0  # ... for this long; pickups stack, each with its own expiry
 POWERUP_FUEL_EVERY = 2
 POWERUP_SPECIAL_EVERY = 3
 RANDOM_POWERUP_BASE_CHANCE = 0.09
+# Difficulty tier (--difficulty): "normal", or "hell" where aliens fire BULLET_PATTERNS (needs numpy)
+DIFFICULTY = "normal"
+HELL_BULLET_CAP = 8192      # hard cap on pattern bullets; past it the oldest go first
+HELL_BULLET_RADIUS = 3
+HELL_BENCH = (1000, 3000, 6000)  # live pattern bullets for --bench-hell
+ALIEN_BENCH = (100, 300, 1000)   # live aliens for --bench-aliens
+# Stress multipliers (--stress); 1.0 everywhere is normal play
+STRESS = {"asteroids": 1.0, "aliens": 1.0, "powerups": 1.0, "fire_rate": 1.0}
+STRESS_SWEEP = (100, 500, 2000, 10000)  # live entity counts for --sweep
+STRESS_SWEEP_FRAMES = 90
+# Golden frames (--golden): a pixel is off when a channel is more than GOLDEN_PIXEL_TOL outside what the
+# golden has around it; a frame fails when more than GOLDEN_MAX_OFF of its pixels are off
+GOLDEN_PIXEL_TOL = 24
+GOLDEN_MAX_OFF = 0.002
+GOLDEN_FRAMES = 120  # timed paints per scenario
+SPAWN_TABLE_LEVELS = 100  # spawn tables compiled up front for levels 1..100, later ones on demand
+TUNING_POLL = 1.0  # seconds between --tuning file checks
+
+# Input bits (one byte per simulated frame; also the replay frame format)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+INPUT_SHOOT = 16
+INPUT_SWITCH_SHIFT = 5  # top 3 bits: 0 none, 1-4 weapon slot, 5 prev, 6 next
+SWITCH_PREV, SWITCH_NEXT = 5, 6
+
+# Replays
+REPLAY_MAGIC = b"OCRP"
+REPLAY_VERSION = 11  # bump when simulation results or pickled entity layouts change
+REPLAY_KEYFRAME_EVERY = 30 * FPS  # frames between full Game snapshots
+REPLAY_MAX_SPEED = 64
+
+# Capture (--capture PATH): frames go through shared memory to encoder processes
+CAPTURE_BUFFERS = 8   # frames in flight; when every buffer is still being encoded, live capture skips the frame
+CAPTURE_WORKERS = 2   # encoder processes
+
+# Co-op networking (authoritative server, UDP)
+NET_PORT = 47800
+NET_DT = 1.0 / FPS          # server tick
+NET_SNAPSHOT_EVERY = 3      # ticks per snapshot (15 Hz); clients interpolate in between
+NET_HISTORY = 64            # snapshots kept as delta baselines
+NET_INPUT_REDUNDANCY = 4    # every input packet repeats the last few inputs against packet loss
+NET_INPUT_BACKLOG = 8       # server drops a client's oldest inputs past this, bounding its latency
+NET_TIMEOUT = 5.0           # seconds of silence before a client's ship leaves the game
+NET_MAX_PLAYERS = 4
+
+# Frame pacing (--late-input) and latency reporting (--latency)
+LATE_INPUT_MARGIN = 0.002   # seconds of slack left between the predicted end of update+draw and the frame deadline
+LATE_INPUT_SPIN = 0.001     # the last bit of the wait is spun; time.sleep overshoots by about this much
+LATENCY_REPORT_EVERY = 5.0  # seconds between latency log lines
+
+# Time warp ([ and ] in game, \ for 1x, --time-scale): simulation speed relative to the wall clock
+TIME_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+TIME_STEP_MS = math.ceil(1000 / FPS)  # longest single simulation step; longer frames are cut into several
+TIME_WARP_MIN_FPS = 30                # fast-forward adds steps only while drawing keeps at least this rate
+TIME_WARP_MAX_STEPS = 64              # per frame at any speed; time past that is dropped, not owed
+
+# Garbage collection (--gc-auto keeps CPython's own triggers, --gc-stats logs pauses)
+GC_SLACK_MARGIN = 0.002  # seconds of a frame's slack left unused by collections run in it
+GC_YOUNG_AT = 700        # net allocations before a young collection is wanted (CPython's own threshold)
+GC_YOUNG_FORCE = 20000   # ... before one runs even without slack, so a frame with none can't grow the heap forever
+GC_MIDDLE_AT = 10        # young collections before the middle generation is wanted (CPython's threshold)
+GC_STATS_EVERY = 10.0    # seconds between --gc-stats log lines
+
+# Telemetry (--telemetry PATH): JSON lines, one per event, written off the game thread
+TELEMETRY_RING = 8192    # events buffered between flushes; past that they are dropped and counted
+TELEMETRY_FLUSH = 0.5    # seconds between writer-thread flushes
+TELEMETRY_FIELDS = {     # event kind -> names of the values emitted with it (after the game time)
+    "run": ("difficulty", "players"),
+    "chunk": ("index", "asteroids", "aliens", "powerups"),
+    "kill": ("target", "type", "weapon"),
+    "damage": ("amount", "cause", "hearts"),
+    "powerup": ("type",),
+    "switch": ("weapon",),
+    "level": ("level",),
+    "frames": ("ms",),   # one second of frame times; the writer turns them into a summary
+    "over": ("score", "cause", "level"),
+}
+
+# Display (--window WxH, --fullscreen): the game keeps drawing at WIDTH x HEIGHT and is scaled once per present
+PRESENT_SMOOTH_BUDGET = 0.2  # smooth (bilinear) scaling when it costs under this share of FRAME_BUDGET, else nearest pixel
+
+# Particles (numpy; without it the game simply has none)
+PARTICLE_CAP = 32768        # hard cap on live particles; past it the oldest are dropped first
+PARTICLE_DRAG = 0.96        # fraction of velocity kept per frame
+PARTICLE_TRAIL_RATE = 120   # engine particles per second at full speed
+PARTICLE_BENCH = (5000, 20000, 32768)
+
+# Quality governor: frame-time budget and the order in which effects are dropped under load
+FRAME_BUDGET = 1.0 / FPS
+QUALITY_DOWN_AT = 0.90   # smoothed update+draw time above this fraction of the budget -> step down
+QUALITY_UP_AT = 0.55     # ... below this fraction -> step back up
+QUALITY_DOWN_HOLD = 10   # frames over budget before stepping down
+QUALITY_UP_HOLD = 3 * FPS  # frames of headroom before stepping up (slower, so it doesn't flap)
+QUALITY_STEPS = [
+    ("particles", 0.3),
+    ("health_bars", False),
+    ("planets", False),
+    ("star_density", 0.4),
+    ("beam_glow", False),
+    ("hud_controls", False),
+]
+
+log = logging.getLogger("orbitalclash")
 
 # Globals (runtime)
-screen = None
+screen = None     # what everything draws into: always WIDTH x HEIGHT, the window itself when it is that size
+presenter = None  # a Presenter when the window is some other size
 clock = None
 font = None
 big_font = None
@@ -122,6 +287,8 @@ ASSETS = {
     "bg": None,
     "powerups": {},  # powerup type -> image
 }
+# Current render quality; the governor rewrites it, draw code only reads it
+QUALITY = {"particles": 1.0, "health_bars": True, "planets": True, "star_density": 1.0, "beam_glow": True, "hud_controls": True}
 ALIEN_IMAGES = {}     # name -> surface
 ASTEROID_IMAGES = {}  # tier name -> surface
 
@@ -136,6 +303,14 @@ ASTEROID_IMAGES = {}  # tier name -> surface
 # space.jpg
 # power_fuel.png, power_heal.png, power_missile.png, power_shield.png, power_firerate.png
 
+# Looked up next to this file whatever the working directory: assets/ first, then Build/, where the
+# repo keeps its art. The first directory holding a file wins.
+HERE = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIRS = (os.path.join(HERE, "assets"), os.path.join(HERE, "Build"))
+
+def asset_path(name):
+    return next((p for p in (os.path.join(d, name) for d in ASSET_DIRS) if os.path.isfile(p)), None)
+
 def safe_load(path, size=None):
     if not path:
         return None
@@ -149,46 +324,95 @@ def safe_load(path, size=None):
     except Exception:
         return None
 
-def load_assets():
-    # background
-    ASSETS["bg"] = safe_load("assets/space.jpg", (WIDTH, HEIGHT))
-    # ship
-    ASSETS["ship"] = safe_load("assets/spaceship.png", (PLAYER_SHIP_W, PLAYER_SHIP_H))
-    # planets
-    ASSETS["planets"]["rocky"] = safe_load("assets/planet_1.png")
-    ASSETS["planets"]["blue"] = safe_load("assets/planet_2.png")
-    ASSETS["planets"]["green"] = safe_load("assets/planet_3.png")
-    # hearts
-    ASSETS["heart"] = safe_load("assets/heart.png", (26, 26))
-    ASSETS["half_heart"] = safe_load("assets/half_heart.png", (26, 26))
-    # missile & shield icon
-    ASSETS["missile"] = safe_load("assets/missile.png", (16, 32))
-    ASSETS["shield"] = safe_load("assets/shield.png", (28, 28))
-    # powerups images (optional)
-    ASSETS["powerups"]["fuel"] = safe_load("assets/power_fuel.png", (64, 64))
-    ASSETS["powerups"]["heal"] = safe_load("assets/heart.png", (64, 64))
-    ASSETS["powerups"]["missile"] = safe_load("assets/missile.png", (64, 64))
-    ASSETS["powerups"]["shield"] = safe_load("assets/power_shield.png", (64, 64))
-    ASSETS["powerups"]["firerate"] = safe_load("assets/power_firerate.png", (86, 86))
-
-    # Aliens (per type)
-    ALIEN_IMAGES["Normal"] = safe_load("assets/alien_normal.png", (44, 28)) or safe_load("assets/alien_small.png", (44, 28))
-    ALIEN_IMAGES["Rapid"] = safe_load("assets/alien_rapid.png", (64, 48))
-    ALIEN_IMAGES["Tank"] = safe_load("assets/alien_tank.png", (96, 96))
-    ALIEN_IMAGES["Dart"] = safe_load("assets/alien_dart.png", (56, 40))
-
-    # Asteroids
-    ASTEROID_IMAGES["Tiny"] = safe_load("assets/as_1.png")
-    ASTEROID_IMAGES["Small"] = safe_load("assets/as_2.png")
-    ASTEROID_IMAGES["Medium"] = safe_load("assets/as_3.png")
-    ASTEROID_IMAGES["Large"] = safe_load("assets/as_4.png")
-    ASTEROID_IMAGES["Titan"] = safe_load("assets/as_5.png")  # you said you'll add later — code tolerates missing
+def asset_table():
+    """(dict, key, names, size) for every image, main_menu's background first. The first name that
+    loads wins, so a fallback file can follow the preferred one."""
+    P = ASSETS["powerups"]; PL = ASSETS["planets"]
+    return [
+        (ASSETS, "bg", ("space.jpg",), (WIDTH, HEIGHT)),
+        (ASSETS, "ship", ("spaceship.png",), (PLAYER_SHIP_W, PLAYER_SHIP_H)),
+        (PL, "rocky", ("planet_1.png",), None),
+        (PL, "blue", ("planet_2.png",), None),
+        (PL, "green", ("planet_3.png",), None),
+        (ASSETS, "heart", ("heart.png",), (26, 26)),
+        (ASSETS, "half_heart", ("half_heart.png",), (26, 26)),
+        (ASSETS, "missile", ("missile.png",), (16, 32)),
+        (ASSETS, "shield", ("shield.png",), (28, 28)),
+        (P, "fuel", ("power_fuel.png",), (64, 64)),
+        (P, "heal", ("heart.png",), (64, 64)),
+        (P, "missile", ("missile.png",), (64, 64)),
+        (P, "shield", ("power_shield.png",), (64, 64)),
+        (P, "firerate", ("power_firerate.png",), (86, 86)),
+        (ALIEN_IMAGES, "Normal", ("alien_normal.png", "alien_small.png"), (44, 28)),
+        (ALIEN_IMAGES, "Rapid", ("alien_rapid.png",), (64, 48)),
+        (ALIEN_IMAGES, "Tank", ("alien_tank.png",), (96, 96)),
+        (ALIEN_IMAGES, "Dart", ("alien_dart.png",), (56, 40)),
+        (ASTEROID_IMAGES, "Tiny", ("as_1.png",), None),
+        (ASTEROID_IMAGES, "Small", ("as_2.png",), None),
+        (ASTEROID_IMAGES, "Medium", ("as_3.png",), None),
+        (ASTEROID_IMAGES, "Large", ("as_4.png",), None),
+        (ASTEROID_IMAGES, "Titan", ("as_5.png",), None),  # you said you'll add later — code tolerates missing
+    ]
+
+PENDING_ASSETS = deque()  # asset_table() rows not loaded yet
+
+def load_assets(defer=False):
+    """Load every image, or with defer only what main_menu draws; the menu then calls
+    load_pending_assets(1) once a frame and main() finishes the rest before a game starts."""
+    PENDING_ASSETS.clear(); PENDING_ASSETS.extend(asset_table())
+    load_pending_assets(1 if defer else None)
+
+def load_pending_assets(n=None):
+    while PENDING_ASSETS and n != 0:
+        where, key, names, size = PENDING_ASSETS.popleft()
+        where[key] = next((img for img in (safe_load(asset_path(name), size) for name in names) if img), None)
+        if n: n -= 1
+
+# ---------- Fonts ----------
+FONT_NAME = "consolas"
+# font name -> file ("" = pygame's default font); spares warm starts the system font scan. Kept next to
+# this file, not in the working directory, so it is found whichever directory the game starts from
+FONT_CACHE = os.path.join(HERE, "fontcache.json")
+FONTS = {}        # size -> Font
+FONT_FILE = None  # resolved on first use
+
+def font_file():
+    global FONT_FILE
+    if FONT_FILE is None:
+        try:
+            with open(FONT_CACHE) as f:
+                cached = json.load(f).get(FONT_NAME)
+        except (OSError, ValueError, AttributeError):
+            cached = None
+        if isinstance(cached, str) and (cached == "" or os.path.exists(cached)):
+            FONT_FILE = cached
+        else:
+            FONT_FILE = pygame.font.match_font(FONT_NAME) or ""
+            try:
+                with open(FONT_CACHE, "w") as f:
+                    json.dump({FONT_NAME: FONT_FILE}, f)
+            except OSError:
+                pass
+    return FONT_FILE
+
+def font_for(size):
+    """What SysFont(FONT_NAME, size) returns, resolved once per process and built once per size."""
+    f = FONTS.get(size)
+    if f is None:
+        f = FONTS[size] = pygame.font.Font(font_file() or None, size)
+    return f
 
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
+def stress_count(n, mult):
+    """n scaled by a stress multiplier; the fraction is rolled so the average comes out right."""
+    if mult == 1.0: return n
+    scaled = n * mult
+    return int(scaled) + (random.random() < scaled - int(scaled))
+
 def draw_text(surf, text, size, x, y, color=WHITE, center=True, font_obj=None, alpha=None):
-    f = font_obj or pygame.font.SysFont("consolas", size)
+    f = font_obj or font_for(size)
     ts = f.render(text, True, color)
     if alpha is not None:
         ts.set_alpha(alpha)
@@ -199,6 +423,243 @@ def draw_text(surf, text, size, x, y, color=WHITE, center=True, font_obj=None, a
         rect.topleft = (x, y)
     surf.blit(ts, rect)
 
+# ---------- Compiled config ----------
+# The dict tables above are the authoring format. compile_config() turns them into immutable
+# records and per-level cumulative weight tables, which is what the game reads at runtime.
+class AsteroidTier(NamedTuple):
+    index: int
+    name: str
+    radius: int
+    hp: float
+    speed: tuple
+    color: tuple
+
+class BulletPattern(NamedTuple):
+    name: str
+    kind: str
+    count: int
+    spread: float  # radians
+    spin: float    # radians per second
+    speed: float
+    amp: float
+    freq: float
+    interval: float
+
+class AlienType(NamedTuple):
+    index: int
+    name: str
+    color: tuple
+    hp: float
+    speed: float
+    fire_rate: float
+    damage: float
+    pattern: BulletPattern
+    behaviour: str
+    lateral: float  # px/frame
+    reach: float    # px
+
+class PowerUpType(NamedTuple):
+    type: str
+    color: tuple
+
+class SpawnTable(NamedTuple):
+    extra_asteroids: int
+    asteroid_cum: tuple  # over final tiers, level shift already applied
+    alien_chance: float
+    alien_cum: tuple
+    powerup_chance: float
+
+TIERS = ()
+PATTERNS = {}
+ALIENS = ()
+POWERUPS = {}
+POWERUP_IDS = ()
+POWERUP_CUM = ()
+SPECIAL_IDS = ()
+SPECIAL_CUM = ()
+SPAWN_TABLES = {}
+
+def cumulative(weights):
+    out, total = [], 0
+    for w in weights:
+        total += w
+        out.append(total)
+    return tuple(out)
+
+def build_spawn_table(level, cfg=None, tiers=None):
+    """cfg/tiers: the config tables and compiled tiers to build from (compile_config), else the globals."""
+    c = globals() if cfg is None else cfg
+    tiers = TIERS if tiers is None else tiers
+    shift = level // 10
+    tier_weights = [0] * len(tiers)
+    for i, t in enumerate(c["ASTEROID_TIERS"]):
+        tier_weights[min(len(tiers) - 1, i + shift)] += t["weight"]
+    alien_weights = [t["weight"] + (level // t["weight_every"] if t["weight_every"] else 0) for t in c["ALIEN_TYPES"]]
+    return SpawnTable(level // 10, cumulative(tier_weights), c["ALIEN_BASE_CHANCE"] + 0.005 * level,
+                      cumulative(alien_weights), c["RANDOM_POWERUP_BASE_CHANCE"] + 0.002 * level)
+
+def spawn_table(level):
+    table = SPAWN_TABLES.get(level)
+    if table is None:
+        table = SPAWN_TABLES[level] = build_spawn_table(level)
+    return table
+
+def compile_pattern(name, p):
+    return BulletPattern(name, p["kind"], int(p["count"]), math.radians(p.get("spread", 0)), math.radians(p.get("spin", 0)),
+                         float(p["speed"]), float(p.get("amp", 0)), float(p.get("freq", 0)), float(p["interval"]))
+
+def compile_config(staged=None):
+    """Compile the config tables, with staged ({NAME: value}) standing in for those globals. Everything
+    is built before anything is assigned, so a table that fails to compile leaves the old config running."""
+    global TIERS, PATTERNS, ALIENS, POWERUPS, POWERUP_IDS, POWERUP_CUM, SPECIAL_IDS, SPECIAL_CUM
+    c = ChainMap(staged or {}, globals())
+    tiers = tuple(AsteroidTier(i, t["name"], t["radius"], float(t["hp"]), tuple(t["speed"]), tuple(t["color"]))
+                  for i, t in enumerate(c["ASTEROID_TIERS"]))
+    patterns = {name: compile_pattern(name, p) for name, p in c["BULLET_PATTERNS"].items()}
+    aliens = tuple(AlienType(i, t["name"], tuple(t["color"]), float(t["hp"]), float(t["speed"]), float(t["fire_rate"]), float(t["damage"]),
+                             patterns[t["pattern"]], t["behaviour"], float(t["lateral"]), float(t["reach"]))
+                   for i, t in enumerate(c["ALIEN_TYPES"]))
+    powerup_types = c["POWERUP_TYPES"]
+    powerups = {p["type"]: PowerUpType(p["type"], tuple(p["color"])) for p in powerup_types}
+    specials = [p for p in powerup_types if p["special_weight"] > 0]
+    tables = {level: build_spawn_table(level, c, tiers) for level in range(1, SPAWN_TABLE_LEVELS + 1)}
+    globals().update(staged or {})
+    TIERS, PATTERNS, ALIENS, POWERUPS = tiers, patterns, aliens, powerups
+    POWERUP_IDS = tuple(p["type"] for p in powerup_types)
+    POWERUP_CUM = cumulative(p["weight"] for p in powerup_types)
+    SPECIAL_IDS = tuple(p["type"] for p in specials)
+    SPECIAL_CUM = cumulative(p["special_weight"] for p in specials)
+    SPAWN_TABLES.clear()
+    SPAWN_TABLES.update(tables)
+
+compile_config()
+
+# ---------- Tuning (hot reload) ----------
+# What a tuning file may override: the config tables and the balance numbers beside them. Layout,
+# timing, replay and network constants are already baked in elsewhere, so they are not on the list.
+TUNING_DEFAULTS = {name: copy.deepcopy(globals()[name]) for name in (  # name -> pristine default
+    "PLAYER_START_HEARTS", "PLAYER_MAX_HEARTS", "PLAYER_START_FUEL", "PLAYER_MAX_FUEL", "PLAYER_ACCEL",
+    "PLAYER_MAX_SPEED", "PLAYER_BASE_SPEED", "PLAYER_FUEL_DRAIN", "PLAYER_FUEL_DRAIN_BOOST", "PLAYER_INVINCIBLE_TIME",
+    "WEAPON_CONFIG", "ASTEROID_TIERS", "ALIEN_TYPES", "BULLET_PATTERNS", "POWERUP_TYPES",
+    "LEVEL_SECONDS", "PLANET_CHANCE", "CHUNK_ASTEROID_BASE", "CHUNK_ASTEROID_VARIANCE",
+    "ALIEN_BASE_CHANCE", "ALIEN_WAVE_EVERY", "ALIEN_WAVE_MAX", "SWARM_SMARTS_BASE", "SWARM_SMARTS_PER_LEVEL",
+    "SWARM_ACCEL", "SWARM_SPACING", "SWARM_AVOID_GAP", "SWARM_AVOID_PUSH", "FIRERATE_BOOST", "FIRERATE_SECONDS",
+    "POWERUP_FUEL_EVERY", "POWERUP_SPECIAL_EVERY", "RANDOM_POWERUP_BASE_CHANCE")}
+
+def merge_tuning(current, value):
+    """Dicts merge key by key; lists of named entries (tiers, aliens, powerups) merge by name/type.
+    Anything else replaces the default, which it has to match in kind (number, string, sequence...)."""
+    if isinstance(current, dict) and isinstance(value, dict):
+        out = dict(current)
+        for k, v in value.items():
+            out[k] = merge_tuning(current.get(k), v)
+        return out
+    if isinstance(current, list) and isinstance(value, dict) and current and isinstance(current[0], dict):
+        key = "name" if "name" in current[0] else "type"
+        unknown = set(value) - {e[key] for e in current}
+        if unknown: raise ValueError(f"unknown entries {sorted(unknown)}")
+        return [merge_tuning(e, value.get(e[key], {})) for e in current]
+    if current is not None and tuning_kind(value) != tuning_kind(current):
+        raise ValueError(f"{value!r} where the default is {current!r}")
+    return value
+
+def tuning_kind(v):
+    if isinstance(v, bool): return bool
+    if isinstance(v, (int, float)): return float
+    if isinstance(v, (list, tuple)): return list  # JSON has no tuples
+    return type(v)
+
+def apply_tuning(overrides):
+    """Set config globals from a {NAME: value} mapping (values relative to the defaults) and recompile.
+    Only TUNING_DEFAULTS names are accepted. The merged values are staged and compiled first; on any
+    error no global has changed."""
+    for name in overrides:
+        if name not in TUNING_DEFAULTS:
+            raise ValueError(f"unknown tuning key {name!r}")
+    staged = {name: copy.deepcopy(default) for name, default in TUNING_DEFAULTS.items()}
+    for name, value in overrides.items():
+        staged[name] = merge_tuning(staged[name], value)
+    compile_config(staged)
+
+class TuningWatcher:
+    """Re-applies a JSON tuning file whenever it changes. Bad files are logged and ignored."""
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.timer = 0.0
+        self.poll()
+
+    def update(self, dt):
+        self.timer += dt
+        if self.timer >= TUNING_POLL:
+            self.timer = 0.0
+            self.poll()
+
+    def poll(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self.mtime: return
+            self.mtime = mtime
+            with open(self.path) as f:
+                apply_tuning(json.load(f))
+            log.info("tuning loaded from %s", self.path)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            log.warning("tuning %s not applied: %s", self.path, e)
+
+# ---------- Display ----------
+class Presenter:
+    """Scales the logical WIDTH x HEIGHT frame into the window in one call per present, letterboxed to keep
+    its aspect, and maps window mouse positions back to logical ones. Simulation, sprites and HUD never see
+    the window size, and no sprite is ever rescaled. The filter is picked by timing both at the real size."""
+    def __init__(self, frame):
+        self.frame = frame
+        self.resize(pygame.display.get_surface().get_size())
+
+    def resize(self, size):
+        self.scale = min(size[0] / WIDTH, size[1] / HEIGHT)
+        self.dest = pygame.Rect(0, 0, round(WIDTH * self.scale), round(HEIGHT * self.scale))
+        self.dest.center = (size[0] // 2, size[1] // 2)
+        window = pygame.display.get_surface()
+        window.fill(BLACK)  # the letterbox bars
+        self.target = window.subsurface(self.dest)
+        smooth = min(self.timed(pygame.transform.smoothscale) for _ in range(3))
+        self.smooth = smooth < FRAME_BUDGET * PRESENT_SMOOTH_BUDGET
+        log.info("presenting %dx%d in %dx%d, %s scaling (smooth %.2f ms)", WIDTH, HEIGHT, *size,
+                 "smooth" if self.smooth else "nearest", smooth * 1000)
+
+    def timed(self, scale):
+        t = time.perf_counter()
+        scale(self.frame, self.dest.size, self.target)
+        return time.perf_counter() - t
+
+    def present(self):
+        (pygame.transform.smoothscale if self.smooth else pygame.transform.scale)(self.frame, self.dest.size, self.target)
+        pygame.display.flip()
+
+    def to_logical(self, pos):
+        return (int((pos[0] - self.dest.x) / self.scale), int((pos[1] - self.dest.y) / self.scale))
+
+def present():
+    if presenter: presenter.present()
+    else: pygame.display.flip()
+
+def get_events():
+    """pygame.event.get() with mouse positions in logical coordinates."""
+    events = pygame.event.get()
+    if presenter:
+        for ev in events:
+            if ev.type == pygame.VIDEORESIZE: presenter.resize(ev.size)
+            elif hasattr(ev, "pos"): ev.pos = presenter.to_logical(ev.pos)
+    return events
+
+def mouse_pos():
+    pos = pygame.mouse.get_pos()
+    return presenter.to_logical(pos) if presenter else pos
+
+def ticks_ms():
+    """ticks_ms() without the timer subsystem, which setup_display doesn't init."""
+    return int(time.perf_counter() * 1000)
+
 # ---------- UI: Button ----------
 class Button:
     def __init__(self, text, x, y, w, h, font_obj=None, base=(200,200,200), hover=(255,255,255)):
@@ -209,7 +670,7 @@ class Button:
         self.hover = hover
 
     def draw(self, surf):
-        color = self.hover if self.rect.collidepoint(pygame.mouse.get_pos()) else self.base
+        color = self.hover if self.rect.collidepoint(mouse_pos()) else self.base
         pygame.draw.rect(surf, color, self.rect, border_radius=10)
         pygame.draw.rect(surf, (255,255,255), self.rect, 2, border_radius=10)
         ts = self.font.render(self.text, True, (0,0,0))
@@ -247,9 +708,10 @@ class ParallaxBackground:
 
     def draw(self, surf):
         # stars
-        for s in self.stars:
+        for s in self.stars[:int(len(self.stars) * QUALITY["star_density"])]:
             pygame.draw.circle(surf, (200,200,200), (int(s[0]), int(s[1])), 1)
         # planets
+        if not QUALITY["planets"]: return
         for x, y, r, color, spd, pkey in self.planets:
             img = ASSETS["planets"].get(pkey)
             if img:
@@ -259,17 +721,23 @@ class ParallaxBackground:
                 pygame.draw.circle(surf, color, (int(x), int(y)), int(r))
 
 # ---------- Projectiles ----------
+# Entities are slotted: no per-instance __dict__, and shared per-type data stays on the config
+# records (see TIERS / ALIENS / POWERUPS) instead of being copied into every instance.
 class Bullet:
+    __slots__ = ("x", "y", "px", "py", "speed", "vx", "damage", "type", "rect", "swept")
+
     def __init__(self, x, y, speed, angle, damage, wtype):
-        self.x = float(x); self.y = float(y)
-        self.speed = float(speed); self.angle = float(angle)
+        self.x = self.px = float(x); self.y = self.py = float(y)
+        self.speed = float(speed); self.vx = math.sin(math.radians(angle)) * 8
         self.damage = float(damage); self.type = wtype
         self.rect = pygame.Rect(int(self.x-3), int(self.y-12), 6, 16)
+        self.swept = self.rect.copy()
 
     def update(self, dt):
-        rad = math.radians(self.angle)
-        self.x += math.sin(rad) * 8 * dt * FPS
+        self.px, self.py = self.x, self.y
+        self.x += self.vx * dt * FPS
         self.y += self.speed * dt * FPS
+        self.swept = self.rect.union((int(self.x-3), int(self.y-12), 6, 16))
         self.rect.topleft = (int(self.x-3), int(self.y-12))
 
     def draw(self, surf):
@@ -278,18 +746,20 @@ class Bullet:
 
 class Beam:
     """Beam follows player's X while active so it continues to hit new enemies."""
-    def __init__(self, x, y, duration, dps, width, follow_player=True):
+    __slots__ = ("x", "y", "timer", "dps", "width", "owner")
+
+    def __init__(self, x, y, duration, dps, width, owner=None):
         self.x = float(x)
         self.y = float(y)
         self.timer = float(duration)
         self.dps = float(dps)
         self.width = int(width)
-        self.follow_player = follow_player
+        self.owner = owner
 
-    def update(self, dt, player_x=None):
+    def update(self, dt):
         self.timer -= dt
-        if self.follow_player and player_x is not None:
-            self.x = float(player_x)  # follow player's X
+        if self.owner is not None:
+            self.x = float(self.owner.x)  # follow the firing player's X
 
     def active(self):
         return self.timer > 0
@@ -297,18 +767,25 @@ class Beam:
     def draw(self, surf):
         if self.active():
             pygame.draw.rect(surf, RED, (int(self.x - self.width // 2), 0, self.width, int(self.y)), border_radius=8)
-            pygame.draw.rect(surf, (255,80,80), (int(self.x - self.width // 3), 0, int(self.width/1.5), int(self.y)), border_radius=6)
+            if QUALITY["beam_glow"]:
+                pygame.draw.rect(surf, (255,80,80), (int(self.x - self.width // 3), 0, int(self.width/1.5), int(self.y)), border_radius=6)
 
 class Missile:
+    __slots__ = ("x", "y", "px", "py", "damage", "radius", "exploded", "explode_timer", "rect", "swept")
+    speed = -7.0
+
     def __init__(self, x, y, damage, radius):
-        self.x = float(x); self.y = float(y)
+        self.x = self.px = float(x); self.y = self.py = float(y)
         self.damage = float(damage); self.radius = float(radius)
-        self.speed = -7.0; self.exploded = False; self.explode_timer = 0.0
+        self.exploded = False; self.explode_timer = 0.0
         self.rect = pygame.Rect(int(self.x-8), int(self.y-16), 16, 32)
+        self.swept = self.rect.copy()
 
     def update(self, dt):
+        self.px, self.py = self.x, self.y
         if not self.exploded:
             self.y += self.speed * dt * FPS
+            self.swept = self.rect.union((int(self.x-8), int(self.y-16), 16, 32))
             self.rect.topleft = (int(self.x-8), int(self.y-16))
         else:
             self.explode_timer += dt
@@ -324,14 +801,48 @@ class Missile:
         else:
             pygame.draw.circle(surf, (255,200,80), (int(self.x), int(self.y)), int(self.radius), 3)
 
+# ---------- Timers ----------
+class Timers:
+    """The game clock and a heap of callbacks due on it. Cooldowns are deadlines on `now`, compared when
+    something asks (`left`), so an idle weapon or alien costs nothing per step; anything that has to
+    happen when time runs out (a reload finishing, a buff wearing off) goes on the heap with `after` and
+    runs from `advance`. Callbacks are bound methods so a Game with timers pending still pickles."""
+    def __init__(self):
+        self.now = 0.0
+        self.heap = []
+        self.seq = 0  # tie-break: callbacks due at the same time run in the order they were scheduled
+
+    # A bound method pickles as getattr(owner, name), and getattr is no global a replay may name (see
+    # SnapshotUnpickler); keep (owner, name) instead and rebind only public methods of the owner's class.
+    def __getstate__(self):
+        return self.now, self.seq, [(t, seq, fn.__self__, fn.__name__, args) for t, seq, fn, args in self.heap]
+
+    def __setstate__(self, state):
+        self.now, self.seq, heap = state
+        for _, _, owner, name, _ in heap:
+            if name.startswith("_") or not callable(getattr(type(owner), name, None)):
+                raise pickle.UnpicklingError(f"timer callback {type(owner).__name__}.{name} not allowed")
+        self.heap = [(t, seq, getattr(owner, name), args) for t, seq, owner, name, args in heap]
+
+    def after(self, delay, fn, *args):
+        self.seq += 1
+        heapq.heappush(self.heap, (self.now + delay, self.seq, fn, args))
+
+    def advance(self, dt):
+        self.now += dt
+        heap = self.heap
+        while heap and heap[0][0] <= self.now:
+            _, _, fn, args = heapq.heappop(heap)
+            fn(*args)
+
+    def left(self, deadline):
+        return max(0.0, deadline - self.now)
+
 # ---------- Weapons ----------
 class Weapon:
     def __init__(self, player):
         self.player = player
-        self.cooldown = 0.0
-
-    def update(self, dt):
-        if self.cooldown > 0: self.cooldown -= dt
+        self.timers = player.game.timers
 
     def try_fire(self, bullets, beams, missiles, holding, dt):
         pass
@@ -345,43 +856,37 @@ class Minigun(Weapon):
         c = WEAPON_CONFIG["minigun"]
         self.magazine = c["magazine"]; self.rps = c["rps"]; self.damage = c["damage"]
         self.spread = c["spread"]; self.reload_time = c["reload_time"]
-        self.ammo = self.magazine; self.reload = 0.0; self.fire_timer = 0.0
+        self.ammo = self.magazine; self.reloading = False; self.ready_at = 0.0
 
-    def update(self, dt):
-        super().update(dt)
-        if self.reload > 0:
-            self.reload -= dt
-            if self.reload <= 0: self.ammo = self.magazine
-        if self.fire_timer > 0: self.fire_timer -= dt
+    def reloaded(self):
+        self.ammo = self.magazine; self.reloading = False
 
     def try_fire(self, bullets, beams, missiles, holding, dt):
-        if self.reload > 0: return
-        if holding and self.fire_timer <= 0 and self.ammo > 0:
+        if self.reloading: return
+        if holding and self.timers.now >= self.ready_at and self.ammo > 0:
             angle = random.uniform(-self.spread, self.spread)
             bullets.append(Bullet(self.player.x, self.player.y - PLAYER_SHIP_H // 2, -13, angle, self.damage, "minigun"))
-            self.ammo -= 1; self.fire_timer = 1.0 / self.rps
-            if self.ammo <= 0: self.reload = self.reload_time
+            self.ammo -= 1; self.ready_at = self.timers.now + 1.0 / (self.rps * self.player.rps_scale)
+            if self.ammo <= 0:
+                self.reloading = True
+                self.timers.after(self.reload_time, self.reloaded)
 
     def display_name(self): return "Minigun"
-    def status_string(self): return "Reloading..." if self.reload > 0 else f"Ammo: {self.ammo}/{self.magazine}"
+    def status_string(self): return "Reloading..." if self.reloading else f"Ammo: {self.ammo}/{self.magazine}"
 
 class Shotgun(Weapon):
     def __init__(self, player):
         super().__init__(player)
         c = WEAPON_CONFIG["shotgun"]
         self.rps = c["rps"]; self.pellets = c["pellets"]; self.damage = c["damage"]; self.spread_angle = c["spread_angle"]
-        self.fire_timer = 0.0
-
-    def update(self, dt):
-        super().update(dt)
-        if self.fire_timer > 0: self.fire_timer -= dt
+        self.ready_at = 0.0
 
     def try_fire(self, bullets, beams, missiles, holding, dt):
-        if holding and self.fire_timer <= 0:
+        if holding and self.timers.now >= self.ready_at:
             for i in range(self.pellets):
                 angle = (i - (self.pellets - 1) / 2) * self.spread_angle
                 bullets.append(Bullet(self.player.x, self.player.y - PLAYER_SHIP_H // 2, -11, angle, self.damage, "shotgun"))
-            self.fire_timer = 1.0 / self.rps
+            self.ready_at = self.timers.now + 1.0 / (self.rps * self.player.rps_scale)
 
     def display_name(self): return "Shotgun"
     def status_string(self): return "Ready"
@@ -393,35 +898,34 @@ class Laser(Weapon):
         self.charge_time = c["charge_time"]; self.beam_duration = c["beam_duration"]
         self.dps = c["dps"]; self.charges = c["charges"]
         self.cooldown_time = c["cooldown"]; self.width = c["width"]
-        self.charge = 0.0; self.beam = 0.0; self.cooldown = 0.0; self.remaining_charges = self.charges
-        # NOTE: when a beam is spawned we set follow_player=True so beam.x keeps following player.x
-
-    def update(self, dt):
-        if self.cooldown > 0: self.cooldown -= dt
-        if self.beam > 0: self.beam -= dt
-        if self.charge > 0: self.charge -= dt
+        self.charged_at = None  # deadline while the trigger is held, None otherwise
+        self.beam_until = 0.0; self.ready_at = 0.0; self.remaining_charges = self.charges
+        # NOTE: spawned beams are owned by the player so beam.x keeps following player.x
 
     def try_fire(self, bullets, beams, missiles, holding, dt):
-        if self.cooldown > 0 or self.remaining_charges <= 0:
+        now = self.timers.now
+        if now < self.ready_at or self.remaining_charges <= 0:
             return
-        if holding:
-            if self.beam > 0: return
-            if self.charge <= 0:
-                self.charge = self.charge_time
-            else:
-                self.charge -= dt
-                if self.charge <= 0:
-                    self.beam = self.beam_duration
-                    self.remaining_charges -= 1
-                    self.cooldown = self.cooldown_time
-                    # spawn beam that follows player
-                    beams.append(Beam(self.player.x, self.player.y - PLAYER_SHIP_H // 2, self.beam_duration, self.dps, self.width, follow_player=True))
+        if not holding:
+            self.charged_at = None  # letting go loses the charge
+        elif now < self.beam_until:
+            return
+        elif self.charged_at is None:
+            self.charged_at = now + self.charge_time
+        elif now >= self.charged_at:
+            self.charged_at = None
+            self.beam_until = now + self.beam_duration
+            self.remaining_charges -= 1
+            self.ready_at = now + self.cooldown_time
+            # spawn beam that follows player
+            beams.append(Beam(self.player.x, self.player.y - PLAYER_SHIP_H // 2, self.beam_duration, self.dps, self.width, owner=self.player))
 
     def display_name(self): return "Laser"
     def status_string(self):
-        if self.cooldown > 0: return f"Cooldown: {self.cooldown:.1f}s"
-        if self.beam > 0: return f"Beam: {self.beam:.1f}s"
-        if self.charge > 0: return "Charging..."
+        left = self.timers.left
+        if left(self.ready_at) > 0: return f"Cooldown: {left(self.ready_at):.1f}s"
+        if left(self.beam_until) > 0: return f"Beam: {left(self.beam_until):.1f}s"
+        if self.charged_at is not None: return "Charging..."
         return f"Charges: {self.remaining_charges}/{self.charges}"
 
 class MissileLauncher(Weapon):
@@ -430,31 +934,36 @@ class MissileLauncher(Weapon):
         c = WEAPON_CONFIG["missile"]
         self.windup = c["windup"]; self.cooldown_time = c["cooldown"]; self.capacity = c["capacity"]
         self.explosion_radius = c["explosion_radius"]; self.damage = c["damage"]
-        self.missiles = self.capacity; self.cooldown = 0.0; self.windup_timer = 0.0
-
-    def update(self, dt):
-        if self.cooldown > 0: self.cooldown -= dt
-        if self.windup_timer > 0: self.windup_timer -= dt
+        self.missiles = self.capacity; self.ready_at = 0.0; self.launch_at = None
 
     def try_fire(self, bullets, beams, missiles, holding, dt):
-        if self.cooldown > 0 or self.missiles <= 0: return
-        if holding:
-            if self.windup_timer <= 0:
-                self.windup_timer = self.windup
-            else:
-                self.windup_timer -= dt
-                if self.windup_timer <= 0:
-                    missiles.append(Missile(self.player.x, self.player.y - PLAYER_SHIP_H // 2, self.damage, self.explosion_radius))
-                    self.missiles -= 1; self.cooldown = self.cooldown_time
+        now = self.timers.now
+        if now < self.ready_at or self.missiles <= 0: return
+        if not holding:
+            self.launch_at = None
+        elif self.launch_at is None:
+            self.launch_at = now + self.windup
+        elif now >= self.launch_at:
+            self.launch_at = None
+            missiles.append(Missile(self.player.x, self.player.y - PLAYER_SHIP_H // 2, self.damage, self.explosion_radius))
+            self.missiles -= 1; self.ready_at = now + self.cooldown_time
 
     def add_missile(self):
         self.missiles = clamp(self.missiles + 1, 0, self.capacity)
 
     def display_name(self): return "Missile"
-    def status_string(self): return f"Cooldown: {self.cooldown:.1f}s" if self.cooldown > 0 else f"Missiles: {self.missiles}/{self.capacity}"
+    def status_string(self):
+        left = self.timers.left(self.ready_at)
+        return f"Cooldown: {left:.1f}s" if left > 0 else f"Missiles: {self.missiles}/{self.capacity}"
 
 # ---------- Player ----------
 class Player:
+    # in frames, as before; kept as deadlines on the game clock so nothing counts them down
+    invincible = property(lambda self: self.game.timers.left(self.invincible_until) * FPS,
+                          lambda self, frames: setattr(self, "invincible_until", self.game.timers.now + frames / FPS))
+    shield = property(lambda self: self.game.timers.left(self.shield_until) * FPS,
+                      lambda self, frames: setattr(self, "shield_until", self.game.timers.now + frames / FPS))
+
     def __init__(self, game):
         self.game = game
         self.x = WIDTH // 2
@@ -468,17 +977,26 @@ class Player:
         self.max_hearts = PLAYER_MAX_HEARTS
         self.fuel = PLAYER_START_FUEL
         self.shield = 0.0
+        self.rps_scale = 1.0  # FIRERATE_BOOST per firerate pickup still running
         self.weapons = [Minigun(self), Shotgun(self), Laser(self), MissileLauncher(self)]
         self.current_weapon_idx = 0
         self.current_weapon = self.weapons[self.current_weapon_idx]
 
-    def update(self, keys, dt):
+    @property
+    def alive(self):
+        return self.fuel > 0 and self.hearts > 0
+
+    def steer(self, keys, dt):
+        """Sideways movement only: depends on nothing but input, so network clients can predict it."""
         move = 0
         if keys[pygame.K_LEFT] or keys[pygame.K_a]: move -= 1
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]: move += 1
         self.dx = move * 9
         self.x = clamp(self.x + self.dx * dt * FPS, self.w // 2, WIDTH - self.w // 2)
 
+    def update(self, keys, dt):
+        self.steer(keys, dt)
+
         if keys[pygame.K_UP] or keys[pygame.K_w]:
             self.target_speed = PLAYER_MAX_SPEED
         elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
@@ -486,18 +1004,16 @@ class Player:
         else:
             self.target_speed = (PLAYER_BASE_SPEED + PLAYER_MAX_SPEED) / 2
 
-        if self.speed < self.target_speed: self.speed += PLAYER_ACCEL
-        elif self.speed > self.target_speed: self.speed -= PLAYER_ACCEL
+        if self.speed < self.target_speed: self.speed += PLAYER_ACCEL * dt * FPS
+        elif self.speed > self.target_speed: self.speed -= PLAYER_ACCEL * dt * FPS
         self.speed = clamp(self.speed, PLAYER_BASE_SPEED, PLAYER_MAX_SPEED)
 
+        self.game.particles.emit(self.x, self.y + self.h // 2, PARTICLE_TRAIL_RATE * self.speed / PLAYER_MAX_SPEED * dt,
+                                 (2, 4), (0.15, 0.4), (140, 210, 255), (30, 30, 90), heading=math.pi, spread=0.3)
+
         drain = PLAYER_FUEL_DRAIN_BOOST if self.target_speed > PLAYER_BASE_SPEED else PLAYER_FUEL_DRAIN
         self.fuel = clamp(self.fuel - drain * dt * FPS, 0, PLAYER_MAX_FUEL)
 
-        if self.invincible > 0: self.invincible -= dt * FPS
-        if self.shield > 0: self.shield -= dt * FPS
-
-        self.current_weapon.update(dt)
-
     def draw(self, surf):
         if ASSETS["ship"]:
             surf.blit(ASSETS["ship"], ASSETS["ship"].get_rect(center=(int(self.x), int(self.y))))
@@ -509,6 +1025,13 @@ class Player:
         if self.shield > 0:
             pygame.draw.circle(surf, (0, 200, 255), (int(self.x), int(self.y)), self.w, 2)
 
+    def hit_mask(self):
+        """Mask of what draw() puts on screen, and where its top-left lands."""
+        ship = ASSETS["ship"]
+        mask = sprite_mask(ship, None) if ship else ship_mask(self.w, self.h)
+        w, h = mask.get_size()
+        return mask, (int(self.x) - w // 2, int(self.y) - h // 2)
+
     def switch_weapon(self, d):
         self.current_weapon_idx = (self.current_weapon_idx + d) % len(self.weapons)
         self.current_weapon = self.weapons[self.current_weapon_idx]
@@ -518,10 +1041,19 @@ class Player:
         self.current_weapon_idx = idx
         self.current_weapon = self.weapons[idx]
 
-    def take_damage(self, amt):
+    def take_damage(self, amt, cause=None):
         if self.invincible > 0 or self.shield > 0: return
         self.hearts = clamp(self.hearts - amt, 0, self.max_hearts)
         self.invincible = PLAYER_INVINCIBLE_TIME
+        self.game.emit("damage", amt, cause, self.hearts)
+
+    def boost_fire_rate(self):
+        self.rps_scale *= FIRERATE_BOOST
+        self.game.timers.after(FIRERATE_SECONDS, self.end_fire_rate_boost)
+
+    def end_fire_rate_boost(self):
+        self.rps_scale /= FIRERATE_BOOST
+        if self.rps_scale < 1.0 + 1e-9: self.rps_scale = 1.0  # don't let rounding drift accumulate
 
     def heal(self, amt):
         self.hearts = clamp(self.hearts + amt, 0, self.max_hearts)
@@ -533,119 +1065,388 @@ class Player:
         for w in self.weapons:
             if isinstance(w, MissileLauncher): w.add_missile()
 
+# ---------- Particles ----------
+# Cosmetic only: particles have their own RNG and are left out of Game pickles, so replays, snapshots,
+# co-op and headless results are the same with or without them (or numpy).
+P_X, P_Y, P_VX, P_VY, P_AGE, P_LIFE = range(6)  # rows of ParticlePool.data; 6:9 start colour, 9:12 end colour
+
+class ParticlePool:
+    """Structure-of-arrays pool preallocated to PARTICLE_CAP. Live particles are packed at the front in
+    emission order, so the oldest are always first: culling keeps that order and eviction is a slice."""
+    def __init__(self, enabled=True, cap=PARTICLE_CAP):
+        self.on = enabled and np is not None
+        self.cap = cap
+        self.n = 0
+        if self.on:
+            self.data = np.zeros((12, cap), np.float32)
+            self.rng = np.random.default_rng()
+
+    def emit(self, x, y, count, speed, life, c0, c1, heading=0.0, spread=math.pi):
+        """count particles from (x, y): speed in px/frame and life in seconds as (lo, hi) ranges, fading
+        from colour c0 to c1, headed within spread radians of heading (0 is up). Fractional counts round
+        at random, so a per-frame trail can ask for 1.7 particles."""
+        if not self.on: return
+        count = int(count * QUALITY["particles"] + self.rng.random())
+        if count <= 0: return
+        count = min(count, self.cap)
+        over = self.n + count - self.cap
+        if over > 0:
+            self.data[:, :self.n - over] = self.data[:, over:self.n]
+            self.n -= over
+        d, rng = self.data[:, self.n:self.n + count], self.rng
+        angle = rng.uniform(heading - spread, heading + spread, count)
+        v = rng.uniform(speed[0], speed[1], count)
+        d[P_X], d[P_Y] = x, y
+        d[P_VX] = np.sin(angle) * v
+        d[P_VY] = -np.cos(angle) * v
+        d[P_AGE] = 0.0
+        d[P_LIFE] = rng.uniform(life[0], life[1], count)
+        d[6:9] = np.reshape(c0, (3, 1))
+        d[9:12] = np.reshape(c1, (3, 1))
+        self.n += count
+
+    def update(self, scroll_speed, dt):
+        if not self.n: return
+        d = self.data[:, :self.n]
+        step = dt * FPS
+        d[P_X] += d[P_VX] * step
+        d[P_Y] += (d[P_VY] + scroll_speed) * step
+        d[P_VX:P_VY + 1] *= PARTICLE_DRAG ** step
+        d[P_AGE] += dt
+        keep = (d[P_AGE] < d[P_LIFE]) & (d[P_X] >= 0) & (d[P_X] < WIDTH - 1) & (d[P_Y] >= 0) & (d[P_Y] < HEIGHT - 1)
+        k = int(np.count_nonzero(keep))
+        if k < self.n:
+            self.data[:, :k] = d[:, keep]
+            self.n = k
+
+    def frozen(self):
+        """A copy of the live particles that can be drawn later (render thread)."""
+        return ParticleView(self.data[:, :self.n].copy() if self.on else None)
+
+    def draw(self, surf):
+        if self.n: draw_particles(surf, self.data[:, :self.n])
+
+def draw_particles(surf, d):
+    """2x2 pixels written straight into the surface through surfarray, all particles in one go."""
+    t = d[P_AGE] / d[P_LIFE]
+    rgb = (d[6:9] + (d[9:12] - d[6:9]) * t).astype(np.uint32)
+    x = d[P_X].astype(np.intp)
+    y = d[P_Y].astype(np.intp)
+    if surf.get_bytesize() != 4:  # no direct pixel access at this depth: a few fills instead
+        for i in range(0, len(x), max(1, len(x) // 500)):
+            surf.fill(tuple(rgb[:, i]), (x[i], y[i], 2, 2))
+        return
+    rs, gs, bs, _ = surf.get_shifts()
+    color = rgb[0] << rs | rgb[1] << gs | rgb[2] << bs | surf.get_masks()[3]
+    px = pygame.surfarray.pixels2d(surf)
+    px[x, y] = color; px[x + 1, y] = color; px[x, y + 1] = color; px[x + 1, y + 1] = color
+    del px  # unlocks the surface
+
+class ParticleView(NamedTuple):
+    data: object
+
+    def draw(self, surf):
+        if self.data is not None and self.data.shape[1]: draw_particles(surf, self.data)
+
+# ---------- Bullet patterns ----------
+B_X, B_Y, B_VX, B_VY, B_AMP, B_FREQ, B_AGE, B_DAMAGE = range(8)  # rows of BulletField.data
+
+class BulletField:
+    """Enemy bullets of the bullet-hell tier: columns of one preallocated array, packed oldest first like
+    ParticlePool. Unlike particles they are simulation state: deterministic (no RNG) and pickled."""
+    def __init__(self, cap=HELL_BULLET_CAP):
+        self.cap = cap
+        self.n = 0
+        self.data = np.zeros((8, cap), np.float32)
+
+    def __getstate__(self):
+        return self.cap, self.data[:, :self.n].copy()
+
+    def __setstate__(self, state):
+        self.cap, live = state
+        self.n = live.shape[1]
+        self.data = np.zeros((8, self.cap), np.float32)
+        self.data[:, :self.n] = live
+
+    def volley(self, x, y, pattern, damage, aim, t):
+        """One volley of pattern from (x, y). aim is the (dx, dy) to the target for fans; t is game time,
+        which turns radial patterns. Angles are measured from straight down."""
+        n = min(pattern.count, self.cap)
+        if pattern.kind == "radial":
+            angles = pattern.spin * t + np.arange(n) * (2 * math.pi / n)
+        else:
+            heading = math.atan2(aim[0], aim[1]) if pattern.kind == "fan" and aim else 0.0
+            angles = heading + np.linspace(-pattern.spread / 2, pattern.spread / 2, n)
+        over = self.n + n - self.cap
+        if over > 0:
+            self.data[:, :self.n - over] = self.data[:, over:self.n]
+            self.n -= over
+        d = self.data[:, self.n:self.n + n]
+        d[B_X], d[B_Y] = x, y
+        d[B_VX] = np.sin(angles) * pattern.speed
+        d[B_VY] = np.cos(angles) * pattern.speed
+        d[B_AMP], d[B_FREQ] = pattern.amp, pattern.freq
+        d[B_AGE] = 0.0
+        d[B_DAMAGE] = damage
+        self.n += n
+
+    def update(self, scroll_speed, dt):
+        if not self.n: return
+        d = self.data[:, :self.n]
+        step = dt * FPS
+        d[B_X] += (d[B_VX] + d[B_AMP] * np.cos(d[B_AGE] * d[B_FREQ] * (2 * math.pi))) * step
+        d[B_Y] += (d[B_VY] + scroll_speed * 0.5) * step
+        d[B_AGE] += dt
+        m = 20
+        keep = (d[B_X] > -m) & (d[B_X] < WIDTH + m) & (d[B_Y] > -m) & (d[B_Y] < HEIGHT + m)
+        k = int(np.count_nonzero(keep))
+        if k < self.n:
+            self.data[:, :k] = d[:, keep]
+            self.n = k
+
+    def hit(self, p_rect, p_mask, p_at):
+        """Removes every bullet touching the ship and returns the largest damage among them (0 if none).
+        One vectorized box test over all bullets; the few inside get the ship mask."""
+        if not self.n: return 0.0
+        d = self.data[:, :self.n]
+        r = HELL_BULLET_RADIUS
+        near = np.flatnonzero((d[B_X] > p_rect.left - r) & (d[B_X] < p_rect.right + r) &
+                              (d[B_Y] > p_rect.top - r) & (d[B_Y] < p_rect.bottom + r))
+        if not len(near): return 0.0
+        dot = circle_mask(r)
+        hits = [i for i in near if masks_hit(p_mask, p_at, dot, (int(d[B_X, i]) - r, int(d[B_Y, i]) - r))]
+        if not hits: return 0.0
+        damage = float(d[B_DAMAGE, hits].max())
+        keep = np.ones(self.n, bool)
+        keep[hits] = False
+        k = self.n - len(hits)
+        self.data[:, :k] = d[:, keep]
+        self.n = k
+        return damage
+
+    def frozen(self):
+        return BulletFieldView(self.data[B_X:B_Y + 1, :self.n].copy())
+
+    def draw(self, surf):
+        if self.n: draw_pattern_bullets(surf, self.data[B_X:B_Y + 1, :self.n])
+
+HELL_DOT = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if dx * dx + dy * dy <= 5]
+
+def draw_pattern_bullets(surf, xy):
+    """Small discs, magenta with a white core, stamped for all bullets at once through surfarray."""
+    x = np.clip(xy[0].astype(np.intp), 2, WIDTH - 3)
+    y = np.clip(xy[1].astype(np.intp), 2, HEIGHT - 3)
+    if surf.get_bytesize() != 4:
+        for i in range(len(x)): pygame.draw.circle(surf, (255, 60, 160), (int(x[i]), int(y[i])), 3)
+        return
+    rim, core = surf.map_rgb((255, 60, 160)), surf.map_rgb(WHITE)
+    px = pygame.surfarray.pixels2d(surf)
+    for dx, dy in HELL_DOT:
+        px[x + dx, y + dy] = core if abs(dx) + abs(dy) <= 1 else rim
+    del px
+
+class BulletFieldView(NamedTuple):
+    xy: object
+
+    def draw(self, surf):
+        if self.xy.shape[1]: draw_pattern_bullets(surf, self.xy)
+
+# ---------- Collision narrow phase ----------
+# Rect.colliderect stays the broad phase; these only confirm its hits. Sprite images are already
+# scaled once and cached, so one surface is one (image, scale) and gets one mask, built on first use.
+NARROW_PHASE = True
+SPRITE_MASKS = {}  # surface -> mask
+SHAPE_MASKS = {}   # ("rect" | "circle" | "ship", size) -> mask, for entities drawn without an image
+
+def rect_mask(size):
+    key = ("rect", size)
+    if key not in SHAPE_MASKS:
+        SHAPE_MASKS[key] = pygame.mask.Mask(size, fill=True)
+    return SHAPE_MASKS[key]
+
+def circle_mask(r):
+    key = ("circle", r)
+    if key not in SHAPE_MASKS:
+        surf = pygame.Surface((r * 2, r * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, WHITE, (r, r), r)
+        SHAPE_MASKS[key] = pygame.mask.from_surface(surf)
+    return SHAPE_MASKS[key]
+
+def ship_mask(w, h):
+    key = ("ship", (w, h))
+    if key not in SHAPE_MASKS:
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.polygon(surf, WHITE, [(w // 2, 0), (0, h - 1), (w - 1, h - 1)])
+        SHAPE_MASKS[key] = pygame.mask.from_surface(surf)
+    return SHAPE_MASKS[key]
+
+def sprite_mask(image, size):
+    if image is None: return rect_mask(size)
+    if image not in SPRITE_MASKS:
+        SPRITE_MASKS[image] = pygame.mask.from_surface(image)
+    return SPRITE_MASKS[image]
+
+def circle_hits_rect(cx, cy, r, rect):
+    if not NARROW_PHASE: return True
+    dx = rect.left - cx if cx < rect.left else cx - rect.right if cx > rect.right else 0
+    dy = rect.top - cy if cy < rect.top else cy - rect.bottom if cy > rect.bottom else 0
+    return dx * dx + dy * dy < r * r
+
+def mask_hits_rect(mask, at, rect):
+    if not NARROW_PHASE: return True
+    return mask.overlap(rect_mask(rect.size), (rect.x - at[0], rect.y - at[1])) is not None
+
+def masks_hit(mask_a, at_a, mask_b, at_b):
+    if not NARROW_PHASE: return True
+    return mask_a.overlap(mask_b, (at_b[0] - at_a[0], at_b[1] - at_a[1])) is not None
+
+def sweep_probes(p, target):
+    """Rects of projectile p along its move this frame that overlap target, first contact first.
+    A projectile that moved less than its own size needs no sweep: its current rect is the only probe,
+    exactly as before. Callers broad-phase against p.swept (old and new rect together) first."""
+    r = p.rect
+    dx, dy = p.x - p.px, p.y - p.py
+    if abs(dx) <= r.w and abs(dy) <= r.h:
+        if r.colliderect(target): yield r
+        return
+    seg = target.inflate(r.w, r.h).clipline(r.centerx - dx, r.centery - dy, r.centerx, r.centery)
+    if not seg: return
+    (x0, y0), (x1, y1) = seg
+    steps = max(1, int(max(abs(x1 - x0) / r.w, abs(y1 - y0) / r.h) * 2))  # half a projectile apart
+    probe = r.copy()
+    for i in range(steps + 1):
+        probe.center = (x0 + (x1 - x0) * i // steps, y0 + (y1 - y0) * i // steps)
+        if probe.colliderect(target): yield probe
+
 # ---------- Enemies & Objects ----------
+ASTEROID_SCALED = {}  # (name, radius) -> scaled surface, shared by every asteroid of that size
+
+def asteroid_image(kind):
+    key = (kind.name, kind.radius)
+    if key not in ASTEROID_SCALED:
+        img = ASTEROID_IMAGES.get(kind.name)
+        ASTEROID_SCALED[key] = pygame.transform.smoothscale(img, (kind.radius*2, kind.radius*2)) if img else None
+    return ASTEROID_SCALED[key]
+
+def kind_field(name):
+    return property(operator.attrgetter("kind." + name))
+
 class Asteroid:
+    __slots__ = ("kind", "hp", "x", "y", "speed", "rect")
+    tier = kind_field("index")
+    radius = kind_field("radius")
+    max_hp = kind_field("hp")
+    color = kind_field("color")
+    name = kind_field("name")
+    image = property(lambda self: asteroid_image(self.kind))
+
     def __init__(self, tier, y0=None):
-        t = ASTEROID_TIERS[tier]
-        self.tier = tier
-        self.radius = t["radius"]
-        self.hp = float(t["hp"])
-        self.max_hp = float(t["hp"])
-        self.color = t["color"]
-        self.x = float(random.randint(self.radius, WIDTH - self.radius))
-        self.y = float(-self.radius if y0 is None else y0)
-        self.speed = float(random.randint(*t["speed"]))
-        self.name = t["name"]
-        self.image = None
-        img = ASTEROID_IMAGES.get(self.name)
-        if img:
-            self.image = pygame.transform.smoothscale(img, (self.radius*2, self.radius*2))
-            self.rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-        else:
-            self.rect = pygame.Rect(int(self.x-self.radius), int(self.y-self.radius), self.radius*2, self.radius*2)
+        t = TIERS[tier]
+        self.kind = t
+        self.hp = t.hp
+        self.x = float(random.randint(t.radius, WIDTH - t.radius))
+        self.y = float(-t.radius if y0 is None else y0)
+        self.speed = float(random.randint(*t.speed))
+        self.rect = pygame.Rect(int(self.x-t.radius), int(self.y-t.radius), t.radius*2, t.radius*2)
 
     def update(self, scroll_speed, dt):
         self.y += (self.speed + scroll_speed) * dt * FPS
-        if self.image:
-            self.rect.center = (int(self.x), int(self.y))
-        else:
-            self.rect.topleft = (int(self.x-self.radius), int(self.y-self.radius))
+        r = self.kind.radius
+        self.rect.topleft = (int(self.x-r), int(self.y-r))
 
     def draw(self, surf):
-        if self.image:
-            surf.blit(self.image, self.rect)
+        image = self.image
+        if image:
+            surf.blit(image, self.rect)
         else:
             pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), self.radius)
-        if self.max_hp > 1:
+        if self.max_hp > 1 and QUALITY["health_bars"]:
             pygame.draw.rect(surf, DARK_GRAY, (self.x-self.radius, self.y-self.radius-8, self.radius*2, 5))
             pygame.draw.rect(surf, GREEN, (self.x-self.radius, self.y-self.radius-8, int(self.radius*2*self.hp/self.max_hp), 5))
 
 class Alien:
-    def __init__(self, atype, y0=None):
-        t = ALIEN_TYPES[atype]
-        self.type = t
-        self.color = t["color"]
-        self.hp = float(t["hp"])
-        self.max_hp = float(t["hp"])
-        self.speed = float(t["speed"])
-        self.fire_rate = float(t["fire_rate"])
-        self.damage = float(t["damage"])
-        self.name = t["name"]
+    __slots__ = ("kind", "hp", "x", "y", "vx", "w", "h", "rect", "fire_at", "dodge_at")  # *_at: deadlines on Timers.now
+    name = kind_field("name")
+    color = kind_field("color")
+    max_hp = kind_field("hp")
+    speed = kind_field("speed")
+    fire_rate = kind_field("fire_rate")
+    damage = kind_field("damage")
+    image = property(lambda self: ALIEN_IMAGES.get(self.kind.name))
+    hit_mask = property(lambda self: sprite_mask(self.image, (self.w, self.h)))
+
+    def __init__(self, atype, y0=None, now=0.0):
+        t = ALIENS[atype]
+        self.kind = t
+        self.hp = t.hp
         self.x = float(random.randint(40, WIDTH-40))
         self.y = float(-32 if y0 is None else y0)
-        self.w = 44
-        self.h = 28
-        self.image = ALIEN_IMAGES.get(self.name)
-        if self.image:
-            self.rect = self.image.get_rect(center=(int(self.x), int(self.y)))
-            self.w, self.h = self.rect.width, self.rect.height
-        else:
-            self.rect = pygame.Rect(int(self.x - self.w//2), int(self.y - self.h//2), self.w, self.h)
-        self.fire_timer = random.uniform(0.0, self.fire_rate)
-        self.dodge_timer = 0.0
-
-    def update(self, scroll_speed, player_x, dt):
-        self.y += (self.speed + scroll_speed) * dt * FPS
-        if self.name == "Dart":
-            if self.dodge_timer <= 0:
-                if abs(self.x - player_x) < 80:
-                    self.x += random.choice([-1, 1]) * 12
-                self.dodge_timer = 0.5
-            else:
-                self.dodge_timer -= dt
-        if self.image:
-            self.rect.center = (int(self.x), int(self.y))
-        else:
-            self.rect.topleft = (int(self.x-self.w//2), int(self.y-self.h//2))
-        if self.fire_timer > 0: self.fire_timer -= dt
+        image = self.image
+        self.w, self.h = image.get_size() if image else (44, 28)
+        self.vx = 0.0  # sideways px/frame, set by steer_aliens
+        self.rect = pygame.Rect(int(self.x - self.w//2), int(self.y - self.h//2), self.w, self.h)
+        self.fire_at = now + random.uniform(0.0, t.fire_rate)
+        self.dodge_at = now
 
-    def can_shoot(self): return self.fire_timer <= 0
-    def shoot(self, bullets):
+    def update(self, scroll_speed, dt):
+        step = dt * FPS
+        self.x += self.vx * step
+        self.y += (self.kind.speed + scroll_speed) * step
+        self.rect.topleft = (int(self.x-self.w//2), int(self.y-self.h//2))
+
+    def dodge(self, player_x, now):
+        """Steering without numpy: a Dart lined up with the player hops 12px, at most twice a second."""
+        if self.kind.name == "Dart" and now >= self.dodge_at:
+            if abs(self.x - player_x) < 80:
+                self.x += random.choice([-1, 1]) * 12
+            self.dodge_at = now + 0.5
+
+    def can_shoot(self, now): return now >= self.fire_at
+    def shoot(self, bullets, now):
         bullets.append(AlienBullet(self.x, self.y + self.h//2, self.damage))
-        self.fire_timer = self.fire_rate
+        self.fire_at = now + self.fire_rate / STRESS["fire_rate"]
 
     def draw(self, surf):
-        if self.image:
-            surf.blit(self.image, self.rect)
+        image = self.image
+        if image:
+            surf.blit(image, self.rect)
         else:
             pygame.draw.rect(surf, self.color, self.rect)
-        if self.max_hp > 1:
+        if self.max_hp > 1 and QUALITY["health_bars"]:
             pygame.draw.rect(surf, DARK_GRAY, (self.x - self.w//2, self.y - self.h//2 - 8, self.w, 5))
             pygame.draw.rect(surf, RED, (self.x - self.w//2, self.y - self.h//2 - 8, int(self.w * self.hp / self.max_hp), 5))
 
 class AlienBullet:
+    __slots__ = ("x", "y", "px", "py", "damage", "rect", "swept")
+    speed = 7.0
+
     def __init__(self, x, y, damage):
-        self.x = float(x); self.y = float(y); self.damage = float(damage); self.speed = 7.0
+        self.x = self.px = float(x); self.y = self.py = float(y); self.damage = float(damage)
         self.rect = pygame.Rect(int(self.x - 4), int(self.y), 8, 16)
+        self.swept = self.rect.copy()
 
     def update(self, scroll_speed, dt):
+        self.px, self.py = self.x, self.y
         self.y += (self.speed + scroll_speed) * dt * FPS
+        self.swept = self.rect.union((int(self.x - 4), int(self.y), 8, 16))
         self.rect.topleft = (int(self.x - 4), int(self.y))
 
     def draw(self, surf):
         pygame.draw.rect(surf, RED, self.rect)
 
 class PowerUp:
+    __slots__ = ("type", "x", "y", "rect")
+    color = property(lambda self: POWERUPS[self.type].color)
+    speed = 4
+
     def __init__(self, ptype, y0=None):
-        t = next(p for p in POWERUP_TYPES if p["type"] == ptype)
-        self.type = t["type"]
-        self.color = t["color"]
+        self.type = POWERUPS[ptype].type
         self.x = float(random.randint(30, WIDTH-30))
         self.y = float(-20 if y0 is None else y0)
         self.rect = pygame.Rect(int(self.x-14), int(self.y-14), 28, 28)
 
     def update(self, scroll_speed, dt):
-        self.y += (4 + scroll_speed) * dt * FPS
+        self.y += (self.speed + scroll_speed) * dt * FPS
         self.rect.topleft = (int(self.x-14), int(self.y-14))
 
     def draw(self, surf):
@@ -656,6 +1457,118 @@ class PowerUp:
             pygame.draw.circle(surf, self.color, (int(self.x), int(self.y)), 14)
             draw_text(surf, self.type[0].upper(), 16, int(self.x), int(self.y), BLACK)
 
+# ---------- Alien behaviour ----------
+# Aliens stay objects (collisions, drawing and the network all want their rects), but their sideways
+# steering runs once per step for all of them: positions go into arrays, every type's behaviour runs
+# over its aliens in one go, and only the new sideways speeds go back. Asteroids are few, so each alien
+# checks those within reach of it in y; spacing only looks at the nearest alien either side in a band:
+# steering is sideways, so those are the ones in the way, and a packed swarm costs O(n log n) rather
+# than a pair per alien in reach. Deterministic and RNG-free, like BulletField;
+# without numpy, Alien.dodge stands in, so replays record which one ran (REPLAY_NUMPY) and refuse the other.
+def behave_fall(x, vx, tx, lateral, reach):
+    return np.zeros_like(x)
+
+def behave_chase(x, vx, tx, lateral, reach):
+    return np.clip((tx - x) * 0.05, -lateral, lateral)
+
+def behave_evade(x, vx, tx, lateral, reach):
+    dx = x - tx
+    return np.where(np.abs(dx) < reach, np.where(dx >= 0, lateral, -lateral), 0.0)
+
+def behave_strafe(x, vx, tx, lateral, reach):
+    heading = np.where(vx != 0, np.sign(vx), np.where(tx >= x, 1.0, -1.0))
+    turn = ((heading > 0) & ((x - tx > reach) | (x > WIDTH - SWARM_SPACING))) | \
+           ((heading < 0) & ((tx - x > reach) | (x < SWARM_SPACING)))
+    return np.where(turn, -heading, heading) * lateral
+
+def behave_formation(x, vx, tx, lateral, reach):
+    n = len(x)
+    rank = np.argsort(np.argsort(x, kind="stable"), kind="stable")  # keep left-to-right order: no crossing
+    centre = clamp(float(tx.mean()), (n - 1) * SWARM_SPACING / 2, WIDTH - (n - 1) * SWARM_SPACING / 2)
+    slot = centre + (rank - (n - 1) / 2) * SWARM_SPACING
+    return np.clip((slot - x) * 0.05, -lateral, lateral)
+
+ALIEN_BEHAVIOURS = {"fall": behave_fall, "chase": behave_chase, "evade": behave_evade,
+                    "strafe": behave_strafe, "formation": behave_formation}
+
+def avoid_push(x, y, half, ox, oy, oradius):
+    """Sideways push on each alien away from the points (radius oradius) it comes within
+    SWARM_AVOID_GAP of, strongest at contact. Candidates are the points within the largest reach in y,
+    found by two searches in the points sorted by y."""
+    order = np.argsort(oy, kind="stable")
+    sy = oy[order]
+    most = float(half.max() + oradius.max()) + SWARM_AVOID_GAP
+    lo = np.searchsorted(sy, y - most)
+    count = np.searchsorted(sy, y + most) - lo
+    qi = np.repeat(np.arange(len(x)), count)
+    pi = order[np.repeat(lo - (np.cumsum(count) - count), count) + np.arange(len(qi))]
+    dx, dy = x[qi] - ox[pi], y[qi] - oy[pi]
+    reach = half[qi] + oradius[pi] + SWARM_AVOID_GAP
+    near = dx * dx + dy * dy < reach * reach
+    qi, dx, dy, reach = qi[near], dx[near], dy[near], reach[near]
+    side = np.where(dx >= 0, 1.0, -1.0)
+    return np.bincount(qi, side * (1.0 - np.sqrt(dx * dx + dy * dy) / reach) * SWARM_AVOID_PUSH, len(x))
+
+def band_pairs(x, y, height):
+    """(i, j) with i < j for points next to each other along x inside horizontal bands height tall.
+    A second set of bands offset by half a band catches neighbours split by a band edge."""
+    n = len(x)
+    codes = []
+    for shift in (0.0, 0.5):
+        row = np.floor(y / height + shift)
+        order = np.lexsort((x, row))
+        a, b = order[:-1], order[1:]
+        same = row[a] == row[b]
+        a, b = a[same], b[same]
+        codes.append(np.minimum(a, b) * n + np.maximum(a, b))
+    code = np.unique(np.concatenate(codes))  # a pair can be neighbours in both sets of bands
+    return code // n, code % n
+
+def spacing_push(x, y, half):
+    """Sideways push apart on each alien and its nearest neighbours either side (band_pairs) when
+    they come within SWARM_AVOID_GAP of each other, strongest at contact; equal and opposite."""
+    i, j = band_pairs(x, y, 2 * float(half.max()) + SWARM_AVOID_GAP)
+    dx, dy = x[i] - x[j], y[i] - y[j]
+    reach = half[i] + half[j] + SWARM_AVOID_GAP
+    near = dx * dx + dy * dy < reach * reach
+    i, j, dx, dy, reach = i[near], j[near], dx[near], dy[near], reach[near]
+    push = np.where(dx > 0, 1.0, -1.0) * (1.0 - np.sqrt(dx * dx + dy * dy) / reach) * SWARM_AVOID_PUSH
+    return np.bincount(i, push, len(x)) - np.bincount(j, push, len(x))
+
+def steer_aliens(aliens, asteroids, players, level, dt):
+    """New vx for every alien: its type's behaviour toward the nearest player (by x), plus avoidance of
+    asteroids and of other aliens, eased by SWARM_ACCEL and kept on screen. Alien.update then moves it."""
+    n = len(aliens)
+    step = dt * FPS
+    if not n or step <= 0: return
+    x = np.fromiter((al.x for al in aliens), float, n)
+    y = np.fromiter((al.y for al in aliens), float, n)
+    vx = np.fromiter((al.vx for al in aliens), float, n)
+    half = np.fromiter((al.w / 2 for al in aliens), float, n)
+    kind = np.fromiter((al.kind.index for al in aliens), np.intp, n)
+    if players:
+        px = np.array([p.x for p in players], float)
+        tx = px[np.abs(x[:, None] - px[None, :]).argmin(axis=1)]
+    else:
+        tx = x
+    smarts = min(1.0, SWARM_SMARTS_BASE + SWARM_SMARTS_PER_LEVEL * level)
+    want = np.zeros(n)
+    for t in ALIENS:
+        mine = kind == t.index
+        if mine.any():
+            want[mine] = ALIEN_BEHAVIOURS[t.behaviour](x[mine], vx[mine], tx[mine], t.lateral * smarts, t.reach)
+    if asteroids:
+        m = len(asteroids)
+        ax = np.fromiter((a.x for a in asteroids), float, m)
+        ay = np.fromiter((a.y for a in asteroids), float, m)
+        want += smarts * avoid_push(x, y, half, ax, ay, np.fromiter((a.radius for a in asteroids), float, m))
+    if n > 1:
+        want += smarts * spacing_push(x, y, half)
+    vx += np.clip(want - vx, -SWARM_ACCEL * step, SWARM_ACCEL * step)
+    vx = np.clip(vx, (half - x) / step, (WIDTH - half - x) / step)
+    for al, v in zip(aliens, vx.tolist()):
+        al.vx = v
+
 # ---------- Spawner ----------
 class ChunkSpawner:
     def __init__(self, game):
@@ -675,40 +1588,55 @@ class ChunkSpawner:
 
     def spawn_chunk(self, y0):
         g = self.game
-        level = g.level
+        table = spawn_table(g.level)
         # asteroids
-        n_ast = max(1, CHUNK_ASTEROID_BASE + random.randint(0, CHUNK_ASTEROID_VARIANCE) + (level // 10))
+        n_ast = max(1, CHUNK_ASTEROID_BASE + random.randint(0, CHUNK_ASTEROID_VARIANCE) + table.extra_asteroids)
+        n_ast = stress_count(n_ast, STRESS["asteroids"])
+        tier_ids = range(len(TIERS))
         for _ in range(n_ast):
-            tier = min(len(ASTEROID_TIERS)-1, random.choices(range(len(ASTEROID_TIERS)), weights=[6,5,3,2,1])[0] + (level // 10))
+            tier = random.choices(tier_ids, cum_weights=table.asteroid_cum)[0]
             a = Asteroid(tier, y0 + random.randint(0, CHUNK_HEIGHT-40))
-            g.asteroids.append(a)
+            g.spawn(a, g.asteroids, a.speed, a.radius)
 
         # aliens: higher chance and bias towards Tank and Dart
-        if random.random() < ALIEN_BASE_CHANCE + 0.005 * level:
-            # weights mapping: Normal, Rapid, Tank, Dart
-            # increase Tank & Dart weight
-            weights = [3, 2 + level // 12, 4 + level // 10, 5 + level // 8]
-            atype = random.choices(range(len(ALIEN_TYPES)), weights=weights, k=1)[0]
-            al = Alien(atype, y0 + random.randint(0, CHUNK_HEIGHT-60))
-            g.aliens.append(al)
+        n_al = 0
+        wave = min(ALIEN_WAVE_MAX, 1 + (g.level - 1) // ALIEN_WAVE_EVERY)
+        for _ in range(stress_count(1, STRESS["aliens"])):
+            if random.random() < table.alien_chance:
+                atype = random.choices(range(len(ALIENS)), cum_weights=table.alien_cum, k=1)[0]
+                y = y0 + random.randint(0, CHUNK_HEIGHT-60)
+                lead = Alien(atype, y, g.timers.now)
+                gap = max(SWARM_SPACING, lead.w + SWARM_AVOID_GAP)
+                for i in range(wave):  # wingmen alternate right and left of the lead, a gap apart
+                    al = lead if i == 0 else Alien(atype, y, g.timers.now)
+                    if i:
+                        al.x = float(clamp(lead.x + (i + 1) // 2 * (1 if i % 2 else -1) * gap, al.w // 2, WIDTH - al.w // 2))
+                        al.rect.x = int(al.x - al.w // 2)
+                    g.spawn(al, g.aliens, al.speed, al.h // 2)
+                n_al += wave
 
         # powerups
         self.fuel_chunk_counter += 1
         self.special_chunk_counter += 1
+        n_pu = stress_count(1, STRESS["powerups"])
+        pus = []
         if self.fuel_chunk_counter >= POWERUP_FUEL_EVERY:
-            pu = PowerUp("fuel", y0 + random.randint(0, CHUNK_HEIGHT-30))
-            g.powerups.append(pu)
+            for _ in range(n_pu):
+                pus.append(PowerUp("fuel", y0 + random.randint(0, CHUNK_HEIGHT-30)))
             self.fuel_chunk_counter = 0
         elif self.special_chunk_counter >= POWERUP_SPECIAL_EVERY:
-            ptype = random.choices(["heal", "missile", "heal1.5"], weights=[5,2,3], k=1)[0]
-            pu = PowerUp(ptype, y0 + random.randint(0, CHUNK_HEIGHT-30))
-            g.powerups.append(pu)
+            for _ in range(n_pu):
+                ptype = random.choices(SPECIAL_IDS, cum_weights=SPECIAL_CUM, k=1)[0]
+                pus.append(PowerUp(ptype, y0 + random.randint(0, CHUNK_HEIGHT-30)))
             self.special_chunk_counter = 0
         else:
-            if random.random() < (RANDOM_POWERUP_BASE_CHANCE + 0.002 * level):
-                ptype = random.choices([p["type"] for p in POWERUP_TYPES], weights=[2,2,4,3,3,2], k=1)[0]
-                pu = PowerUp(ptype, y0 + random.randint(0, CHUNK_HEIGHT-30))
-                g.powerups.append(pu)
+            for _ in range(n_pu):
+                if random.random() < table.powerup_chance:
+                    ptype = random.choices(POWERUP_IDS, cum_weights=POWERUP_CUM, k=1)[0]
+                    pus.append(PowerUp(ptype, y0 + random.randint(0, CHUNK_HEIGHT-30)))
+        for pu in pus:
+            g.spawn(pu, g.powerups, PowerUp.speed, 14)
+        g.emit("chunk", self.chunk_index, n_ast, n_al, len(pus))
 
 # ---------- HUD ----------
 class HUD:
@@ -733,7 +1661,8 @@ class HUD:
         # Level
         draw_text(surf, f"Level {g.level}", 20, HUD_LEVEL_POS[0], HUD_LEVEL_POS[1], WHITE, center=True)
         # Controls (moved right)
-        self.draw_controls(surf, HUD_CONTROLS_POS[0], HUD_CONTROLS_POS[1])
+        if QUALITY["hud_controls"]:
+            self.draw_controls(surf, HUD_CONTROLS_POS[0], HUD_CONTROLS_POS[1])
 
     def draw_hearts(self, surf, hearts, x, y):
         full = int(hearts)
@@ -765,22 +1694,347 @@ class HUD:
         draw_text(surf, weapon.status_string(), 16, x, y + 22, YELLOW, center=False, font_obj=small_font)
 
     def draw_controls(self, surf, x, y):
-        lines = ["Controls:", "Move: AD / Arrows", "Shoot: Hold SPACE", "Switch: Q/E or 1-4", "Menu: Esc"]
+        lines = ["Controls:", "Move: AD / Arrows", "Shoot: Hold SPACE", "Switch: Q/E or 1-4", "Speed: [ ] \\", "Menu: Esc"]
         for i, line in enumerate(lines):
             draw_text(surf, line, 15, x, y + i * 20, (180, 180, 255), center=False, font_obj=small_font)
 
+# ---------- Quality governor ----------
+class QualityGovernor:
+    """Watches update+draw time and walks QUALITY_STEPS down when over budget, back up with headroom."""
+    def __init__(self, budget=FRAME_BUDGET):
+        self.budget = budget
+        self.level = 0  # number of QUALITY_STEPS currently applied
+        self.defaults = dict(QUALITY)
+        self.avg = 0.0
+        self.over = 0
+        self.under = 0
+
+    def observe(self, update_s, draw_s):
+        self.avg += (update_s + draw_s - self.avg) * 0.1
+        if self.avg > self.budget * QUALITY_DOWN_AT:
+            self.over += 1; self.under = 0
+        elif self.avg < self.budget * QUALITY_UP_AT:
+            self.under += 1; self.over = 0
+        else:
+            self.over = self.under = 0
+        if self.over >= QUALITY_DOWN_HOLD and self.level < len(QUALITY_STEPS):
+            self.set_level(self.level + 1)
+        elif self.under >= QUALITY_UP_HOLD and self.level > 0:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        old = self.level
+        self.level = level
+        QUALITY.update(self.defaults)
+        QUALITY.update(QUALITY_STEPS[:level])
+        self.over = self.under = 0
+        key = QUALITY_STEPS[max(old, level) - 1][0]
+        log.info("quality %d -> %d (%s %s, frame %.1f/%.1f ms)", old, level, key, QUALITY[key],
+                 self.avg * 1000, self.budget * 1000)
+
+# ---------- Frame pacing & input latency ----------
+class LatePacer:
+    """Replaces clock.tick for --late-input: sleeps until the last moment that still lets sampling, update,
+    draw and flip finish by the frame deadline, so the input a frame shows is as fresh as it can be."""
+    def __init__(self, fps=FPS):
+        self.period = 1.0 / fps
+        self.deadline = time.perf_counter() + self.period
+        self.work = self.period / 2  # predicted sample-to-present time; starts pessimistic
+
+    def wait(self):
+        wake = self.deadline - self.work - LATE_INPUT_MARGIN
+        if wake - time.perf_counter() > LATE_INPUT_SPIN:
+            time.sleep(wake - time.perf_counter() - LATE_INPUT_SPIN)
+        while time.perf_counter() < wake:
+            pass
+
+    def presented(self, sampled, presented):
+        work = presented - sampled
+        self.work = work if work > self.work else self.work + (work - self.work) * 0.05  # rise fast, decay slowly
+        self.deadline += self.period
+        if presented > self.deadline:  # missed it (hitch, pause menu): start again from now, don't catch up
+            self.deadline = presented + self.period
+
+class LatencyMeter:
+    """Input-to-present latency per frame, "present" being the return of display.flip().
+    Held keys: get_pressed() reflects the event queue as of its last pump, so their age is exact.
+    Key events: SDL gives no arrival time here, only that it fell between two pumps, so each is counted
+    at the middle of that window."""
+    def __init__(self, path=None):
+        self.out = open(path, "w", buffering=1) if path else None
+        if self.out: self.out.write("presented_s,held_keys_ms,key_event_ms,sample_to_present_ms\n")
+        self.held, self.events = [], []
+        self.since = time.perf_counter()
+
+    def frame(self, keys_at, prev_pump, pump, key_event, presented):
+        held = presented - keys_at
+        event = presented - (prev_pump + pump) / 2 if key_event else None
+        self.held.append(held)
+        if event is not None: self.events.append(event)
+        if self.out:
+            self.out.write(f"{presented:.6f},{held * 1000:.3f},{'' if event is None else f'{event * 1000:.3f}'},{(presented - pump) * 1000:.3f}\n")
+        if presented - self.since >= LATENCY_REPORT_EVERY:
+            self.report()
+            self.since = presented
+
+    def report(self):
+        if not self.held: return
+        held = quantiles([t * 1000 for t in self.held], (0.5, 0.95))
+        line = f"held keys p50 {held['p50']:.1f} p95 {held['p95']:.1f} ms"
+        if self.events:
+            ev = quantiles([t * 1000 for t in self.events], (0.5, 0.95))
+            line += f", key events p50 {ev['p50']:.1f} p95 {ev['p95']:.1f} ms ({len(self.events)})"
+        log.info("input latency over %d frames: %s", len(self.held), line)
+        self.held, self.events = [], []
+
+class TimeWarp:
+    """Turns each rendered frame's wall-clock time into simulation steps: time x scale, cut into steps of at
+    most TIME_STEP_MS so collisions and timers see the same granularity at any speed. Above 1x the step count
+    is also capped by what fits while drawing holds TIME_WARP_MIN_FPS, so fast-forward runs as fast as the
+    machine allows; `effective` is the speed actually reached."""
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.carry = 0.0   # sub-millisecond remainder: 0.25x of 22 ms steps 5, 6, 5, 6... ms
+        self.step_s = 0.0  # smoothed cost of one step
+        self.draw_s = 0.0  # smoothed cost of drawing a frame
+        self.effective = scale
+
+    def change(self, d):
+        i = min(range(len(TIME_SCALES)), key=lambda i: abs(TIME_SCALES[i] - self.scale))
+        self.scale = 1.0 if d == 0 else TIME_SCALES[int(clamp(i + d, 0, len(TIME_SCALES) - 1))]
+        self.carry = 0.0
+        log.info("time scale x%g", self.scale)
+
+    def steps(self, dt_ms):
+        """Integer-millisecond steps for a frame that took dt_ms, so replays record them exactly."""
+        want = dt_ms * self.scale + self.carry
+        total = int(want)
+        self.carry = want - total
+        n = -(-total // TIME_STEP_MS)
+        cap = TIME_WARP_MAX_STEPS
+        if self.scale > 1 and self.step_s > 0:
+            room = int((1.0 / TIME_WARP_MIN_FPS - self.draw_s) / self.step_s)
+            cap = min(cap, max(-(-dt_ms // TIME_STEP_MS), room))  # never fewer than 1x would take
+        if n > cap:
+            n, total, self.carry = cap, cap * TIME_STEP_MS, 0.0
+        self.effective = total / dt_ms if dt_ms else self.scale
+        if not n: return []
+        q, r = divmod(total, n)
+        return [q + 1] * r + [q] * (n - r)
+
+    def observe(self, update_s, steps, draw_s):
+        if steps: self.step_s += (update_s / steps - self.step_s) * 0.1
+        self.draw_s += (draw_s - self.draw_s) * 0.1
+
+    def draw(self, surf):
+        if self.scale == 1.0: return
+        label = f"x{self.scale:g}"
+        if self.scale > 1 and self.effective < self.scale * 0.9: label += f" (running x{self.effective:.1f})"
+        draw_text(surf, label, 20, WIDTH // 2, HUD_LEVEL_POS[1] + 24, YELLOW, font_obj=font)
+
+# ---------- Garbage collection ----------
+class GcScheduler:
+    """Moves the cyclic GC off CPython's allocation counters and onto the frame clock: automatic collection
+    is off during play, the young generations are collected in the slack after a frame is presented, and full
+    collections wait for menus and game over. What survives a full collection at a load or a new game is
+    frozen, so no later collection walks the assets or the config again. gc.callbacks times every pause, so
+    a frame over budget can be blamed on a collection or cleared of it."""
+    def __init__(self, schedule=True, stats=False):
+        self.schedule = schedule
+        self.stats = stats
+        self.cost = [0.0005, 0.002, 0.02]  # smoothed pause per generation, seconds
+        self.started = 0.0
+        self.planned = False
+        self.frame_pause = 0.0  # collections inside the current frame's work
+        self.pauses = ([], [], [])
+        self.unplanned = self.frames = self.slow = self.slow_gc = 0
+        self.since = time.perf_counter()
+        gc.callbacks.append(self.timed)
+
+    def timed(self, phase, info):
+        now = time.perf_counter()
+        if phase == "start":
+            self.started = now; return
+        gen, pause = info["generation"], now - self.started
+        self.cost[gen] += (pause - self.cost[gen]) * 0.2
+        self.pauses[gen].append(pause)
+        self.frame_pause += pause
+        if not self.planned: self.unplanned += 1
+
+    def collect(self, gen):
+        self.planned = True
+        gc.collect(gen)
+        self.planned = False
+
+    def settle(self):
+        """After loading or a new Game: full collection, then freeze the survivors. The previous game's
+        frozen objects are unfrozen first, since most of them are garbage by now."""
+        gc.unfreeze()
+        self.collect(2)
+        gc.freeze()
+
+    def play(self):
+        self.frame_pause = 0.0
+        if self.schedule: gc.disable()
+
+    def menu(self):
+        """Entering a menu or the game-over screen: nobody is watching the frame rate, collect everything."""
+        self.collect(2)
+        gc.enable()
+
+    def frame(self, work_s, deadline):
+        """After a frame is presented: attribute it, then collect young objects if the slack before
+        `deadline` (perf_counter time the next frame's work starts) has room for it."""
+        self.frames += 1
+        if work_s > FRAME_BUDGET:
+            self.slow += 1
+            if self.frame_pause: self.slow_gc += 1
+        if self.schedule:
+            young, middle, _ = gc.get_count()
+            slack = deadline - time.perf_counter() - GC_SLACK_MARGIN
+            if middle >= GC_MIDDLE_AT and (slack > self.cost[1] or young >= GC_YOUNG_FORCE): self.collect(1)
+            elif young >= GC_YOUNG_FORCE or young >= GC_YOUNG_AT and slack > self.cost[0]: self.collect(0)
+        self.frame_pause = 0.0
+        if self.stats and time.perf_counter() - self.since >= GC_STATS_EVERY: self.report()
+
+    def report(self):
+        gens = ", ".join(f"gen{g} {len(p)}" + (f" (max {max(p) * 1000:.2f} ms)" if p else "") for g, p in enumerate(self.pauses))
+        log.info("gc over %d frames: %s; %d unplanned; %d frames over budget, %d with a collection in them",
+                 self.frames, gens, self.unplanned, self.slow, self.slow_gc)
+        self.pauses = ([], [], [])
+        self.unplanned = self.frames = self.slow = self.slow_gc = 0
+        self.since = time.perf_counter()
+
+    def close(self):
+        gc.callbacks.remove(self.timed)
+        gc.enable()
+
+# ---------- Telemetry ----------
+class Telemetry:
+    """Structured events from every run, as JSON lines. The game thread only drops a tuple into a ring
+    (one producer: the thread stepping the game); a writer thread turns the backlog into lines every
+    TELEMETRY_FLUSH seconds. head and tail are each written by one thread only, so no lock is taken;
+    when the writer falls a whole ring behind, new events are dropped and counted, never waited for."""
+    def __init__(self, path, size=TELEMETRY_RING):
+        self.ring = [None] * size
+        self.size = size
+        self.head = 0  # events emitted; game thread only
+        self.tail = 0  # events written; writer thread only
+        self.dropped = self.reported = 0
+        self.run = 0  # runs seen by the writer; every line carries it
+        self.frames = []
+        self.second = time.perf_counter()
+        self.out = open(path, "a", buffering=1 << 16)
+        self.stop = threading.Event()
+        self.writer = threading.Thread(target=self.write_loop, name="telemetry", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)  # the menus leave through sys.exit
+        self.write([{"ev": "session", "wall": round(time.time(), 3), "version": REPLAY_VERSION}])
+
+    def emit(self, kind, t, fields):
+        head = self.head
+        if head - self.tail >= self.size:
+            self.dropped += 1; return
+        self.ring[head % self.size] = (kind, t, fields)
+        self.head = head + 1
+
+    def begin(self, game):
+        game.telemetry = self
+        game.emit("run", DIFFICULTY, len(game.players))
+
+    def frame(self, game, work_s):
+        """One presented frame's update+draw time; a second's worth goes out as one "frames" event."""
+        self.frames.append(work_s)
+        now = time.perf_counter()
+        if now - self.second >= 1.0:
+            game.emit("frames", self.frames)
+            self.frames, self.second = [], now
+
+    def write_loop(self):
+        while not self.stop.wait(TELEMETRY_FLUSH):
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        head, ring, size = self.head, self.ring, self.size
+        lines = []
+        for i in range(self.tail, head):
+            kind, t, fields = ring[i % size]
+            ring[i % size] = None
+            if kind == "run": self.run += 1
+            ev = {"run": self.run, "ev": kind, "t": round(t, 3)}
+            if kind == "frames":
+                ms = [f * 1000 for f in fields[0]]
+                q = quantiles(ms, (0.5, 0.95))
+                ev.update(n=len(ms), p50=round(q["p50"], 2), p95=round(q["p95"], 2), max=round(max(ms), 2))
+            else:
+                ev.update(zip(TELEMETRY_FIELDS[kind], fields))
+            lines.append(ev)
+        self.tail = head
+        if self.dropped != self.reported:
+            lines.append({"run": self.run, "ev": "dropped", "count": self.dropped - self.reported})
+            self.reported = self.dropped
+        if lines: self.write(lines)
+
+    def write(self, events):
+        self.out.write("".join(json.dumps(ev, separators=(",", ":")) + "\n" for ev in events))
+        self.out.flush()
+
+    def close(self):
+        if self.stop.is_set(): return
+        self.stop.set()
+        self.writer.join()
+        self.out.close()
+
 # ---------- Game ----------
+# Everything but the game's own classes that a snapshot may name; a replay is a file someone sent you.
+SNAPSHOT_GLOBALS = {("pygame", "__rect_constructor"), ("numpy", "dtype"), ("numpy", "ndarray"),
+                    *((m, n) for m in ("numpy.core.numeric", "numpy._core.numeric") for n in ("_frombuffer",)),
+                    *((m, n) for m in ("numpy.core.multiarray", "numpy._core.multiarray") for n in ("_reconstruct", "scalar"))}
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Loads Game snapshots from replay files: only classes defined here and SNAPSHOT_GLOBALS resolve, so
+    a crafted keyframe can't reach os.system or any other callable."""
+    def find_class(self, module, name):
+        if module in (__name__, "orbitalclash", "__main__"):
+            obj = globals().get(name)
+            if isinstance(obj, type) and obj.__module__ == __name__: return obj
+        elif (module, name) in SNAPSHOT_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"snapshot may not use {module}.{name}")
+
 class Game:
-    def __init__(self):
+    def __init__(self, persist=True, particles=True):
+        self.persist = persist  # False for replays / headless runs: never touch highscore.txt
+        self.particles_on = particles  # False when nobody will see them (headless, co-op server)
+        self.telemetry = None  # a Telemetry stream, when this run is being recorded (--telemetry)
         self.reset()
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["particles"]  # cosmetic, and large: keep them out of snapshots and replays
+        state["telemetry"] = None  # a file and a thread; a restored game reports nowhere until attached
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.particles = ParticlePool(self.particles_on)
+
+    def emit(self, kind, *fields):
+        if self.telemetry: self.telemetry.emit(kind, self.timers.now, fields)
+
     def reset(self):
         self.score = 0
         self.level = 1
         self.scroll_y = 0.0
-        self.player = Player(self)
+        self.timers = Timers()
+        self.player = Player(self)  # local player; co-op adds more with add_player()
+        self.players = [self.player]
         self.hud = HUD(self)
         self.bg = ParallaxBackground()
+        self.particles = ParticlePool(self.particles_on)
+        self.pattern_bullets = BulletField() if DIFFICULTY == "hell" and np is not None else None
+        self.dormant = []  # (entity, its list, own speed, half height): spawned above the screen, not yet live
         self.asteroids = []
         self.aliens = []
         self.alien_bullets = []
@@ -791,8 +2045,10 @@ class Game:
         self.spawner = ChunkSpawner(self)
         self.paused = False
         self.game_over = False
+        self.death_cause = None  # "fuel" or "hearts" once game_over
         self.high_score = self.load_high_score()
         self.frame_seconds = 0.0
+        self.score_clock = 0.0  # frames' worth of survival not yet paid out as score
 
     def load_high_score(self):
         try:
@@ -802,25 +2058,97 @@ class Game:
             return 0
 
     def save_high_score(self):
+        if not self.persist: return
         try:
             with open("highscore.txt", "w") as f:
                 f.write(str(self.high_score))
         except Exception:
             pass
 
-    def update(self, keys, dt, holding_shoot):
+    def spawn(self, e, group, speed, reach):
+        """Chunks spawn up to CHUNK_HEIGHT above the screen. Anything whose leading edge isn't yet within
+        ACTIVATION_MARGIN of the top waits in self.dormant: carried down by its speed and the scroll, but
+        not updated, collided, drawn or allowed to fire, until wake_dormant moves it into its list."""
+        if e.y + reach >= -ACTIVATION_MARGIN: group.append(e)
+        else: self.dormant.append((e, group, speed, reach))
+
+    def wake_dormant(self, scroll_speed, dt):
+        still = []
+        for entry in self.dormant:
+            e, group, speed, reach = entry
+            if e.y + reach >= -ACTIVATION_MARGIN:
+                self.activate(e, group)
+            else:
+                e.y += (speed + scroll_speed) * dt * FPS
+                still.append(entry)
+        self.dormant = still
+
+    def activate(self, e, group):
+        """Join a dormant entity to its list, updated from this step on. An alien's fire timer ran
+        while it waited, so it gets a fresh one rather than opening fire the moment it shows up."""
+        if isinstance(e, Alien): e.fire_at = self.timers.now + random.uniform(0.0, self.fire_interval(e))
+        group.append(e)
+
+    def fire_interval(self, al):
+        """Seconds between an alien's shots: its pattern's interval in hell, else its fire_rate (as in
+        Alien.shoot), divided by the fire_rate stress."""
+        interval = al.kind.pattern.interval if self.pattern_bullets is not None else al.fire_rate
+        return interval / STRESS["fire_rate"]
+
+    def add_player(self):
+        p = Player(self)
+        p.x = WIDTH // 2 + (len(self.players) % 2 * 2 - 1) * 60 * ((len(self.players) + 1) // 2)
+        self.players.append(p)
+        return p
+
+    def active_players(self):
+        return [p for p in self.players if p.alive]
+
+    def step(self, mask, dt):
+        """Advance one frame from a packed input byte (see INPUT_*). Live play and replays both go through here."""
+        self.step_all([mask], dt)
+
+    def step_all(self, masks, dt):
+        """One input byte per entry in self.players (co-op server)."""
+        for p, mask in zip(self.players, masks):
+            switch = mask >> INPUT_SWITCH_SHIFT
+            if not switch: continue
+            held = p.current_weapon_idx
+            if switch == SWITCH_PREV: p.switch_weapon(-1)
+            elif switch == SWITCH_NEXT: p.switch_weapon(1)
+            else: p.switch_weapon_direct(switch - 1)
+            if p.current_weapon_idx != held: self.emit("switch", p.current_weapon.display_name())
+        self.update(masks, dt)
+
+    def snapshot(self):
+        """Full simulation state (including the RNG) as compressed bytes."""
+        return zlib.compress(pickle.dumps((random.getstate(), self), pickle.HIGHEST_PROTOCOL), 6)
+
+    @staticmethod
+    def from_snapshot(blob):
+        rng, game = SnapshotUnpickler(io.BytesIO(zlib.decompress(blob))).load()
+        random.setstate(rng)
+        return game
+
+    def update(self, masks, dt):
         if self.paused or self.game_over: return
-        # Level ramps each 20s
+        # Level ramps each LEVEL_SECONDS
         self.frame_seconds += dt
-        self.level = 1 + int(self.frame_seconds // 20)
-
-        scroll_speed = self.player.speed * 0.7
+        level = 1 + int(self.frame_seconds // LEVEL_SECONDS)
+        if level != self.level: self.emit("level", level)
+        self.level = level
+        self.timers.advance(dt)
+
+        # one shared world: it scrolls at the pilots' average speed
+        active = [(p, m) for p, m in zip(self.players, masks) if p.alive]
+        scroll_speed = sum(p.speed for p, _ in active) / max(1, len(active)) * 0.7
         self.bg.update(scroll_speed, dt)
         self.spawner.update(scroll_speed, dt)
-        self.player.update(keys, dt)
-
-        # Firing (continuous)
-        self.player.current_weapon.try_fire(self.bullets, self.beams, self.missiles, holding_shoot, dt)
+        if self.dormant: self.wake_dormant(scroll_speed, dt)
+        for p, mask in active:
+            p.update(InputKeys(mask), dt)
+            # Firing (continuous)
+            p.current_weapon.try_fire(self.bullets, self.beams, self.missiles, bool(mask & INPUT_SHOOT), dt)
 
         # update bullets
         for b in self.bullets[:]:
@@ -829,9 +2157,9 @@ class Game:
                 try: self.bullets.remove(b)
                 except ValueError: pass
 
-        # update beams (and make them follow player.x if follow_player)
+        # update beams (they follow their owner's x)
         for beam in self.beams[:]:
-            beam.update(dt, player_x=self.player.x)
+            beam.update(dt)
             if not beam.active():
                 try: self.beams.remove(beam)
                 except ValueError: pass
@@ -847,51 +2175,71 @@ class Game:
         # asteroids
         for a in self.asteroids[:]:
             a.update(scroll_speed, dt)
-            if a.y - a.radius > HEIGHT + 80: 
+            if a.y - a.radius > HEIGHT:
                 try: self.asteroids.remove(a)
                 except ValueError: pass
 
         # aliens
+        now = self.timers.now
+        if np is not None: steer_aliens(self.aliens, self.asteroids, [p for p, _ in active], self.level, dt)
         for al in self.aliens[:]:
-            al.update(scroll_speed, self.player.x, dt)
-            if al.y - al.h // 2 > HEIGHT + 80:
+            if np is None: al.dodge(min(active, key=lambda pm: abs(pm[0].x - al.x))[0].x if active else al.x, now)
+            al.update(scroll_speed, dt)
+            if al.y - al.h // 2 > HEIGHT:
                 try: self.aliens.remove(al)
                 except ValueError: pass
-            elif al.can_shoot():
-                al.shoot(self.alien_bullets)
+            elif al.can_shoot(now):
+                if self.pattern_bullets is None:
+                    al.shoot(self.alien_bullets, now)
+                else:
+                    target = min(active, key=lambda pm: abs(pm[0].x - al.x))[0] if active else None
+                    aim = (target.x - al.x, target.y - al.y) if target else None
+                    self.pattern_bullets.volley(al.x, al.y + al.h // 2, al.kind.pattern, al.damage, aim, self.frame_seconds)
+                    al.fire_at = now + self.fire_interval(al)
 
         # alien bullets
         for ab in self.alien_bullets[:]:
-            ab.update(self.player.speed * 0.7, dt)
-            if ab.y > HEIGHT + 100:
+            ab.update(scroll_speed, dt)
+            if ab.y > HEIGHT:
                 try: self.alien_bullets.remove(ab)
                 except ValueError: pass
+        if self.pattern_bullets is not None:
+            self.pattern_bullets.update(scroll_speed, dt)
 
         # powerups
         for pu in self.powerups[:]:
-            pu.update(self.player.speed * 0.7, dt)
-            if pu.y > HEIGHT + 80:
+            pu.update(scroll_speed, dt)
+            if pu.y - 14 > HEIGHT:
                 try: self.powerups.remove(pu)
                 except ValueError: pass
 
         # collisions
-        self.handle_collisions()
-
-        # score over time
-        self.score += int(1 * dt * FPS)
-
-        if self.player.fuel <= 0 or self.player.hearts <= 0:
+        self.handle_collisions(dt)
+        for m in self.missiles:
+            if m.exploded and m.explode_timer == 0.0:  # went off this frame
+                self.particles.emit(m.x, m.y, 600, (3, 14), (0.4, 1.2), (255, 230, 120), (160, 30, 0))
+        self.particles.update(scroll_speed, dt)
+
+        # score over time: a point per 1/FPS survived, however the time is sliced into steps
+        self.score_clock += dt * FPS
+        self.score += int(self.score_clock)
+        self.score_clock -= int(self.score_clock)
+
+        dead = [p for p, _ in active if not p.alive]
+        if dead and not self.active_players():
             self.game_over = True
+            self.death_cause = "fuel" if dead[-1].fuel <= 0 else "hearts"
+            self.emit("over", self.score, self.death_cause, self.level)
             if self.score > self.high_score:
                 self.high_score = self.score
                 self.save_high_score()
 
-    def handle_collisions(self):
+    def handle_collisions(self, dt=1.0 / FPS):
         # bullets vs asteroids
         for a in self.asteroids[:]:
             for b in self.bullets[:]:
-                if a.rect.colliderect(b.rect):
-                    if b.type == "shotgun" and a.tier == len(ASTEROID_TIERS) - 1:
+                if a.rect.colliderect(b.swept) and any(circle_hits_rect(a.x, a.y, a.radius, r) for r in sweep_probes(b, a.rect)):
+                    if b.type == "shotgun" and a.tier == len(TIERS) - 1:
                         a.hp -= max(1, int(a.max_hp * 0.85))
                     else:
                         a.hp -= b.damage
@@ -900,20 +2248,20 @@ class Game:
                     if a.hp <= 0:
                         try: self.asteroids.remove(a)
                         except ValueError: pass
-                        self.score += 30
+                        self.asteroid_killed(a, b.type)
                     break
 
         # bullets vs aliens
         for al in self.aliens[:]:
             for b in self.bullets[:]:
-                if al.rect.colliderect(b.rect):
+                if al.rect.colliderect(b.swept) and any(mask_hits_rect(al.hit_mask, al.rect, r) for r in sweep_probes(b, al.rect)):
                     al.hp -= b.damage
                     try: self.bullets.remove(b)
                     except ValueError: pass
                     if al.hp <= 0:
                         try: self.aliens.remove(al)
                         except ValueError: pass
-                        self.score += 60
+                        self.alien_killed(al, b.type)
                     break
 
         # beams vs asteroids/aliens (beam.x always follows player.x if set that way)
@@ -922,30 +2270,35 @@ class Game:
             for a in self.asteroids[:]:
                 if abs(a.x - beam.x) < beam.width / 2:
                     # allow beam to damage entities regardless of whether they were present when fired
-                    a.hp -= beam.dps * (1.0 / FPS)
+                    a.hp -= beam.dps * dt
                     if a.hp <= 0:
                         try: self.asteroids.remove(a)
                         except ValueError: pass
-                        self.score += 30
+                        self.asteroid_killed(a, "laser")
             for al in self.aliens[:]:
                 if abs(al.x - beam.x) < beam.width / 2:
-                    al.hp -= beam.dps * (1.0 / FPS)
+                    al.hp -= beam.dps * dt
                     if al.hp <= 0:
                         try: self.aliens.remove(al)
                         except ValueError: pass
-                        self.score += 60
+                        self.alien_killed(al, "laser")
 
         # missiles AoE
         for m in list(self.missiles):
             if not m.exploded:
+                contact = None
                 for a in self.asteroids:
-                    if m.rect.colliderect(a.rect):
-                        m.exploded = True
-                        break
-                for al in self.aliens:
-                    if m.rect.colliderect(al.rect):
-                        m.exploded = True
-                        break
+                    if m.swept.colliderect(a.rect):
+                        contact = next((r for r in sweep_probes(m, a.rect) if circle_hits_rect(a.x, a.y, a.radius, r)), None)
+                        if contact: break
+                for al in self.aliens if contact is None else ():
+                    if m.swept.colliderect(al.rect):
+                        contact = next((r for r in sweep_probes(m, al.rect) if mask_hits_rect(al.hit_mask, al.rect, r)), None)
+                        if contact: break
+                if contact:
+                    m.exploded = True
+                    m.x, m.y = contact.center  # blow up where it hit, not where the frame left it
+                    m.rect.center = contact.center
             if m.exploded:
                 for a in self.asteroids[:]:
                     if math.hypot(a.x - m.x, a.y - m.y) < m.radius:
@@ -953,37 +2306,64 @@ class Game:
                         if a.hp <= 0:
                             try: self.asteroids.remove(a)
                             except ValueError: pass
-                            self.score += 30
+                            self.asteroid_killed(a, "missile")
                 for al in self.aliens[:]:
                     if math.hypot(al.x - m.x, al.y - m.y) < m.radius:
                         al.hp -= m.damage
                         if al.hp <= 0:
                             try: self.aliens.remove(al)
                             except ValueError: pass
-                            self.score += 60
+                            self.alien_killed(al, "missile")
+
+        for player in self.active_players():
+            self.handle_player_collisions(player)
+
+    def asteroid_killed(self, a, weapon):
+        self.score += 30
+        self.asteroid_debris(a)
+        self.emit("kill", "asteroid", a.tier, weapon)
+
+    def alien_killed(self, al, weapon):
+        self.score += 60
+        self.alien_debris(al)
+        self.emit("kill", "alien", al.name, weapon)
 
+    def asteroid_debris(self, a):
+        self.particles.emit(a.x, a.y, a.radius * 4, (1, 5), (0.4, 1.0), a.color, DARK_GRAY)
+
+    def alien_debris(self, al):
+        self.particles.emit(al.x, al.y, 120, (2, 8), (0.3, 0.8), al.color, (255, 90, 30))
+
+    def handle_player_collisions(self, player):
         # asteroids vs player
-        p_rect = pygame.Rect(int(self.player.x - self.player.w // 2), int(self.player.y - self.player.h // 2), self.player.w, self.player.h)
+        p_rect = pygame.Rect(int(player.x - player.w // 2), int(player.y - player.h // 2), player.w, player.h)
+        p_mask, p_at = player.hit_mask()
         for a in self.asteroids[:]:
-            if p_rect.colliderect(a.rect):
-                if self.player.invincible <= 0 and self.player.shield <= 0:
-                    self.player.take_damage(0.5)
+            if p_rect.colliderect(a.rect) and masks_hit(p_mask, p_at, circle_mask(a.radius), a.rect.topleft):
+                if player.invincible <= 0 and player.shield <= 0:
+                    player.take_damage(0.5, "asteroid")
                 try: self.asteroids.remove(a)
                 except ValueError: pass
 
         # alien bullets vs player
         for ab in self.alien_bullets[:]:
-            if p_rect.colliderect(ab.rect):
-                if self.player.invincible <= 0 and self.player.shield <= 0:
-                    self.player.take_damage(ab.damage)
+            if p_rect.colliderect(ab.swept) and any(mask_hits_rect(p_mask, p_at, r) for r in sweep_probes(ab, p_rect)):
+                if player.invincible <= 0 and player.shield <= 0:
+                    player.take_damage(ab.damage, "alien_bullet")
                 try: self.alien_bullets.remove(ab)
                 except ValueError: pass
 
+        # pattern bullets vs player
+        if self.pattern_bullets is not None:
+            damage = self.pattern_bullets.hit(p_rect, p_mask, p_at)
+            if damage and player.invincible <= 0 and player.shield <= 0:
+                player.take_damage(damage, "pattern")
+
         # aliens vs player
         for al in self.aliens[:]:
-            if p_rect.colliderect(al.rect):
-                if self.player.invincible <= 0 and self.player.shield <= 0:
-                    self.player.take_damage(al.damage)
+            if p_rect.colliderect(al.rect) and masks_hit(p_mask, p_at, al.hit_mask, al.rect.topleft):
+                if player.invincible <= 0 and player.shield <= 0:
+                    player.take_damage(al.damage, "alien")
                 try: self.aliens.remove(al)
                 except ValueError: pass
 
@@ -991,19 +2371,18 @@ class Game:
         for pu in self.powerups[:]:
             if p_rect.colliderect(pu.rect):
                 if pu.type == "shield":
-                    self.player.shield = FPS * 5
+                    player.shield = FPS * 5
                 elif pu.type == "firerate":
-                    for w in self.player.weapons:
-                        if hasattr(w, "rps"):
-                            w.rps *= 1.4
+                    player.boost_fire_rate()
                 elif pu.type == "heal":
-                    self.player.heal(1)
+                    player.heal(1)
                 elif pu.type == "heal1.5":
-                    self.player.heal(1.5)
+                    player.heal(1.5)
                 elif pu.type == "fuel":
-                    self.player.add_fuel(40)
+                    player.add_fuel(40)
                 elif pu.type == "missile":
-                    self.player.add_missile()
+                    player.add_missile()
+                self.emit("powerup", pu.type)
                 try: self.powerups.remove(pu)
                 except ValueError: pass
 
@@ -1014,16 +2393,926 @@ class Game:
         else:
             surf.fill((6, 6, 14))
         self.bg.draw(surf)
-        for a in self.asteroids: a.draw(surf)
-        for al in self.aliens: al.draw(surf)
-        for ab in self.alien_bullets: ab.draw(surf)
-        for b in self.bullets: b.draw(surf)
+        view = surf.get_rect()
+        for a in self.asteroids:
+            if view.colliderect(a.rect): a.draw(surf)
+        for al in self.aliens:
+            if view.colliderect(al.rect): al.draw(surf)
+        for ab in self.alien_bullets:
+            if view.colliderect(ab.rect): ab.draw(surf)
+        if self.pattern_bullets is not None: self.pattern_bullets.draw(surf)
+        for b in self.bullets:
+            if view.colliderect(b.rect): b.draw(surf)
         for beam in self.beams: beam.draw(surf)
-        for m in self.missiles: m.draw(surf)
-        for pu in self.powerups: pu.draw(surf)
-        self.player.draw(surf)
+        for m in self.missiles: m.draw(surf)  # an explosion reaches well past its rect
+        for pu in self.powerups:
+            if view.colliderect(pu.rect): pu.draw(surf)
+        self.particles.draw(surf)
+        for p in self.players:
+            if p.alive or p is self.player: p.draw(surf)
         self.hud.draw(surf)
 
+    def draw_list(self, update_s=0.0):
+        """Everything draw() would paint, frozen, for the render side of --render-thread."""
+        p = self.player
+        w = p.current_weapon
+        view = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        sprites = [freeze(o) for group in (self.asteroids, self.aliens, self.alien_bullets) for o in group if view.colliderect(o.rect)]
+        if self.pattern_bullets is not None: sprites.append(self.pattern_bullets.frozen())
+        sprites += [freeze(o) for group in (self.bullets, self.beams, self.missiles) for o in group]
+        sprites += [freeze(o) for o in self.powerups if view.colliderect(o.rect)]
+        sprites.append(self.particles.frozen())
+        sprites += [freeze(q) for q in self.players if q.alive or q is p]
+        bg = BackgroundView(tuple(map(tuple, self.bg.stars)), tuple(map(tuple, self.bg.planets)))
+        hud = HudView(self.score, self.level, HudPlayerView(p.fuel, p.hearts, NetWeapon(w.display_name(), w.status_string())))
+        return DrawFrame(bg, tuple(sprites), hud, update_s)
+
+# ---------- Render thread ----------
+# --render-thread splits game_loop in two. A simulation thread steps the Game at a fixed 1/FPS and
+# publishes each result as a DrawFrame of namedtuples. The main thread keeps events (SDL wants them
+# there), paints the newest frame and flips. The namedtuples carry just the fields each class's own
+# draw() reads, and that draw() is attached to them, so painting uses the very same code as Game.draw.
+def frozen_view(cls, fields, rect=True, methods=()):
+    view = namedtuple(cls.__name__ + "View", fields + ("rect",) if rect else fields)
+    view.draw = cls.draw
+    for m in methods: setattr(view, m, getattr(cls, m))
+    get = operator.attrgetter(*fields) if len(fields) > 1 else lambda o: tuple(getattr(o, f) for f in fields)
+    if rect:
+        return lambda o: view(*get(o), tuple(o.rect))  # Rect is mutable; the simulation moves it next tick
+    return lambda o: view(*get(o))
+
+FREEZERS = {
+    Asteroid: frozen_view(Asteroid, ("x", "y", "radius", "hp", "max_hp", "color", "image")),
+    Alien: frozen_view(Alien, ("x", "y", "w", "h", "hp", "max_hp", "color", "image")),
+    AlienBullet: frozen_view(AlienBullet, ()),
+    Bullet: frozen_view(Bullet, ("type",)),
+    Beam: frozen_view(Beam, ("x", "y", "width", "timer"), rect=False, methods=("active",)),
+    Missile: frozen_view(Missile, ("x", "y", "radius", "exploded")),
+    PowerUp: frozen_view(PowerUp, ("type", "x", "y", "color"), rect=False),
+    Player: frozen_view(Player, ("x", "y", "w", "h", "invincible", "shield"), rect=False),
+}
+BackgroundView = namedtuple("BackgroundView", "stars planets")
+BackgroundView.draw = ParallaxBackground.draw
+HudPlayerView = namedtuple("HudPlayerView", "fuel hearts current_weapon")
+HudView = namedtuple("HudView", "score level player")
+
+def freeze(o):
+    return FREEZERS[type(o)](o)
+
+class DrawFrame(NamedTuple):
+    background: tuple
+    sprites: tuple   # in Game.draw's paint order
+    hud: tuple
+    update_s: float  # simulation time spent on this tick, for the quality governor
+
+def render_frame(surf, frame):
+    if ASSETS["bg"]:
+        surf.blit(ASSETS["bg"], (0, 0))
+    else:
+        surf.fill((6, 6, 14))
+    frame.background.draw(surf)
+    for sprite in frame.sprites: sprite.draw(surf)
+    HUD(frame.hud).draw(surf)
+
+class FrameBuffer:
+    """Double buffer between the threads. Frames are immutable, so publishing and taking are both a
+    reference swap under the lock; neither side ever holds it for longer than that."""
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.taken = 0
+
+    def publish(self, frame):
+        with self.cond:
+            self.frame = frame
+            self.seq += 1
+            self.cond.notify_all()
+
+    def take(self, seen, timeout):
+        """Newest frame and its number; waits up to timeout when there is nothing newer than seen."""
+        with self.cond:
+            if self.seq == seen: self.cond.wait(timeout)
+            self.taken = self.seq
+            self.cond.notify_all()
+            return self.seq, self.frame
+
+    def wait_taken(self, timeout):
+        """Until the renderer has picked up the last published frame (lockstep pacing)."""
+        with self.cond:
+            if self.taken != self.seq: self.cond.wait(timeout)
+
+class SimThread(threading.Thread):
+    """Steps the game at a fixed 1/FPS (as headless runs do) with the newest input from the main thread.
+    lockstep=True instead steps as soon as the renderer has taken the previous frame: tick N+1 is
+    simulated while frame N is painted, which is what the throughput benchmark measures."""
+    def __init__(self, game, frames, recorder=None, tuning=None, lockstep=False):
+        super().__init__(daemon=True)
+        self.game, self.frames, self.recorder, self.tuning, self.lockstep = game, frames, recorder, tuning, lockstep
+        self.mask = 0
+        self.switches = deque()  # weapon switches are one-shot; queue them so none falls between ticks
+        self.halt = threading.Event()
+        self.ticks = 0
+
+    def run(self):
+        g = self.game
+        dt_ms = round(1000 / FPS)
+        next_tick = time.perf_counter()
+        while not self.halt.is_set() and not g.game_over:
+            if self.lockstep:
+                self.frames.wait_taken(0.1)
+                if self.frames.taken != self.frames.seq: continue
+            else:
+                next_tick += dt_ms / 1000.0
+                wait = next_tick - time.perf_counter()
+                if wait > 0: time.sleep(wait)
+                else: next_tick = time.perf_counter()  # fell behind: don't try to catch up
+            if g.paused: continue
+            if self.tuning: self.tuning.update(dt_ms / 1000.0)
+            mask = self.mask | (self.switches.popleft() << INPUT_SWITCH_SHIFT if self.switches else 0)
+            t0 = time.perf_counter()
+            if self.recorder: self.recorder.record(g, mask, dt_ms)
+            g.step(mask, dt_ms / 1000.0)
+            self.frames.publish(g.draw_list(time.perf_counter() - t0))
+            self.ticks += 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+# ---------- Replays ----------
+# File layout: header | blocks | index.  Each block is a keyframe (Game.snapshot) followed by the
+# run-length encoded inputs of the next REPLAY_KEYFRAME_EVERY frames; the index at the end has one
+# entry per block so a reader can jump straight to any keyframe.
+REPLAY_HEADER = struct.Struct("<4sHHIIQB")  # magic, version, fps, keyframe_every, frame_count, index_offset, flags
+REPLAY_NUMPY = 1  # flag: recorded with numpy, so aliens steered (steer_aliens) rather than dodged
+REPLAY_INDEX = struct.Struct("<IdQII")     # first frame, sim time, block offset, keyframe bytes, input bytes
+
+class InputKeys:
+    """Stands in for pygame.key.get_pressed() when input comes from a packed input byte."""
+    KEYMAP = {
+        pygame.K_LEFT: INPUT_LEFT, pygame.K_a: INPUT_LEFT,
+        pygame.K_RIGHT: INPUT_RIGHT, pygame.K_d: INPUT_RIGHT,
+        pygame.K_UP: INPUT_UP, pygame.K_w: INPUT_UP,
+        pygame.K_DOWN: INPUT_DOWN, pygame.K_s: INPUT_DOWN,
+    }
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & self.KEYMAP.get(key, 0))
+
+def encode_input(keys, holding, switch=0):
+    mask = 0
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: mask |= INPUT_LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: mask |= INPUT_RIGHT
+    if keys[pygame.K_UP] or keys[pygame.K_w]: mask |= INPUT_UP
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]: mask |= INPUT_DOWN
+    if holding: mask |= INPUT_SHOOT
+    return mask | (switch << INPUT_SWITCH_SHIFT)
+
+def put_varint(out, v):
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+def get_varint(buf, i):
+    v = shift = 0
+    while True:
+        b = buf[i]; i += 1
+        v |= (b & 0x7F) << shift
+        if b < 0x80: return v, i
+        shift += 7
+
+def encode_frames(frames):
+    """(mask, dt_ms) pairs -> bytes. Each record is a repeat count plus the frame, so a frame costs
+    nothing when it equals the one before it (held keys at a steady frame rate)."""
+    out = bytearray()
+    i = 0
+    while i < len(frames):
+        j = i + 1
+        while j < len(frames) and frames[j] == frames[i]: j += 1
+        put_varint(out, j - i)
+        out.append(frames[i][0])
+        put_varint(out, frames[i][1])
+        i = j
+    return zlib.compress(bytes(out), 9)
+
+def decode_frames(blob):
+    raw = zlib.decompress(blob)
+    frames = []
+    i = 0
+    while i < len(raw):
+        run, i = get_varint(raw, i)
+        mask = raw[i]; i += 1
+        dt_ms, i = get_varint(raw, i)
+        frames.extend([(mask, dt_ms)] * run)
+    return frames
+
+def run_path(path):
+    """First free numbered sibling of path (run.ocr -> run-001.ocr, run-002.ocr, ...): one file per run."""
+    stem, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{stem}-{n:03d}{ext}"): n += 1
+    return f"{stem}-{n:03d}{ext}"
+
+def replay_flags():
+    return REPLAY_NUMPY if np is not None else 0
+
+class ReplayWriter:
+    def __init__(self, path, keyframe_every=REPLAY_KEYFRAME_EVERY):
+        self.f = open(path, "xb")  # never overwrite a replay
+        self.f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, FPS, keyframe_every, 0, 0, replay_flags()))
+        self.keyframe_every = keyframe_every
+        self.frame_count = 0
+        self.sim_time = 0.0
+        self.index = []
+        self.keyframe = None
+        self.block = []
+        self.block_time = 0.0
+
+    def record(self, game, mask, dt_ms):
+        """Call right before game.step(mask, dt_ms / 1000.0)."""
+        if self.frame_count % self.keyframe_every == 0:
+            self.flush_block()
+            self.keyframe = game.snapshot()
+            self.block_time = self.sim_time
+        self.block.append((mask, dt_ms))
+        self.frame_count += 1
+        self.sim_time += dt_ms / 1000.0
+
+    def flush_block(self):
+        if self.keyframe is None: return
+        frames = encode_frames(self.block)
+        offset = self.f.tell()
+        self.f.write(self.keyframe)
+        self.f.write(frames)
+        self.index.append((self.frame_count - len(self.block), self.block_time, offset, len(self.keyframe), len(frames)))
+        self.keyframe = None
+        self.block = []
+
+    def close(self):
+        self.flush_block()
+        index_offset = self.f.tell()
+        for entry in self.index:
+            self.f.write(REPLAY_INDEX.pack(*entry))
+        self.f.seek(0)
+        self.f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, FPS, self.keyframe_every, self.frame_count, index_offset, replay_flags()))
+        self.f.close()
+
+class ReplayReader:
+    """Memory-mapped replay file. Only the index is parsed up front; blocks are decoded on demand."""
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.fps, self.keyframe_every, self.frame_count, index_offset, flags = REPLAY_HEADER.unpack_from(self.data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION or index_offset == 0:
+            self.close()
+            raise ValueError(f"{path}: not a finished Orbital Clash replay")
+        if (flags ^ replay_flags()) & REPLAY_NUMPY:
+            self.close()
+            raise ValueError(f"{path}: recorded {'with' if flags & REPLAY_NUMPY else 'without'} numpy, which changes how "
+                             f"aliens move; it can't play back {'without' if flags & REPLAY_NUMPY else 'with'} it")
+        self.index = list(REPLAY_INDEX.iter_unpack(self.data[index_offset:]))
+        self.times = [entry[1] for entry in self.index]
+        self.cached = (None, None)
+        self.duration = self.times[-1] + sum(dt for _, dt in self.frames(len(self.index) - 1)) / 1000.0 if self.index else 0.0
+
+    def frames(self, k):
+        if self.cached[0] != k:
+            _, _, offset, kf_len, fr_len = self.index[k]
+            self.cached = (k, decode_frames(self.data[offset + kf_len:offset + kf_len + fr_len]))
+        return self.cached[1]
+
+    def keyframe(self, k):
+        _, _, offset, kf_len, _ = self.index[k]
+        game = Game.from_snapshot(self.data[offset:offset + kf_len])
+        game.persist = False
+        return game
+
+    def block_at(self, t):
+        return max(0, bisect.bisect_right(self.times, t) - 1)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+class ReplayPlayer:
+    """Drives a Game from a replay. Seeking restores the nearest keyframe and re-simulates at most
+    one block of inputs, so it costs the same anywhere in the file."""
+    def __init__(self, reader):
+        self.reader = reader
+        self.speed = 1
+        self.paused = False
+        self.seek(0.0)
+
+    def seek(self, t):
+        r = self.reader
+        t = clamp(t, 0.0, r.duration)
+        self.block = r.block_at(t)
+        self.game = r.keyframe(self.block)
+        self.frame, self.time = r.index[self.block][0], r.index[self.block][1]
+        self.pos = 0
+        self.clock = t
+        self.run_until(t)
+
+    def next_frame(self):
+        r = self.reader
+        frames = r.frames(self.block)
+        if self.pos >= len(frames):
+            if self.block + 1 >= len(r.index): return None
+            self.block += 1; self.pos = 0
+            frames = r.frames(self.block)
+        return frames[self.pos]
+
+    def run_until(self, t):
+        while True:
+            fr = self.next_frame()
+            if fr is None or self.time + fr[1] / 1000.0 > t: return
+            self.game.step(fr[0], fr[1] / 1000.0)
+            self.pos += 1; self.frame += 1
+            self.time += fr[1] / 1000.0
+
+    def advance(self, real_dt):
+        if self.paused: return
+        self.clock = min(self.clock + real_dt * self.speed, self.reader.duration)
+        self.run_until(self.clock)
+
+def replay_viewer(path):
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    bar = pygame.Rect(20, HEIGHT - 18, WIDTH - 40, 8)
+    while True:
+        real_dt = clock.tick(FPS) / 1000.0
+        for ev in get_events():
+            if ev.type == pygame.QUIT: reader.close(); pygame.quit(); sys.exit()
+            elif ev.type == pygame.KEYDOWN:
+                if ev.key == pygame.K_ESCAPE: reader.close(); return
+                elif ev.key == pygame.K_SPACE: player.paused = not player.paused
+                elif ev.key == pygame.K_RIGHT: player.seek(player.clock + 10)
+                elif ev.key == pygame.K_LEFT: player.seek(player.clock - 10)
+                elif ev.key == pygame.K_HOME: player.seek(0.0)
+                elif ev.key == pygame.K_UP: player.speed = min(REPLAY_MAX_SPEED, player.speed * 2)
+                elif ev.key == pygame.K_DOWN: player.speed = max(1, player.speed // 2)
+            elif (ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1) or (ev.type == pygame.MOUSEMOTION and ev.buttons[0]):
+                if bar.inflate(0, 16).collidepoint(ev.pos):
+                    player.seek(reader.duration * (ev.pos[0] - bar.x) / bar.width)
+        player.advance(real_dt)
+        player.game.draw(screen)
+        pygame.draw.rect(screen, DARK_GRAY, bar, border_radius=4)
+        if reader.duration > 0:
+            pygame.draw.rect(screen, BLUE, (bar.x, bar.y, int(bar.width * player.clock / reader.duration), bar.height), border_radius=4)
+        status = "PAUSED" if player.paused else f"x{player.speed}"
+        draw_text(screen, f"Replay {player.clock:6.1f}/{reader.duration:.1f}s  {status}", 16, WIDTH // 2, HEIGHT - 32, WHITE, font_obj=small_font)
+        present()
+
+# ---------- Capture ----------
+def capture_worker(shm_name, slot_bytes, size, fmt, pitch, path, raw, jobs, done):
+    """Encoder process: a frame is (slot, index) into shared memory, written as frame_<index>.png or as
+    row `index` of an RGB24 video file. The slot goes back on `done` once the pixels are out of it."""
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    out = open(path, "r+b") if raw else None
+    while True:
+        job = jobs.get()
+        if job is None: break
+        slot, index = job
+        view = shm.buf[slot * slot_bytes:(slot + 1) * slot_bytes]
+        rgb = pygame.image.tobytes(pygame.image.frombuffer(view, size, fmt, pitch), "RGB")
+        view.release()
+        done.put(slot)
+        if raw:
+            out.seek(index * len(rgb)); out.write(rgb)
+        else:
+            pygame.image.save(pygame.image.frombuffer(rgb, size, "RGB"), os.path.join(path, f"frame_{index:06d}.png"))
+    if out: out.close()
+    shm.close()
+
+class Capture:
+    """Copies presented frames into a pool of shared-memory buffers for capture_worker processes to encode.
+    The game thread only does a memcpy of the surface's own pixels (no format conversion); when no buffer
+    is free the frame is skipped and counted, so game_loop never waits on an encoder. Offline capture
+    (lossless=True) waits for a buffer instead, and runs as fast as the encoders go.
+    PATH ending in .rgb or .raw: one raw RGB24 file (ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i PATH);
+    anything else: a directory of numbered PNGs."""
+    def __init__(self, path, surf, buffers=CAPTURE_BUFFERS, workers=CAPTURE_WORKERS, lossless=False):
+        import multiprocessing
+        from multiprocessing import shared_memory
+        self.path, self.lossless = path, lossless
+        self.size = surf.get_size()
+        masks = surf.get_masks()[:3]
+        if surf.get_bytesize() == 4 and masks in ((0xFF0000, 0xFF00, 0xFF), (0xFF, 0xFF00, 0xFF0000)):
+            fmt, self.pitch = "BGRA" if masks[0] == 0xFF0000 else "RGBA", surf.get_pitch()
+        else:  # unusual display format: let pygame convert on this thread
+            fmt, self.pitch = None, self.size[0] * 3
+        self.fmt = fmt
+        self.slot_bytes = self.pitch * self.size[1]
+        raw = path.endswith((".rgb", ".raw"))
+        if raw: open(path, "wb").close()
+        else: os.makedirs(path, exist_ok=True)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * buffers)
+        self.free = list(range(buffers))
+        ctx = multiprocessing.get_context("spawn")  # no forking a process that has SDL and threads running
+        self.jobs, self.done = ctx.Queue(), ctx.Queue()
+        self.workers = [ctx.Process(target=capture_worker, daemon=True,
+                                    args=(self.shm.name, self.slot_bytes, self.size, fmt or "RGB", self.pitch, path, raw, self.jobs, self.done))
+                        for _ in range(workers)]
+        for w in self.workers: w.start()
+        self.captured = self.skipped = 0
+
+    def reclaim(self, wait):
+        while True:
+            try: self.free.append(self.done.get(wait and not self.free))
+            except queue.Empty: return
+
+    def frame(self, surf):
+        self.reclaim(self.lossless)
+        if not self.free:
+            self.skipped += 1
+            return False
+        slot = self.free.pop()
+        at = slot * self.slot_bytes
+        if self.fmt: self.shm.buf[at:at + self.slot_bytes] = memoryview(surf.get_buffer()).cast("B")
+        else: self.shm.buf[at:at + self.slot_bytes] = pygame.image.tobytes(surf, "RGB")
+        self.jobs.put((slot, self.captured))
+        self.captured += 1
+        return True
+
+    def close(self):
+        for _ in self.workers: self.jobs.put(None)
+        for w in self.workers: w.join()
+        self.shm.close(); self.shm.unlink()
+        log.info("captured %d frames to %s, skipped %d while encoders were behind", self.captured, self.path, self.skipped)
+
+def capture_replay(path, out):
+    """Re-simulate a replay without a window and capture every frame, as fast as the encoders allow."""
+    reader = ReplayReader(path)
+    player = ReplayPlayer(reader)
+    capture = Capture(out, screen, lossless=True)
+    start = time.perf_counter()
+    try:
+        while True:
+            fr = player.next_frame()
+            if fr is None: break
+            player.game.step(fr[0], fr[1] / 1000.0)
+            player.pos += 1; player.time += fr[1] / 1000.0
+            player.game.draw(screen)
+            capture.frame(screen)
+    finally:
+        capture.close()
+        reader.close()
+    took = time.perf_counter() - start
+    print(f"{capture.captured} frames ({player.time:.1f}s of play) in {took:.1f}s: {player.time / max(took, 1e-9):.1f}x real time")
+
+# ---------- Co-op networking ----------
+# The server owns the only real Game and steps it at NET_DT with one input byte per player. Every
+# NET_SNAPSHOT_EVERY ticks it turns the world into small int tuples, (kind, sub, x, y, extra...),
+# keyed by a network id, and sends each client the difference from the last snapshot that client
+# acknowledged. Clients rebuild plain entity objects from those tuples and draw them with Game.draw.
+# Their own ship is predicted from local input and corrected when the server catches up.
+NET_ASTEROID, NET_ALIEN, NET_BULLET, NET_ALIEN_BULLET, NET_POWERUP, NET_MISSILE, NET_BEAM, NET_PLAYER = range(8)
+NET_IN = struct.Struct("<cIdB")        # 'I', acked snapshot, client clock, number of inputs
+NET_IN_ENTRY = struct.Struct("<IB")    # input seq, mask
+NET_SNAP = struct.Struct("<cBIIBIdIHB")  # 'S', flags, seq, base seq, your slot, last input applied, echoed clock, score, level, game over
+NET_ZLIB = 1
+NET_RECT_OFFSET = {
+    NET_ASTEROID: lambda o: (o.x - o.radius, o.y - o.radius),
+    NET_ALIEN: lambda o: (o.x - o.w // 2, o.y - o.h // 2),
+    NET_BULLET: lambda o: (o.x - 3, o.y - 12),
+    NET_ALIEN_BULLET: lambda o: (o.x - 4, o.y),
+    NET_POWERUP: lambda o: (o.x - 14, o.y - 14),
+    NET_MISSILE: lambda o: (o.x - 8, o.y - 16),
+}
+
+def zigzag(v):
+    return v * 2 if v >= 0 else -v * 2 - 1
+
+def unzigzag(v):
+    return v // 2 if v % 2 == 0 else -(v + 1) // 2
+
+def net_state(game):
+    """(object, tuple) for everything a client needs to draw."""
+    out = []
+    for a in game.asteroids: out.append((a, (NET_ASTEROID, a.kind.index, int(a.x), int(a.y), int(100 * a.hp / a.max_hp))))
+    for al in game.aliens: out.append((al, (NET_ALIEN, al.kind.index, int(al.x), int(al.y), int(100 * al.hp / al.max_hp))))
+    for b in game.bullets: out.append((b, (NET_BULLET, int(b.type == "shotgun"), int(b.x), int(b.y))))
+    for ab in game.alien_bullets: out.append((ab, (NET_ALIEN_BULLET, 0, int(ab.x), int(ab.y))))
+    for pu in game.powerups: out.append((pu, (NET_POWERUP, POWERUP_IDS.index(pu.type), int(pu.x), int(pu.y))))
+    for m in game.missiles: out.append((m, (NET_MISSILE, int(m.exploded), int(m.x), int(m.y), int(m.radius))))
+    for beam in game.beams: out.append((beam, (NET_BEAM, beam.width, int(beam.x), int(beam.y))))
+    for i, p in enumerate(game.players):
+        flags = (p.invincible > 0) | (p.shield > 0) << 1 | p.alive << 2
+        out.append((p, (NET_PLAYER, i, int(p.x), int(p.y), int(p.hearts * 2), int(p.fuel), flags, p.current_weapon_idx, int(p.speed))))
+    return out
+
+class NetIds:
+    """Stable network ids for server objects. Holding the object keeps id() from being reused."""
+    def __init__(self):
+        self.by_obj = {}
+        self.next_id = 1
+
+    def assign(self, pairs):
+        ids, state = {}, {}
+        for obj, t in pairs:
+            prev = self.by_obj.get(id(obj))
+            if prev is None or prev[1] is not obj:
+                prev = (self.next_id, obj)
+                self.next_id += 1
+            ids[id(obj)] = prev
+            state[prev[0]] = t
+        self.by_obj = ids
+        return state
+
+def encode_delta(state, base):
+    """Removed ids, then changed records. A record is sent whole when it is new, otherwise as a
+    bitmask of changed fields (from x onwards) and zigzag varint deltas of those fields."""
+    out = bytearray()
+    removed = sorted(set(base) - set(state))
+    put_varint(out, len(removed))
+    prev = 0
+    for nid in removed:
+        put_varint(out, nid - prev); prev = nid
+    changed = [(nid, t) for nid, t in sorted(state.items()) if base.get(nid) != t]
+    put_varint(out, len(changed))
+    prev = 0
+    for nid, t in changed:
+        put_varint(out, nid - prev); prev = nid
+        old = base.get(nid)
+        if old is None or old[:2] != t[:2] or len(old) != len(t):
+            out.append(0x80 | len(t))
+            for v in t: put_varint(out, zigzag(v))
+        else:
+            bits = 0
+            for i in range(2, len(t)):
+                if t[i] != old[i]: bits |= 1 << (i - 2)
+            out.append(bits)
+            for i in range(2, len(t)):
+                if t[i] != old[i]: put_varint(out, zigzag(t[i] - old[i]))
+    return bytes(out)
+
+def decode_delta(buf, base):
+    state = dict(base)
+    n, i = get_varint(buf, 0)
+    nid = 0
+    for _ in range(n):
+        d, i = get_varint(buf, i); nid += d
+        state.pop(nid, None)
+    n, i = get_varint(buf, i)
+    nid = 0
+    for _ in range(n):
+        d, i = get_varint(buf, i); nid += d
+        bits = buf[i]; i += 1
+        if bits & 0x80:
+            t = []
+            for _ in range(bits & 0x7F):
+                v, i = get_varint(buf, i); t.append(unzigzag(v))
+        else:
+            t = list(state[nid])
+            for k in range(2, len(t)):
+                if bits & (1 << (k - 2)):
+                    v, i = get_varint(buf, i); t[k] += unzigzag(v)
+        state[nid] = tuple(t)
+    return state
+
+class NetPeer:
+    def __init__(self, addr, player):
+        self.addr = addr
+        self.player = player
+        self.inputs = {}       # seq -> mask, not applied yet
+        self.next_seq = 1
+        self.last_mask = 0
+        self.ack = 0
+        self.echo = (0.0, 0.0)  # client clock from its newest packet, our clock when it arrived
+        self.last_seen = time.perf_counter()
+        self.bytes_in = self.bytes_out = 0
+
+    def next_input(self):
+        if len(self.inputs) > NET_INPUT_BACKLOG:
+            self.next_seq = max(self.inputs) - NET_INPUT_BACKLOG + 1
+            self.inputs = {k: v for k, v in self.inputs.items() if k >= self.next_seq}
+        mask = self.inputs.pop(self.next_seq, None)
+        if mask is None:
+            return self.last_mask  # input late or lost: keep doing what the client did last
+        self.next_seq += 1
+        self.last_mask = mask & ~(7 << INPUT_SWITCH_SHIFT)
+        return mask
+
+class NetServer:
+    def __init__(self, host="127.0.0.1", port=NET_PORT):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.game = self.new_game()
+        self.peers = {}
+        self.ids = NetIds()
+        self.history = {}
+        self.seq = 0
+        self.tick = 0
+        self.over_timer = 0.0
+
+    def new_game(self):
+        game = Game(persist=False, particles=False)
+        game.players = []
+        return game
+
+    def poll(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return
+            if len(data) < NET_IN.size or data[:1] != b"I": continue
+            try:  # anyone can send anything: decode the whole packet before it touches a peer
+                _, ack, client_time, n = NET_IN.unpack_from(data)
+                if len(data) < NET_IN.size + n * NET_IN_ENTRY.size: continue
+                inputs = [NET_IN_ENTRY.unpack_from(data, NET_IN.size + k * NET_IN_ENTRY.size) for k in range(n)]
+            except struct.error:
+                continue
+            peer = self.peers.get(addr)
+            if peer is None:
+                if len(self.peers) >= NET_MAX_PLAYERS: continue
+                peer = self.peers[addr] = NetPeer(addr, self.game.add_player())
+                log.info("net: %s:%d joined as player %d", addr[0], addr[1], len(self.game.players))
+            peer.ack = max(peer.ack, ack)
+            peer.echo = (client_time, time.perf_counter())
+            peer.last_seen = peer.echo[1]
+            peer.bytes_in += len(data)
+            for seq, mask in inputs:
+                if seq >= peer.next_seq: peer.inputs[seq] = mask
+
+    def step(self):
+        now = time.perf_counter()
+        for addr, peer in list(self.peers.items()):
+            if now - peer.last_seen > NET_TIMEOUT:
+                log.info("net: %s:%d timed out", addr[0], addr[1])
+                self.game.players.remove(peer.player)
+                del self.peers[addr]
+        if self.peers:
+            g = self.game
+            if g.game_over:
+                self.over_timer += NET_DT
+                if self.over_timer > 3.0:  # next round, same crew
+                    self.game, self.over_timer = self.new_game(), 0.0
+                    for peer in self.peers.values(): peer.player = self.game.add_player()
+            else:
+                by_player = {id(peer.player): peer for peer in self.peers.values()}
+                g.step_all([by_player[id(p)].next_input() for p in g.players], NET_DT)
+        self.tick += 1
+        if self.tick % NET_SNAPSHOT_EVERY == 0:
+            self.broadcast()
+
+    def broadcast(self):
+        g = self.game
+        state = self.ids.assign(net_state(g))
+        self.seq += 1
+        self.history[self.seq] = state
+        self.history.pop(self.seq - NET_HISTORY, None)
+        for peer in self.peers.values():
+            base_seq = peer.ack if peer.ack in self.history else 0
+            body = encode_delta(state, self.history.get(base_seq, {}))
+            flags = 0
+            packed = zlib.compress(body, 1)
+            if len(packed) < len(body): body, flags = packed, NET_ZLIB
+            w = peer.player.current_weapon
+            status = f"{w.display_name()}\t{w.status_string()}".encode()
+            client_time, got_at = peer.echo
+            pkt = (NET_SNAP.pack(b"S", flags, self.seq, base_seq, g.players.index(peer.player), peer.next_seq - 1,
+                                 client_time + (time.perf_counter() - got_at), g.score, g.level, g.game_over)
+                   + bytes([len(status)]) + status + body)
+            try:
+                self.sock.sendto(pkt, peer.addr)
+                peer.bytes_out += len(pkt)
+            except OSError:
+                pass
+
+    def serve(self, seconds=None):
+        log.info("net: serving on %s:%d", *self.sock.getsockname())
+        start = next_tick = time.perf_counter()
+        while seconds is None or time.perf_counter() - start < seconds:
+            self.poll()
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(min(0.002, next_tick - now))
+                continue
+            next_tick += NET_DT
+            self.step()
+        self.sock.close()
+
+class NetWeapon:
+    """HUD stand-in for a weapon that lives elsewhere (on the co-op server, or the simulation thread)."""
+    def __init__(self, name, status):
+        self.name, self.status = name, status
+
+    def display_name(self): return self.name
+    def status_string(self): return self.status
+
+def net_view(t, game):
+    """A bare entity to draw a network record with (no random rolls, no timers)."""
+    kind = t[0]
+    if kind == NET_ASTEROID:
+        o = Asteroid.__new__(Asteroid); o.kind = TIERS[t[1]]; o.speed = 0.0
+        o.rect = pygame.Rect(0, 0, o.radius * 2, o.radius * 2)
+    elif kind == NET_ALIEN:
+        o = Alien.__new__(Alien); o.kind = ALIENS[t[1]]; o.fire_at = o.dodge_at = 0.0
+        o.w, o.h = o.image.get_size() if o.image else (44, 28)
+        o.rect = pygame.Rect(0, 0, o.w, o.h)
+    elif kind == NET_BULLET:
+        o = Bullet.__new__(Bullet); o.speed = o.vx = o.damage = 0.0; o.rect = pygame.Rect(0, 0, 6, 16)
+    elif kind == NET_ALIEN_BULLET:
+        o = AlienBullet.__new__(AlienBullet); o.damage = 0.0; o.rect = pygame.Rect(0, 0, 8, 16)
+    elif kind == NET_POWERUP:
+        o = PowerUp.__new__(PowerUp); o.rect = pygame.Rect(0, 0, 28, 28)
+    elif kind == NET_MISSILE:
+        o = Missile.__new__(Missile); o.damage = o.explode_timer = 0.0; o.rect = pygame.Rect(0, 0, 16, 32)
+    elif kind == NET_BEAM:
+        o = Beam.__new__(Beam); o.timer = 1.0; o.dps = 0.0; o.owner = None
+    else:
+        o = Player(game)
+    return o
+
+def net_apply(o, t):
+    kind = t[0]
+    if kind in (NET_ASTEROID, NET_ALIEN): o.hp = t[4] * o.max_hp / 100
+    elif kind == NET_BULLET: o.type = "shotgun" if t[1] else "minigun"
+    elif kind == NET_POWERUP: o.type = POWERUP_IDS[t[1]]
+    elif kind == NET_MISSILE: o.exploded, o.radius = bool(t[1]), float(t[4])
+    elif kind == NET_BEAM: o.width = t[1]
+    elif kind == NET_PLAYER:
+        o.hearts, o.fuel = t[4] / 2, float(t[5])
+        o.invincible, o.shield = float(t[6] & 1), float(t[6] >> 1 & 1)
+        o.current_weapon_idx, o.speed = t[7], float(t[8])
+
+class NetClient:
+    def __init__(self, addr):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(addr)
+        self.sock.setblocking(False)
+        self.game = Game(persist=False)  # a view: its lists are rebuilt from snapshots, never stepped
+        self.game.players = []
+        self.me = None
+        self.snapshots = {}
+        self.latest = 0
+        self.views = {}    # net id -> [object, kind, x0, y0, x1, y1]
+        self.snap_time = time.perf_counter()
+        self.input_seq = 0
+        self.pending = []  # (seq, mask) the server hasn't applied yet
+        self.rtts = []
+        self.bytes_in = self.bytes_out = self.snaps = self.gaps = 0
+
+    def send_input(self, mask):
+        self.input_seq += 1
+        self.pending.append((self.input_seq, mask))
+        recent = self.pending[-NET_INPUT_REDUNDANCY:]
+        pkt = NET_IN.pack(b"I", self.latest, time.perf_counter(), len(recent)) + b"".join(NET_IN_ENTRY.pack(*e) for e in recent)
+        try:
+            self.sock.send(pkt)
+            self.bytes_out += len(pkt)
+        except OSError:
+            pass
+        if self.me and self.me.alive:
+            self.me.steer(InputKeys(mask), NET_DT)  # prediction: don't wait a round trip to move
+
+    def poll(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError, ConnectionResetError):
+                return
+            self.bytes_in += len(data)
+            self.on_snapshot(data)
+
+    def on_snapshot(self, data):
+        _, flags, seq, base_seq, slot, applied, echo, score, level, over = NET_SNAP.unpack_from(data)
+        if seq <= self.latest or (base_seq and base_seq not in self.snapshots): return
+        n = data[NET_SNAP.size]
+        name, _, status = data[NET_SNAP.size + 1:NET_SNAP.size + 1 + n].decode().partition("\t")
+        body = data[NET_SNAP.size + 1 + n:]
+        if flags & NET_ZLIB: body = zlib.decompress(body)
+        state = decode_delta(body, self.snapshots.get(base_seq, {}))
+        self.gaps += seq - self.latest - 1 if self.latest else 0
+        self.snapshots[seq] = state
+        self.snapshots.pop(seq - NET_HISTORY, None)
+        self.latest = seq
+        self.snaps += 1
+        now = time.perf_counter()
+        if echo: self.rtts.append(now - echo)
+        self.pending = [e for e in self.pending if e[0] > applied]
+        self.apply(state, slot, now)
+        g = self.game
+        g.score, g.level, g.game_over = score, level, bool(over)
+        if self.me: self.me.current_weapon = NetWeapon(name, status)
+
+    def apply(self, state, slot, now):
+        views = {}
+        lists = {k: [] for k in range(8)}
+        for nid, t in state.items():
+            v = self.views.get(nid)
+            if v is None or v[1] != t[0]:
+                v = [net_view(t, self.game), t[0], t[2], t[3], t[2], t[3]]
+            else:
+                v[2], v[3], v[4], v[5] = v[0].x, v[0].y, t[2], t[3]
+            net_apply(v[0], t)
+            views[nid] = v
+            lists[t[0]].append(v[0])
+            if t[0] == NET_PLAYER and t[1] == slot:
+                me = v[0]
+                me.x = float(t[2]); me.y = float(t[3])
+                for _, mask in self.pending:  # reconcile: server position + inputs it hasn't seen yet
+                    me.steer(InputKeys(mask), NET_DT)
+                v[2] = v[4] = me.x; v[3] = v[5] = me.y
+                self.me = me
+        self.views = views
+        self.snap_time = now
+        g = self.game
+        g.asteroids, g.aliens, g.bullets = lists[NET_ASTEROID], lists[NET_ALIEN], lists[NET_BULLET]
+        g.alien_bullets, g.powerups, g.missiles = lists[NET_ALIEN_BULLET], lists[NET_POWERUP], lists[NET_MISSILE]
+        g.beams, g.players = lists[NET_BEAM], lists[NET_PLAYER]
+        if self.me: g.player = self.me
+
+    def interpolate(self, now):
+        a = clamp((now - self.snap_time) / (NET_DT * NET_SNAPSHOT_EVERY), 0.0, 1.0)
+        for o, kind, x0, y0, x1, y1 in self.views.values():
+            if o is self.me: continue
+            o.x = x0 + (x1 - x0) * a
+            o.y = y0 + (y1 - y0) * a
+            place = NET_RECT_OFFSET.get(kind)
+            if place: o.rect.topleft = tuple(map(int, place(o)))
+
+    def report(self, seconds):
+        rtts = sorted(self.rtts) or [0.0]
+        return {"down_Bps": self.bytes_in / seconds, "up_Bps": self.bytes_out / seconds, "snapshots": self.snaps,
+                "lost": self.gaps, "bytes_per_snapshot": self.bytes_in / max(1, self.snaps),
+                "rtt_ms_p50": rtts[len(rtts) // 2] * 1000, "rtt_ms_p95": rtts[int(len(rtts) * 0.95)] * 1000}
+
+def net_client_loop(addr):
+    client = NetClient(addr)
+    holding = False
+    start = time.perf_counter()
+    while True:
+        clock.tick(FPS)
+        switch = 0
+        for ev in get_events():
+            if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
+            elif ev.type == pygame.KEYDOWN:
+                if ev.key == pygame.K_ESCAPE: return
+                elif ev.key == pygame.K_SPACE: holding = True
+                elif ev.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4): switch = ev.key - pygame.K_1 + 1
+                elif ev.key == pygame.K_q: switch = SWITCH_PREV
+                elif ev.key == pygame.K_e: switch = SWITCH_NEXT
+            elif ev.type == pygame.KEYUP and ev.key == pygame.K_SPACE:
+                holding = False
+        client.send_input(encode_input(pygame.key.get_pressed(), holding, switch))
+        client.poll()
+        now = time.perf_counter()
+        client.interpolate(now)
+        g = client.game
+        g.bg.update((client.me.speed if client.me else PLAYER_BASE_SPEED) * 0.7, 1.0 / FPS)
+        g.draw(screen)
+        r = client.report(max(1.0, now - start))
+        draw_text(screen, f"rtt {r['rtt_ms_p50']:.0f} ms  down {r['down_Bps'] / 1024:.1f} KB/s", 16, WIDTH // 2, HEIGHT - 16, GRAY, font_obj=small_font)
+        if not client.latest:
+            draw_text(screen, f"Connecting to {addr[0]}:{addr[1]}...", 28, WIDTH // 2, HEIGHT // 2, WHITE)
+        elif g.game_over:
+            draw_text(screen, "GAME OVER - next round soon", 32, WIDTH // 2, HEIGHT // 2, (255, 80, 80))
+        present()
+
+def net_bot_client(addr, seconds, policy, results):
+    client = NetClient(addr)
+    bot = BOT_POLICIES[policy]
+    start = next_frame = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.send_input(bot(client.game) if client.me else 0)
+        client.poll()
+        client.interpolate(time.perf_counter())
+        next_frame += NET_DT
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    results.put(client.report(seconds))
+
+def net_serve(addr, seconds=None):
+    NetServer(*addr).serve(seconds)
+
+def net_bench(seconds, clients=2, port=NET_PORT + 1):
+    """Server plus bot clients over localhost UDP, each in its own process; prints per-client traffic."""
+    import multiprocessing
+    addr = ("127.0.0.1", port)
+    server = multiprocessing.Process(target=net_serve, args=(addr, seconds + 2), daemon=True)
+    server.start()
+    time.sleep(0.5)
+    results = multiprocessing.Queue()
+    bots = [multiprocessing.Process(target=net_bot_client, args=(addr, seconds, "collector", results)) for _ in range(clients)]
+    for b in bots: b.start()
+    reports = [results.get() for _ in bots]
+    for b in bots: b.join()
+    server.join()
+    print(f"{'client':>6} {'down KB/s':>10} {'up KB/s':>8} {'B/snap':>7} {'snaps':>6} {'lost':>5} {'rtt p50':>8} {'rtt p95':>8}")
+    for i, r in enumerate(reports):
+        print(f"{i:>6} {r['down_Bps'] / 1024:>10.2f} {r['up_Bps'] / 1024:>8.2f} {r['bytes_per_snapshot']:>7.0f} {r['snapshots']:>6} "
+              f"{r['lost']:>5} {r['rtt_ms_p50']:>6.1f}ms {r['rtt_ms_p95']:>6.1f}ms")
+    worst = max(r["down_Bps"] for r in reports) / 1024
+    print(f"worst client {worst:.2f} KB/s down (target < 10 KB/s): {'ok' if worst < 10 else 'OVER'}")
+
 # ---------- Menus ----------
 def wrap_text(text, max_chars):
     words = text.split()
@@ -1038,164 +3327,1003 @@ def wrap_text(text, max_chars):
     if cur: lines.append(cur.strip())
     return lines
 
+INSTRUCTIONS = [
+    "Temple Run in Space! Move forward, dodge, shoot, survive.",
+    "Controls:",
+    "Move: Arrow keys or WASD",
+    "Shoot: Hold SPACE",
+    "Switch Gun: Q/E or 1-4",
+    "Pause: P | Restart: R | Menu: ESC",
+    "",
+    "Collect power-ups for shields, fire rate, health, and fuel.",
+    "If fuel runs out or you lose all lives, it's game over.",
+    "",
+    "Each weapon has unique ammo & cooldowns.",
+    "Difficulty increases as you progress."
+]
+
+# Each menu is a buttons function, a draw function that paints one frame, and a loop that handles
+# events; the golden-frame check paints the draw functions without running the loops.
+def instructions_buttons():
+    return (Button("Back", WIDTH//2 - 160, HEIGHT - 100, 320, 50, big_font),)
+
+def draw_instructions(surf, buttons):
+    back, = buttons
+    surf.fill(BLACK)
+    draw_text(surf, "Instructions", 48, WIDTH//2, 80, (0,255,255))
+    y = 150
+    for line in INSTRUCTIONS:
+        for sub in wrap_text(line, 50):
+            draw_text(surf, sub, 22, WIDTH//2, y, WHITE)
+            y += 28
+        y += 4
+
+    # back button appearance
+    bg_surf = pygame.Surface((back.rect.width, back.rect.height), pygame.SRCALPHA)
+    hover = back.rect.collidepoint(mouse_pos())
+    bg_surf.fill((80,80,80,200) if hover else (50,50,50,150))
+    surf.blit(bg_surf, back.rect.topleft)
+    ts = back.font.render(back.text, True, (255,255,255))
+    surf.blit(ts, ts.get_rect(center=back.rect.center))
+
 def instructions_menu():
-    back = Button("Back", WIDTH//2 - 160, HEIGHT - 100, 320, 50, big_font)
+    buttons = instructions_buttons()
+    back, = buttons
     while True:
-        screen.fill(BLACK)
-        draw_text(screen, "Instructions", 48, WIDTH//2, 80, (0,255,255))
-        lines = [
-            "Temple Run in Space! Move forward, dodge, shoot, survive.",
-            "Controls:",
-            "Move: Arrow keys or WASD",
-            "Shoot: Hold SPACE",
-            "Switch Gun: Q/E or 1-4",
-            "Pause: P | Restart: R | Menu: ESC",
-            "",
-            "Collect power-ups for shields, fire rate, health, and fuel.",
-            "If fuel runs out or you lose all lives, it's game over.",
-            "",
-            "Each weapon has unique ammo & cooldowns.",
-            "Difficulty increases as you progress."
-        ]
-        y = 150
-        for line in lines:
-            for sub in wrap_text(line, 50):
-                draw_text(screen, sub, 22, WIDTH//2, y, WHITE)
-                y += 28
-            y += 4
-
-        # back button appearance
-        bg_surf = pygame.Surface((back.rect.width, back.rect.height), pygame.SRCALPHA)
-        hover = back.rect.collidepoint(pygame.mouse.get_pos())
-        bg_surf.fill((80,80,80,200) if hover else (50,50,50,150))
-        screen.blit(bg_surf, back.rect.topleft)
-        ts = back.font.render(back.text, True, (255,255,255))
-        screen.blit(ts, ts.get_rect(center=back.rect.center))
-
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        draw_instructions(screen, buttons)
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
             if ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1 and back.rect.collidepoint(ev.pos):
                 return
 
+def pause_buttons():
+    return (Button("Resume", WIDTH//2 - 160, HEIGHT//2, 320, 50, big_font),
+            Button("Settings", WIDTH//2 - 160, HEIGHT//2 + 70, 320, 50, big_font),
+            Button("Main Menu", WIDTH//2 - 160, HEIGHT//2 + 140, 320, 50, big_font))
+
+def draw_pause_menu(surf, buttons):
+    surf.fill(BLACK)
+    draw_text(surf, "PAUSED", 56, WIDTH//2, HEIGHT//2-120, (255,255,0))
+    for b in buttons: b.draw(surf)
+
 def pause_menu():
-    resume = Button("Resume", WIDTH//2 - 160, HEIGHT//2, 320, 50, big_font)
-    settings = Button("Settings", WIDTH//2 - 160, HEIGHT//2 + 70, 320, 50, big_font)
-    menu = Button("Main Menu", WIDTH//2 - 160, HEIGHT//2 + 140, 320, 50, big_font)
+    buttons = pause_buttons()
+    resume, settings, menu = buttons
     while True:
-        screen.fill(BLACK)
-        draw_text(screen, "PAUSED", 56, WIDTH//2, HEIGHT//2-120, (255,255,0))
-        for b in (resume, settings, menu): b.draw(screen)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        draw_pause_menu(screen, buttons)
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
             if resume.is_clicked(ev): return
             if settings.is_clicked(ev): settings_menu()
             if menu.is_clicked(ev): return
 
+def settings_buttons():
+    return (Button("Back", WIDTH//2 - 100, HEIGHT//2 + 100, 200, 50, big_font),)
+
+def draw_settings_menu(surf, buttons):
+    surf.fill(BLACK)
+    draw_text(surf, "Settings", 48, WIDTH//2, HEIGHT//2-80, (0,255,255))
+    draw_text(surf, "Volume: (placeholder)", 32, WIDTH//2, HEIGHT//2, WHITE)
+    for b in buttons: b.draw(surf)
+
 def settings_menu():
-    back = Button("Back", WIDTH//2 - 100, HEIGHT//2 + 100, 200, 50, big_font)
+    buttons = settings_buttons()
+    back, = buttons
     while True:
-        screen.fill(BLACK)
-        draw_text(screen, "Settings", 48, WIDTH//2, HEIGHT//2-80, (0,255,255))
-        draw_text(screen, "Volume: (placeholder)", 32, WIDTH//2, HEIGHT//2, WHITE)
-        back.draw(screen)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        draw_settings_menu(screen, buttons)
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
             if back.is_clicked(ev): return
 
+def draw_game_over(surf, score, high_score):
+    surf.fill(BLACK)
+    draw_text(surf, "GAME OVER", 56, WIDTH//2, HEIGHT//2-80, (255,80,80))
+    draw_text(surf, f"Score: {score}", 36, WIDTH//2, HEIGHT//2-10, WHITE)
+    draw_text(surf, f"High Score: {high_score}", 28, WIDTH//2, HEIGHT//2+40, YELLOW)
+    draw_text(surf, "Press R to Restart or ESC for Menu", 26, WIDTH//2, HEIGHT//2+90, (180,180,255))
+
 def game_over_screen(score, high_score):
     while True:
-        screen.fill(BLACK)
-        draw_text(screen, "GAME OVER", 56, WIDTH//2, HEIGHT//2-80, (255,80,80))
-        draw_text(screen, f"Score: {score}", 36, WIDTH//2, HEIGHT//2-10, WHITE)
-        draw_text(screen, f"High Score: {high_score}", 28, WIDTH//2, HEIGHT//2+40, YELLOW)
-        draw_text(screen, "Press R to Restart or ESC for Menu", 26, WIDTH//2, HEIGHT//2+90, (180,180,255))
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        draw_game_over(screen, score, high_score)
+        present()
+        for ev in get_events():
             if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
             if ev.type == pygame.KEYDOWN:
                 if ev.key == pygame.K_r: return True
                 if ev.key == pygame.K_ESCAPE: return False
 
-def main_menu():
-    bg = ASSETS["bg"]
-    start = Button("Start Game", WIDTH//2 - 160, HEIGHT//2, 320, 50, big_font)
-    instr = Button("Instructions", WIDTH//2 - 160, HEIGHT//2 + 70, 320, 50, big_font)
-    quitb = Button("Quit", WIDTH//2 - 160, HEIGHT//2 + 140, 320, 50, big_font)
+def main_buttons():
+    return (Button("Start Game", WIDTH//2 - 160, HEIGHT//2, 320, 50, big_font),
+            Button("Instructions", WIDTH//2 - 160, HEIGHT//2 + 70, 320, 50, big_font),
+            Button("Quit", WIDTH//2 - 160, HEIGHT//2 + 140, 320, 50, big_font))
+
+def draw_main_menu(surf, buttons):
+    if ASSETS["bg"]: surf.blit(ASSETS["bg"], (0,0))
+    else: surf.fill((8, 8, 16))
+    draw_text(surf, "Cosmic Adventure", 48, WIDTH//2, HEIGHT//2-120, (0,255,255))
+    draw_text(surf, "The Journey of Star", 32, WIDTH//2, HEIGHT//2-70, (255,255,0))
+    for b in buttons: b.draw(surf)
+
+def main_menu(first_frame=False):
+    """first_frame: print the wall-clock time once the first frame is presented and return (bench_startup)."""
+    buttons = main_buttons()
+    start, instr, quitb = buttons
     c = pygame.time.Clock()
     while True:
         c.tick(FPS)
-        if bg: screen.blit(bg, (0,0))
-        else: screen.fill((8, 8, 16))
-        draw_text(screen, "Cosmic Adventure", 48, WIDTH//2, HEIGHT//2-120, (0,255,255))
-        draw_text(screen, "The Journey of Star", 32, WIDTH//2, HEIGHT//2-70, (255,255,0))
-        for b in (start, instr, quitb): b.draw(screen)
-        pygame.display.flip()
-        for ev in pygame.event.get():
+        draw_main_menu(screen, buttons)
+        present()
+        if first_frame:
+            print(f"first-frame {time.time():.6f}", flush=True); return False
+        load_pending_assets(1)
+        for ev in get_events():
             if ev.type == pygame.QUIT: pygame.quit(); sys.exit()
             if start.is_clicked(ev): return True
             if instr.is_clicked(ev): instructions_menu()
             if quitb.is_clicked(ev): pygame.quit(); sys.exit()
 
+# ---------- Benchmarks ----------
+BENCH_ENTITIES = [
+    ("Bullet", lambda i: Bullet(300, 300, -13, 0, 10, "minigun")),
+    ("AlienBullet", lambda i: AlienBullet(300, 300, 0.5)),
+    ("Asteroid", lambda i: Asteroid(i % len(TIERS), 0)),
+    ("Alien", lambda i: Alien(i % len(ALIENS), 0)),
+    ("PowerUp", lambda i: PowerUp(POWERUP_IDS[i % len(POWERUP_IDS)], 0)),
+    ("Missile", lambda i: Missile(300, 300, 100, 150)),
+    ("Beam", lambda i: Beam(300, 500, 4.5, 30, 24)),
+]
+BENCH_LISTS = {"Bullet": "bullets", "AlienBullet": "alien_bullets", "Asteroid": "asteroids", "Alien": "aliens",
+               "PowerUp": "powerups", "Missile": "missiles", "Beam": "beams"}
+
+def resident_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource  # not on Windows; peak rather than current RSS, in KiB on Linux
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+def bench_startup(runs=5):
+    """Launch the game runs times per case and time from launch to its first main-menu frame. Cold
+    deletes the font cache before each launch; warm keeps it. The OS file cache stays warm either way."""
+    import subprocess
+    cmd = [sys.executable, os.path.abspath(__file__), "--first-frame"]
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    for label, cold in (("cold", True), ("warm", False)):
+        times = []
+        for _ in range(runs):
+            if cold and os.path.exists(FONT_CACHE): os.remove(FONT_CACHE)
+            t0 = time.time()
+            out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+            times.append(float(out.split("first-frame ")[1].split()[0]) - t0)
+        times.sort()
+        print(f"{label}: first menu frame after {times[0] * 1000:6.1f} ms min  {times[len(times) // 2] * 1000:6.1f} ms median  ({runs} runs)")
+
+def bench_memory(counts=(1000, 10000, 100000)):
+    random.seed(0)
+    print("bytes per live entity (object + rect + slots):")
+    for name, make in BENCH_ENTITIES:
+        tracemalloc.start()
+        objs = [make(i) for i in range(1000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {name:<12}{size / len(objs):8.0f}")
+        del objs
+    print("resident memory with N live entities in one Game (even mix of the types above):")
+    for n in counts:
+        gc.collect()
+        base = resident_bytes()
+        g = Game(persist=False)
+        for i in range(n):
+            name, make = BENCH_ENTITIES[i % len(BENCH_ENTITIES)]
+            getattr(g, BENCH_LISTS[name]).append(make(i))
+        rss = resident_bytes()
+        print(f"  {n:>7} entities: RSS {rss / 2**20:7.1f} MiB (+{(rss - base) / 2**20:.1f} MiB, {(rss - base) / n:.0f} B/entity)")
+        del g
+
+def bench_collisions(n=2000, frames=60, repeats=5):
+    """Time handle_collisions on the same crowded frames with and without the narrow phase."""
+    random.seed(0)
+    states = []
+    for _ in range(frames):
+        g = Game(persist=False)
+        top_up(g, n)
+        for _ in range(n // 10):
+            g.bullets.append(Bullet(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), -13, 0, 1, "minigun"))
+        g.player.x = random.uniform(PLAYER_SHIP_W, WIDTH - PLAYER_SHIP_W)
+        states.append(pickle.dumps(g))
+    global NARROW_PHASE
+    modes = (False, True)
+    ms = dict.fromkeys(modes, 0.0)
+    spent = dict.fromkeys(modes, 0)
+    hurt = dict.fromkeys(modes, 0)
+    for blob in states:
+        # per frame, best of N with the two modes interleaved: the difference is smaller than scheduler noise
+        best = dict.fromkeys(modes, float("inf"))
+        for rep in range(repeats):
+            for narrow in modes:
+                NARROW_PHASE = narrow
+                g = pickle.loads(blob)
+                bullets, hearts = len(g.bullets), g.player.hearts
+                gc.disable()  # unpickling leaves a collection due; don't bill it to whichever run trips it
+                t0 = time.perf_counter()
+                g.handle_collisions()
+                best[narrow] = min(best[narrow], time.perf_counter() - t0)
+                gc.enable()
+                if rep == 0:
+                    spent[narrow] += bullets - len(g.bullets); hurt[narrow] += g.player.hearts < hearts
+        for narrow in modes:
+            ms[narrow] += best[narrow] * 1000 / frames
+    NARROW_PHASE = True
+    print(f"{n} entities + {n // 10} bullets, {frames} frames ({len(SPRITE_MASKS)} sprite masks, {len(SHAPE_MASKS)} shape masks)")
+    for narrow, label in ((False, "rects only"), (True, "rects + narrow")):
+        print(f"  {label:<15} {ms[narrow]:8.3f} ms/frame  bullets spent {spent[narrow]:6}  frames the player was hit {hurt[narrow]}")
+    print(f"  narrow phase cost: {(ms[True] - ms[False]) / ms[False] * 100:+.1f}% of collision time (target < 10%)")
+
+def bench_particles(counts=PARTICLE_BENCH, frames=120):
+    """Update + draw time of the particle pool held at N live particles (explosions re-emitted as they fade)."""
+    if np is None:
+        print("particles need numpy, which isn't installed"); return
+    print(f"{'particles':>9} {'update ms':>10} {'draw ms':>8} {'total ms':>9}  (budget 5 ms, cap {PARTICLE_CAP})")
+    for n in counts:
+        pool = ParticlePool()
+        t_update = t_draw = 0.0
+        live = 0
+        for _ in range(frames):
+            while pool.n < n:
+                pool.emit(random.uniform(100, WIDTH - 100), random.uniform(100, HEIGHT - 100), min(600, n - pool.n + 1),
+                          (1, 12), (1.0, 3.0), (255, 230, 120), (160, 30, 0))
+            live += pool.n
+            t0 = time.perf_counter()
+            pool.update(3.0, 1.0 / FPS)
+            t1 = time.perf_counter()
+            pool.draw(screen)
+            t2 = time.perf_counter()
+            t_update += t1 - t0; t_draw += t2 - t1
+        up, dr = t_update / frames * 1000, t_draw / frames * 1000
+        print(f"{live // frames:>9} {up:>10.2f} {dr:>8.2f} {up + dr:>9.2f}{'' if up + dr <= 5 else '  over budget'}")
+
+# ---------- Headless runs ----------
+def asteroid_threats(game):
+    p = game.player
+    return [a for a in game.asteroids if 0 < p.y - a.y < 220 and abs(a.x - p.x) < a.radius + p.w // 2]
+
+def bot_gunner(game):
+    """Holds fire, sidesteps asteroids coming down its column, otherwise lines up under the lowest alien."""
+    p = game.player
+    mask = INPUT_SHOOT
+    threats = asteroid_threats(game)
+    if threats:
+        a = max(threats, key=lambda a: a.y)
+        go_left = a.x > p.x if p.w < p.x < WIDTH - p.w else p.x > WIDTH // 2
+        mask |= INPUT_LEFT if go_left else INPUT_RIGHT
+    elif game.aliens:
+        target = max(game.aliens, key=lambda al: al.y).x
+        if target < p.x - 8: mask |= INPUT_LEFT
+        elif target > p.x + 8: mask |= INPUT_RIGHT
+    return mask
+
+def bot_idle(game):
+    """Sits still and holds fire: the baseline every tuning change should still kill."""
+    return INPUT_SHOOT
+
+def bot_dodger(game):
+    """Only sidesteps asteroids, never aims."""
+    return bot_gunner(game) if asteroid_threats(game) else INPUT_SHOOT
+
+def bot_collector(game):
+    """Gunner that goes after fuel and hearts when it is running low on them."""
+    p = game.player
+    want = {"fuel"} if p.fuel < 50 else set()
+    if p.hearts < p.max_hearts - 1: want |= {"heal", "heal1.5"}
+    pickups = [pu for pu in game.powerups if pu.type in want and pu.y < p.y]
+    if not pickups: return bot_gunner(game)
+    target = max(pickups, key=lambda pu: pu.y).x
+    mask = INPUT_SHOOT
+    if target < p.x - 8: mask |= INPUT_LEFT
+    elif target > p.x + 8: mask |= INPUT_RIGHT
+    return mask
+
+BOT_POLICIES = {"idle": bot_idle, "dodger": bot_dodger, "gunner": bot_gunner, "collector": bot_collector}
+
+def setup_display(headless=False, caption="Cosmic Adventure: The Journey of Star", window=None, fullscreen=False, defer_assets=False):
+    """window: (w, h) for a resizable window of that size; fullscreen: the desktop's size. Either way
+    the game draws at WIDTH x HEIGHT and a Presenter scales it. defer_assets: see load_assets."""
+    global screen, clock, font, big_font, small_font, presenter
+    if headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init(); pygame.font.init()  # the only subsystems used; audio and joystick init is slow and idle
+    if fullscreen or (window and tuple(window) != (WIDTH, HEIGHT)):
+        pygame.display.set_mode((0, 0) if fullscreen else window, pygame.FULLSCREEN if fullscreen else pygame.RESIZABLE)
+        screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+        presenter = Presenter(screen)
+    else:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        presenter = None
+    pygame.display.set_caption(caption)
+    clock = pygame.time.Clock()
+    font, big_font, small_font = font_for(22), font_for(48), font_for(16)
+    load_assets(defer=defer_assets)
+
+def run_headless(seconds, policy="gunner", seed=None, recorder=None, render=False):
+    """Play one game with a bot at a fixed 1/FPS step and no window. Returns the finished Game."""
+    if seed is not None: random.seed(seed)
+    game = Game(persist=False, particles=render)
+    bot = BOT_POLICIES[policy]
+    dt_ms = round(1000 / FPS)
+    for _ in range(int(seconds * FPS)):
+        if game.game_over: break
+        mask = bot(game)
+        if recorder: recorder.record(game, mask, dt_ms)
+        game.step(mask, dt_ms / 1000.0)
+        if render: game.draw(screen)
+    return game
+
+def entity_count(game):
+    """Live entities plus the dormant ones waiting above the screen, which will be live soon."""
+    return (len(game.asteroids) + len(game.aliens) + len(game.powerups) + len(game.bullets) + len(game.alien_bullets)
+            + len(game.missiles) + len(game.dormant))
+
+def top_up(game, n):
+    """Spawn chunks over the whole screen until game holds n entities, all of them live: benchmarks
+    want N in play now, so whatever spawned dormant above the top edge is activated straight away."""
+    while entity_count(game) < n:
+        game.spawner.spawn_chunk(random.randint(-CHUNK_HEIGHT, HEIGHT - CHUNK_HEIGHT))
+    for e, group, _, _ in game.dormant: game.activate(e, group)
+    game.dormant = []
+
+def stress_sweep(counts=STRESS_SWEEP, frames=STRESS_SWEEP_FRAMES, policy="gunner"):
+    """Hold a Game at each live entity count and time update and draw, to find where 45 FPS breaks."""
+    random.seed(0)
+    bot = BOT_POLICIES[policy]
+    print(f"{'entities':>9} {'update ms':>10} {'draw ms':>8} {'total ms':>9} {'fps':>6}  (budget {FRAME_BUDGET * 1000:.1f} ms)")
+    for n in counts:
+        game = Game(persist=False)
+        game.player.shield = float("inf")
+        t_update = t_draw = 0.0
+        live = 0
+        for _ in range(frames):
+            top_up(game, n)
+            game.player.fuel = PLAYER_MAX_FUEL
+            live += entity_count(game)
+            t0 = time.perf_counter()
+            game.step(bot(game), 1.0 / FPS)
+            t1 = time.perf_counter()
+            game.draw(screen)
+            t2 = time.perf_counter()
+            t_update += t1 - t0; t_draw += t2 - t1
+        up, dr = t_update / frames * 1000, t_draw / frames * 1000
+        flag = "" if up + dr <= FRAME_BUDGET * 1000 else "  over budget"
+        print(f"{live // frames:>9} {up:>10.2f} {dr:>8.2f} {up + dr:>9.2f} {1000 / (up + dr):>6.0f}{flag}")
+
+def crowded_game(n):
+    game = Game(persist=False)
+    game.player.shield = float("inf")
+    top_up(game, n)
+    return game
+
+def bench_render_thread(counts=STRESS_SWEEP[:3], seconds=3.0, policy="gunner"):
+    """Frames per second simulated+painted on one thread vs pipelined over two (a lockstep SimThread
+    and this one). Python-side draw code holds the GIL; only SDL's blits and fills give it up, so the
+    pipeline gains what those overlap with simulation, and only with a second core."""
+    bot = BOT_POLICIES[policy]
+    print(f"{os.cpu_count()} cores, {seconds:.0f}s per run, entity count topped up every tick")
+    print(f"{'entities':>9} {'serial fps':>11} {'pipelined fps':>14} {'speedup':>8}")
+    for n in counts:
+        random.seed(0)
+        game = crowded_game(n)
+        done, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            top_up(game, n)
+            game.player.fuel = PLAYER_MAX_FUEL
+            game.step(bot(game), 1.0 / FPS)
+            game.draw(screen)
+            present()
+            done += 1
+        serial = done / (time.perf_counter() - start)
+
+        random.seed(0)
+        game = crowded_game(n)
+        frames = FrameBuffer()
+        sim = SimThread(game, frames, lockstep=True)
+        real_step = game.step
+        def step(mask, dt):  # top up and pick the bot's input on the simulation thread, which owns the game
+            top_up(game, n)
+            game.player.fuel = PLAYER_MAX_FUEL
+            real_step(bot(game), dt)
+        game.step = step
+        painted, seen = 0, 0
+        start = time.perf_counter()
+        sim.start()
+        while time.perf_counter() - start < seconds:
+            seen, frame = frames.take(seen, 0.1)
+            if frame is None: continue
+            render_frame(screen, frame)
+            present()
+            painted += 1
+        sim.stop()
+        piped = painted / (time.perf_counter() - start)
+        print(f"{n:>9} {serial:>11.1f} {piped:>14.1f} {piped / serial:>7.2f}x")
+
+def bench_aliens(counts=ALIEN_BENCH, frames=90, level=10):
+    """Per-frame cost of moving N live aliens among a screenful of asteroids: steer_aliens plus
+    Alien.update, against the numpy-less path (Alien.dodge plus Alien.update) that only hops Darts."""
+    if np is None:
+        print("alien steering needs numpy, which isn't installed"); return
+    print(f"{'aliens':>7} {'steer ms':>9} {'move ms':>8} {'total ms':>9} {'no-numpy ms':>12}  (budget {FRAME_BUDGET * 1000:.1f} ms)")
+    for n in counts:
+        random.seed(0)
+        game = crowded_game(60)
+        game.aliens = [Alien(i % len(ALIENS), random.uniform(-20, HEIGHT)) for i in range(n)]
+        players, scroll, dt = game.players, 2.0, 1.0 / FPS
+        t_steer = t_move = t_plain = 0.0
+        for f in range(frames):
+            t0 = time.perf_counter()
+            steer_aliens(game.aliens, game.asteroids, players, level, dt)
+            t1 = time.perf_counter()
+            for al in game.aliens:
+                al.update(scroll, dt)
+                if al.y > HEIGHT: al.y -= HEIGHT + 40  # keep all n on screen
+            t2 = time.perf_counter()
+            for al in game.aliens:
+                al.dodge(min(players, key=lambda p: abs(p.x - al.x)).x, f * dt)
+                al.update(0.0, 0.0)
+            t3 = time.perf_counter()
+            t_steer += t1 - t0; t_move += t2 - t1; t_plain += t3 - t2
+        st, mv, pl = t_steer / frames * 1000, t_move / frames * 1000, t_plain / frames * 1000
+        print(f"{n:>7} {st:>9.2f} {mv:>8.2f} {st + mv:>9.2f} {pl:>12.2f}")
+
+def bench_hell(counts=HELL_BENCH, frames=90, policy="dodger"):
+    """Whole-frame update and draw time of a bullet-hell game held at N live pattern bullets."""
+    global DIFFICULTY
+    if np is None:
+        print("the bullet-hell tier needs numpy, which isn't installed"); return
+    DIFFICULTY, saved = "hell", DIFFICULTY
+    bot = BOT_POLICIES[policy]
+    print(f"{'bullets':>8} {'update ms':>10} {'draw ms':>8} {'total ms':>9} {'fps':>6}  (budget {FRAME_BUDGET * 1000:.1f} ms)")
+    for n in counts:
+        random.seed(0)
+        game = crowded_game(100)
+        field = game.pattern_bullets
+        t_update = t_draw = 0.0
+        live = 0
+        for _ in range(frames):
+            while field.n < n:  # extra volleys from random points on top of what the aliens fire
+                field.volley(random.uniform(0, WIDTH), random.uniform(0, HEIGHT / 2), random.choice(list(PATTERNS.values())),
+                             0.5, (0, 1), game.frame_seconds)
+            game.player.fuel = PLAYER_MAX_FUEL
+            live += field.n
+            t0 = time.perf_counter()
+            game.step(bot(game), 1.0 / FPS)
+            t1 = time.perf_counter()
+            game.draw(screen)
+            t2 = time.perf_counter()
+            t_update += t1 - t0; t_draw += t2 - t1
+        up, dr = t_update / frames * 1000, t_draw / frames * 1000
+        flag = "" if up + dr <= FRAME_BUDGET * 1000 else "  over budget"
+        print(f"{live // frames:>8} {up:>10.2f} {dr:>8.2f} {up + dr:>9.2f} {1000 / (up + dr):>6.0f}{flag}")
+    DIFFICULTY = saved
+
+def bench_gc(seconds=20.0, entities=150, policy="gunner"):
+    """A rendered bot game paced at FPS, once with CPython's own GC triggers and once with GcScheduler.
+    Frame work is update+draw; a spike is a frame over budget. Paced, so each run takes `seconds`."""
+    bot = BOT_POLICIES[policy]
+    print(f"{seconds:.0f}s per policy at {entities} entities, budget {FRAME_BUDGET * 1000:.1f} ms")
+    print(f"{'policy':>10} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'spikes':>7} {'gc in frame':>12} {'pauses':>7}")
+    for schedule in (False, True):
+        random.seed(0)
+        game = crowded_game(entities)
+        collector = GcScheduler(schedule=schedule)
+        if schedule: collector.settle()
+        collector.pauses = ([], [], [])
+        collector.play()
+        frames, in_frame = [], 0
+        end = time.perf_counter() + seconds
+        deadline = time.perf_counter()
+        while deadline < end:
+            top_up(game, entities)
+            game.player.fuel = PLAYER_MAX_FUEL
+            started = time.perf_counter()
+            game.step(bot(game), 1.0 / FPS)
+            game.draw(screen)
+            work = time.perf_counter() - started
+            frames.append(work * 1000)
+            in_frame += collector.frame_pause > 0
+            deadline = started + 1.0 / FPS
+            collector.frame(work, deadline)
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+        pauses = sum(map(len, collector.pauses))
+        collector.menu(); collector.close()
+        q = quantiles(frames, (0.5, 0.99))
+        spikes = sum(f > FRAME_BUDGET * 1000 for f in frames)
+        print(f"{'frame' if schedule else 'cpython':>10} {q['p50']:>7.2f} {q['p99']:>7.2f} {max(frames):>7.2f} {spikes:>7} {in_frame:>12} {pauses:>7}")
+
+# ---------- Golden frames ----------
+def golden_game(seed, seconds, difficulty="normal", stress=None, policy="gunner"):
+    """A bot game stepped at 1/FPS from a seed, with the particle generator seeded too, so the same
+    arguments give the same picture on every machine. DIFFICULTY and STRESS are put back however the
+    run ends."""
+    global DIFFICULTY
+    DIFFICULTY, saved = difficulty, DIFFICULTY
+    held = dict(STRESS)
+    STRESS.update(stress or {})
+    try:
+        random.seed(seed)
+        game = Game(persist=False)
+        if game.particles.on: game.particles.rng = np.random.default_rng(seed)
+        bot = BOT_POLICIES[policy]
+        for _ in range(int(seconds * FPS)):
+            if game.game_over: break
+            game.step(bot(game), 1.0 / FPS)
+    finally:
+        DIFFICULTY = saved
+        STRESS.update(held)
+    return game
+
+def golden_scenarios():
+    """(name, golden, paint) per scenario; paint(surf) draws one frame and None means skipped. Game
+    states are built on first paint and kept. frozen paints mid through the --render-thread path, so
+    it is held to mid's golden."""
+    cache = {}
+    def once(key, make):
+        if key not in cache: cache[key] = make()
+        return cache[key]
+    start = lambda: once("start", lambda: golden_game(1, 1.0))
+    mid = lambda: once("mid", lambda: golden_game(2, 25.0))
+    def low_quality(surf):
+        QUALITY.update(QUALITY_STEPS)
+        mid().draw(surf)
+    return [
+        ("menu", "menu", lambda surf: draw_main_menu(surf, main_buttons())),
+        ("instructions", "instructions", lambda surf: draw_instructions(surf, instructions_buttons())),
+        ("pause", "pause", lambda surf: draw_pause_menu(surf, pause_buttons())),
+        ("settings", "settings", lambda surf: draw_settings_menu(surf, settings_buttons())),
+        ("game_over", "game_over", lambda surf: draw_game_over(surf, 4321, 9876)),
+        ("start", "start", lambda surf: start().draw(surf)),
+        ("mid", "mid", lambda surf: mid().draw(surf)),
+        ("frozen", "mid", lambda surf: render_frame(surf, once("frozen", lambda: mid().draw_list()))),
+        ("low_quality", "low_quality", low_quality),
+        ("hell", "hell", None if np is None else lambda surf: once("hell", lambda: golden_game(3, 8.0, "hell", {"aliens": 8.0})).draw(surf)),
+    ]
+
+def golden_setup():
+    """What the pictures depend on besides the code; goldens made under another setup won't match."""
+    return {"pygame": pygame.version.ver, "numpy": np is not None, "font": os.path.basename(font_file()) or "default",
+            "assets": sorted(k for d in (ASSETS, ASSETS["planets"], ASSETS["powerups"], ALIEN_IMAGES, ASTEROID_IMAGES)
+                             for k, v in d.items() if isinstance(v, pygame.Surface))}
+
+def frame_off(frame, golden):
+    """Share of frame's pixels that are off from golden, and a mask of them (None without numpy). A
+    pixel is off when some channel in one image is more than GOLDEN_PIXEL_TOL outside the range the
+    other image has over that pixel's 3x3 neighbourhood, checked both ways: an edge or a glyph moved by
+    a pixel passes, one that appears, vanishes or changes colour doesn't. Without numpy only an exact
+    match passes."""
+    if frame.get_size() != golden.get_size(): return 1.0, None
+    if np is None:
+        return (0.0 if pygame.image.tobytes(frame, "RGB") == pygame.image.tobytes(golden, "RGB") else 1.0), None
+    a = pygame.surfarray.array3d(frame).astype(np.int16)
+    g = pygame.surfarray.array3d(golden).astype(np.int16)
+    off = outside_neighbourhood(a, g) | outside_neighbourhood(g, a)
+    return float(off.mean()), off
+
+def outside_neighbourhood(a, b):
+    w, h = a.shape[:2]
+    b = np.pad(b, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    around = [b[dx:dx + w, dy:dy + h] for dx in range(3) for dy in range(3)]
+    return ((a < np.minimum.reduce(around) - GOLDEN_PIXEL_TOL) | (a > np.maximum.reduce(around) + GOLDEN_PIXEL_TOL)).any(axis=2)
+
+def golden_check(directory, update=False, frames=GOLDEN_FRAMES):
+    """Paint every scenario and hold it to directory/<golden>.png, then time `frames` more paints of it.
+    A missing golden is a failure; update (re)writes all of them instead. A failure also writes
+    <name>.diff.png with the off pixels in red. Returns the number of failures."""
+    if update: os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, "golden.json")
+    setup = golden_setup()
+    try:
+        with open(manifest) as f:
+            made = json.load(f)
+    except (OSError, ValueError):
+        made = None
+    if update:
+        with open(manifest, "w") as f:
+            json.dump(setup, f, indent=1)
+    elif made is None:
+        log.warning("no golden.json in %s; run with --golden-update to make the goldens", directory)
+    elif made != setup:
+        log.warning("goldens in %s were made with %s; this is %s, so expect failures", directory, made, setup)
+    defaults = dict(QUALITY)
+    failures = 0
+    print(f"{'scenario':<14} {'result':<10} {'off %':>7} {'paint ms':>9} {'fps':>7}")
+    try:
+        for name, golden, paint in golden_scenarios():
+            if paint is None:
+                print(f"{name:<14} {'skipped':<10} (needs numpy)"); continue
+            QUALITY.update(defaults)
+            paint(screen)
+            path = os.path.join(directory, golden + ".png")
+            off = ""
+            if update and golden == name:
+                pygame.image.save(screen, path)
+                result = "written"
+            elif not os.path.exists(path):
+                result = "missing"; failures += 1
+            else:
+                share, mask = frame_off(screen, pygame.image.load(path))
+                off = f"{share * 100:.3f}"
+                result = "ok" if share <= GOLDEN_MAX_OFF else "FAIL"
+                if result == "FAIL":
+                    failures += 1
+                    if mask is not None:
+                        diff = pygame.surfarray.array3d(screen) // 3
+                        diff[mask] = (255, 0, 0)
+                        pygame.image.save(pygame.surfarray.make_surface(diff), os.path.join(directory, name + ".diff.png"))
+            if not frames:
+                print(f"{name:<14} {result:<10} {off:>7}"); continue
+            t0 = time.perf_counter()
+            for _ in range(frames): paint(screen)
+            ms = (time.perf_counter() - t0) / frames * 1000
+            print(f"{name:<14} {result:<10} {off:>7} {ms:>9.2f} {1000 / ms:>7.0f}")
+    finally:
+        QUALITY.update(defaults)
+    return failures
+
+# ---------- Batch simulation ----------
+# Grid file: {"grid": {"ALIEN_BASE_CHANCE": [0.15, 0.25], "ALIEN_TYPES": [{}, {"Dart": {"speed": 9}}]},
+#             "policies": ["gunner", "collector"], "runs": 200, "max_seconds": 900, "seed": 1}
+# Every grid cell x policy is played `runs` times with seeds seed..seed+runs-1, so cells share their
+# random streams and differences between them come from the parameters, not from luck.
+def grid_cells(grid):
+    keys = sorted(grid)
+    cells = [{}]
+    for k in keys:
+        cells = [dict(c, **{k: v}) for c in cells for v in grid[k]]
+    return cells
+
+def batch_init(stress, difficulty):
+    """Pool initializer. Spawned workers (the default on Windows) re-import this module with default
+    globals, so --stress and --difficulty have to be handed over rather than inherited."""
+    global DIFFICULTY
+    STRESS.update(stress)
+    DIFFICULTY = difficulty
+
+def batch_run(task):
+    cell_id, overrides, policy, seed, max_seconds = task
+    apply_tuning(overrides)
+    g = run_headless(max_seconds, policy, seed)
+    return cell_id, policy, g.frame_seconds, g.level, g.death_cause or "timeout", g.score
+
+def quantiles(values, qs=(0.1, 0.25, 0.5, 0.75, 0.9)):
+    values = sorted(values)
+    return {f"p{int(q * 100)}": values[min(len(values) - 1, int(q * len(values)))] for q in qs}
+
+def summarize(runs):
+    times = [r[2] for r in runs]; levels = [r[3] for r in runs]; scores = [r[5] for r in runs]
+    causes = {}
+    for r in runs: causes[r[4]] = causes.get(r[4], 0) + 1
+    return {
+        "runs": len(runs),
+        "survival_s": dict(mean=sum(times) / len(times), **quantiles(times)),
+        "level": dict(mean=sum(levels) / len(levels), max=max(levels), **quantiles(levels)),
+        "death_cause": causes,
+        "score": dict(mean=sum(scores) / len(scores), max=max(scores), **quantiles(scores)),
+    }
+
+def batch_simulate(grid_path, out_path, workers=None, difficulty="normal"):
+    import multiprocessing
+    with open(grid_path) as f:
+        spec = json.load(f)
+    cells = grid_cells(spec.get("grid", {}))
+    policies = spec.get("policies", ["gunner"])
+    runs, max_seconds, seed = spec.get("runs", 100), spec.get("max_seconds", 900), spec.get("seed", 1)
+    for c in cells: apply_tuning(c)  # fail on a bad key here, not in every worker
+    apply_tuning({})
+    tasks = [(i, c, p, seed + r, max_seconds) for i, c in enumerate(cells) for p in policies for r in range(runs)]
+    results = {}
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=batch_init, initargs=(dict(STRESS), difficulty)) as pool:
+        for n, res in enumerate(pool.imap_unordered(batch_run, tasks, chunksize=max(1, len(tasks) // (64 * (workers or os.cpu_count() or 1)))), 1):
+            results.setdefault((res[0], res[1]), []).append(res)
+            if n % 100 == 0 or n == len(tasks):
+                log.info("batch %d/%d games (%.0fs)", n, len(tasks), time.perf_counter() - start)
+    out = {
+        "spec": spec,
+        "stress": STRESS,
+        "difficulty": difficulty,
+        "elapsed_s": time.perf_counter() - start,
+        "cells": [dict(params=cells[i], policy=p, **summarize(results[(i, p)])) for i in range(len(cells)) for p in policies],
+    }
+    with open(out_path, "w") as f:
+        json.dump(out, f, indent=1)
+    for c in out["cells"]:
+        print(f"{c['policy']:<10} {json.dumps(c['params'])[:60]:<60} survival {c['survival_s']['p50']:7.1f}s  "
+              f"level {c['level']['p50']:3}  score {c['score']['p50']:7}  deaths {c['death_cause']}")
+
+def parse_stress(spec):
+    """'4' scales everything; 'asteroids=4,aliens=10,fire_rate=2' sets individual multipliers. Every
+    multiplier has to be a finite number above zero (fire_rate divides the firing intervals)."""
+    try:
+        if "=" not in spec:
+            out = dict.fromkeys(STRESS, float(spec))
+        else:
+            out = {}
+            for part in spec.split(","):
+                k, v = part.split("=")
+                if k.strip() not in STRESS: raise ValueError(k)
+                out[k.strip()] = float(v)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad stress spec {spec!r} (keys: {', '.join(STRESS)})")
+    bad = [k for k, m in out.items() if not 0 < m < math.inf]
+    if bad:
+        raise argparse.ArgumentTypeError(f"bad stress spec {spec!r}: {', '.join(bad)} must be finite and above zero")
+    return out
+
 # ---------- Main loop ----------
-def game_loop(game):
+def game_loop(game, recorder=None, governor=None, tuning=None, latency=None, pacer=None, warp=None, collector=None, capture=None):
+    """With a pacer (--late-input) the loop sleeps first and reads the keyboard after draining the queue,
+    just before update. Without one it keeps the classic order, where get_pressed() still sees the state
+    from the previous frame's pump. Each frame's time goes through warp (time scale and sub-steps), and
+    collector (a GcScheduler) gets the slack after each present."""
+    warp = warp or TimeWarp()
+    if collector: collector.play()
     holding = False
-    last = pygame.time.get_ticks()
+    pending_switch = 0
+    last = ticks_ms()
+    pumped = time.perf_counter()
     while True:
-        now = pygame.time.get_ticks()
-        dt = (now - last) / 1000.0
+        now = ticks_ms()
+        dt_ms = now - last
         last = now
-        clock.tick(FPS)
-        keys = pygame.key.get_pressed()
-
-        for ev in pygame.event.get():
+        if pacer: pacer.wait()
+        else: clock.tick(FPS)
+        started = time.perf_counter()
+        if tuning: tuning.update(dt_ms / 1000.0)
+        keys = None if pacer else pygame.key.get_pressed()
+        keys_at = pumped
+        switch = 0
+        key_event = menu = False
+
+        for ev in get_events():
             if ev.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             elif ev.type == pygame.KEYDOWN:
                 if ev.key == pygame.K_SPACE: holding = True
                 elif ev.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4):
-                    game.player.switch_weapon_direct(ev.key - pygame.K_1)
-                elif ev.key == pygame.K_q: game.player.switch_weapon(-1)
-                elif ev.key == pygame.K_e: game.player.switch_weapon(1)
+                    switch = ev.key - pygame.K_1 + 1
+                elif ev.key == pygame.K_q: switch = SWITCH_PREV
+                elif ev.key == pygame.K_e: switch = SWITCH_NEXT
+                elif ev.key == pygame.K_LEFTBRACKET: warp.change(-1)
+                elif ev.key == pygame.K_RIGHTBRACKET: warp.change(1)
+                elif ev.key == pygame.K_BACKSLASH: warp.change(0)
                 elif ev.key in (pygame.K_p, pygame.K_ESCAPE):
                     game.paused = True
+                    if collector: collector.menu()
                     pause_menu()
+                    if collector: collector.play()
                     game.paused = False
+                    menu = True
+                    last = ticks_ms()  # time spent in the menu isn't game time
                 elif ev.key == pygame.K_r and game.game_over:
                     return True
+                key_event = True
             elif ev.type == pygame.KEYUP:
                 if ev.key == pygame.K_SPACE: holding = False
-
+                key_event = True
+        prev_pump, pumped = pumped, time.perf_counter()
+        if keys is None:
+            keys, keys_at = pygame.key.get_pressed(), pumped
+
+        t0 = time.perf_counter()
+        steps = []
+        pending_switch = switch or pending_switch
         if not game.paused and not game.game_over:
-            game.update(keys, dt, holding)
-
+            steps = warp.steps(dt_ms)
+            for step_ms in steps:
+                mask = encode_input(keys, holding, pending_switch)
+                pending_switch = 0  # a weapon switch happens on one step, not on every sub-step
+                if recorder: recorder.record(game, mask, step_ms)
+                game.step(mask, step_ms / 1000.0)
+                if game.game_over: break
+        t1 = time.perf_counter()
         game.draw(screen)
-        pygame.display.flip()
+        warp.draw(screen)
+        t2 = time.perf_counter()
+        present()
+        presented = time.perf_counter()
+        if capture: capture.frame(screen)
+        warp.observe(t1 - t0, len(steps), t2 - t1)
+        if governor: governor.observe((t1 - t0) / max(1, len(steps)), t2 - t1)
+        if pacer: pacer.presented(pumped, presented)
+        if latency and not menu: latency.frame(keys_at, prev_pump, pumped, key_event, presented)
+        if game.telemetry and not menu: game.telemetry.frame(game, presented - started)
+        if collector and not menu:
+            collector.frame(presented - started, pacer.deadline - pacer.work - LATE_INPUT_MARGIN if pacer else started + 1.0 / FPS)
 
         if game.game_over:
+            if collector: collector.menu()
             again = game_over_screen(game.score, game.high_score)
             return bool(again)
 
+def game_loop_threaded(game, recorder=None, governor=None, tuning=None, capture=None):
+    """game_loop for --render-thread: the simulation runs in a SimThread, this thread handles events and paints."""
+    frames = FrameBuffer()
+    sim = SimThread(game, frames, recorder, tuning)
+    sim.start()
+    holding = False
+    seen = 0
+    try:
+        while True:
+            for ev in get_events():
+                if ev.type == pygame.QUIT:
+                    sim.stop(); pygame.quit(); sys.exit()
+                elif ev.type == pygame.KEYDOWN:
+                    if ev.key == pygame.K_SPACE: holding = True
+                    elif ev.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4):
+                        sim.switches.append(ev.key - pygame.K_1 + 1)
+                    elif ev.key == pygame.K_q: sim.switches.append(SWITCH_PREV)
+                    elif ev.key == pygame.K_e: sim.switches.append(SWITCH_NEXT)
+                    elif ev.key in (pygame.K_p, pygame.K_ESCAPE):
+                        game.paused = True
+                        pause_menu()
+                        game.paused = False
+                elif ev.type == pygame.KEYUP:
+                    if ev.key == pygame.K_SPACE: holding = False
+            sim.mask = encode_input(pygame.key.get_pressed(), holding)
+
+            seen, frame = frames.take(seen, 1.0 / FPS)
+            if frame is not None:
+                t0 = time.perf_counter()
+                render_frame(screen, frame)
+                present()
+                if capture: capture.frame(screen)
+                if governor: governor.observe(frame.update_s, time.perf_counter() - t0)
+
+            if game.game_over:
+                sim.join()
+                return bool(game_over_screen(game.score, game.high_score))
+    finally:
+        sim.stop()
+
+def parse_size(text):
+    try:
+        w, h = map(int, text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    return w, h
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Cosmic Adventure: The Journey of Star")
+    ap.add_argument("--record", metavar="PATH", help="record each run to its own replay file, PATH numbered: run.ocr -> run-001.ocr, run-002.ocr, ...")
+    ap.add_argument("--replay", metavar="PATH", help="open a replay in the viewer instead of playing")
+    ap.add_argument("--tuning", metavar="JSON", help="override config tables from a JSON file, reloaded when it changes")
+    ap.add_argument("--bench-collisions", action="store_true", help="time collisions with and without the pixel/circle narrow phase, then exit")
+    ap.add_argument("--bench-particles", action="store_true", help="time particle update+draw at %s live particles, then exit" % "/".join(map(str, PARTICLE_BENCH)))
+    ap.add_argument("--bench-hell", action="store_true", help="time a bullet-hell frame at %s live pattern bullets, then exit" % "/".join(map(str, HELL_BENCH)))
+    ap.add_argument("--bench-aliens", action="store_true", help="time alien steering at %s live aliens, then exit" % "/".join(map(str, ALIEN_BENCH)))
+    ap.add_argument("--bench-memory", action="store_true", help="print memory per entity and at 1k/10k/100k live entities, then exit")
+    ap.add_argument("--difficulty", choices=("normal", "hell"), default="normal", help="'hell': aliens fire their bullet patterns (needs numpy)")
+    ap.add_argument("--stress", type=parse_stress, metavar="SPEC", help="spawn/fire multipliers: '4' or 'asteroids=4,aliens=10,powerups=2,fire_rate=3'")
+    ap.add_argument("--headless", type=float, metavar="SECONDS", help="play one bot game without a window and print the result")
+    ap.add_argument("--sweep", action="store_true", help="time update/draw at %s live entities, then exit" % "/".join(map(str, STRESS_SWEEP)))
+    ap.add_argument("--batch", metavar="GRID", help="play a parameter grid of headless bot games on all cores, then exit")
+    ap.add_argument("--batch-out", metavar="PATH", default="batch_results.json", help="where --batch writes its results")
+    ap.add_argument("--workers", type=int, help="worker processes for --batch (default: all cores)")
+    ap.add_argument("--serve", nargs="?", const=NET_PORT, type=int, metavar="PORT", help="run a co-op server (no window)")
+    ap.add_argument("--connect", metavar="HOST[:PORT]", help="join a co-op server")
+    ap.add_argument("--netbench", type=float, metavar="SECONDS", help="localhost server + bot clients, print bandwidth and latency, then exit")
+    ap.add_argument("--clients", type=int, default=2, help="bot clients for --netbench")
+    ap.add_argument("--render-thread", action="store_true", help="simulate on a second thread and paint on this one from published draw lists")
+    ap.add_argument("--bench-render-thread", action="store_true", help="compare serial and threaded simulate+paint throughput at several entity counts, then exit")
+    ap.add_argument("--time-scale", type=float, default=1.0, metavar="X", help="start at this simulation speed (0.25 to 16; [ and ] change it in game)")
+    ap.add_argument("--late-input", action="store_true", help="sleep first and sample input just before update, timed to finish at the frame deadline")
+    ap.add_argument("--latency", nargs="?", const="", metavar="CSV", help="log input-to-present latency every few seconds; with a path, also write one row per frame")
+    ap.add_argument("--window", type=parse_size, metavar="WxH", help="window size; the game is drawn at %dx%d and scaled to fit" % (WIDTH, HEIGHT))
+    ap.add_argument("--fullscreen", action="store_true", help="fill the screen, scaled and letterboxed")
+    ap.add_argument("--capture", metavar="PATH", help="capture every presented frame: PNGs into directory PATH, or raw RGB24 video if PATH ends in .rgb; with --replay, renders the replay offline")
+    ap.add_argument("--telemetry", metavar="PATH", help="append structured events from every run to PATH as JSON lines")
+    ap.add_argument("--gc-auto", action="store_true", help="leave garbage collection to CPython's allocation counters instead of frame slack and menus")
+    ap.add_argument("--gc-stats", action="store_true", help="log GC pauses every few seconds and how many slow frames had one")
+    ap.add_argument("--bench-gc", action="store_true", help="play a paced, rendered bot game under each GC policy and compare frame-time spikes, then exit")
+    ap.add_argument("--bench-startup", nargs="?", const=5, type=int, metavar="RUNS", help="time launch to first menu frame, cold (no font cache) and warm, then exit")
+    ap.add_argument("--first-frame", action="store_true", help=argparse.SUPPRESS)  # used by --bench-startup
+    ap.add_argument("--golden", metavar="DIR", help="paint menus and seeded game states, compare them to the PNGs in DIR and time the painting, then exit (status 1 on a mismatch)")
+    ap.add_argument("--golden-update", action="store_true", help="with --golden, rewrite every golden image instead of comparing")
+    ap.add_argument("--fixed-quality", action="store_true", help="disable the adaptive quality governor")
+    return ap.parse_args(argv)
+
 def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    if args.bench_memory:
+        bench_memory(); return
+    if args.bench_startup:
+        bench_startup(args.bench_startup); return
+    if args.bench_collisions:
+        setup_display(headless=True)  # sprite masks come from the loaded images
+        bench_collisions(); return
+    if args.bench_particles:
+        setup_display(headless=True)
+        bench_particles(); return
+    if args.bench_hell:
+        setup_display(headless=True)
+        bench_hell(); return
+    if args.bench_aliens:
+        setup_display(headless=True)  # alien sizes come from the loaded images
+        bench_aliens(); return
+    if args.stress:
+        STRESS.update(args.stress)
+    if args.batch:
+        batch_simulate(args.batch, args.batch_out, args.workers, args.difficulty); return
+    if args.serve:
+        net_serve(("0.0.0.0", args.serve)); return
+    if args.netbench:
+        net_bench(args.netbench, args.clients); return
+    global DIFFICULTY
+    DIFFICULTY = args.difficulty  # after --serve: co-op doesn't send pattern bullets to clients
+    if DIFFICULTY == "hell" and np is None:
+        log.warning("--difficulty hell needs numpy; playing normal")
     os.environ['SDL_VIDEO_CENTERED'] = '1'
-    pygame.init(); pygame.font.init()
-    global screen, clock, font, big_font, small_font
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Cosmic Adventure: The Journey of Star")
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("consolas", 22)
-    big_font = pygame.font.SysFont("consolas", 48)
-    small_font = pygame.font.SysFont("consolas", 16)
-
-    load_assets()
-
+    headless = args.headless is not None or args.sweep or bool(args.golden) or args.bench_render_thread or args.bench_gc or bool(args.replay and args.capture)
+    setup_display(headless=headless, window=None if headless else args.window, fullscreen=args.fullscreen and not headless,
+                  defer_assets=not (headless or args.replay or args.connect))  # only the menu needs drawing right away
+    if args.first_frame:
+        main_menu(first_frame=True); pygame.quit(); return
+
+    if args.golden:
+        sys.exit(1 if golden_check(args.golden, args.golden_update) else 0)
+    if args.sweep:
+        stress_sweep(); return
+    if args.bench_gc:
+        bench_gc(); return
+    if args.bench_render_thread:
+        bench_render_thread(); return
+    if args.headless is not None:
+        g = run_headless(args.headless)
+        print(f"score {g.score}  level {g.level}  time {g.frame_seconds:.1f}s  died of {g.death_cause or '-'}")
+        return
+
+    if args.replay and args.capture:
+        capture_replay(args.replay, args.capture); return
+    if args.replay:
+        replay_viewer(args.replay)
+        pygame.quit(); return
+    if args.connect:
+        host, _, port = args.connect.partition(":")
+        net_client_loop((socket.gethostbyname(host), int(port or NET_PORT)))
+        pygame.quit(); return
+
+    governor = None if args.fixed_quality else QualityGovernor()
+    tuning = TuningWatcher(args.tuning) if args.tuning else None
+    latency = LatencyMeter(args.latency or None) if args.latency is not None else None
+    warp = TimeWarp(clamp(args.time_scale, TIME_SCALES[0], TIME_SCALES[-1]))
+    collector = GcScheduler(schedule=not args.gc_auto, stats=args.gc_stats)
+    telemetry = Telemetry(args.telemetry) if args.telemetry else None
+    capture = Capture(args.capture, screen) if args.capture else None
+    if capture: atexit.register(capture.close)
+    collector.settle()  # assets and compiled config live for the whole process
     while True:
         if main_menu():
+            load_pending_assets()
             g = Game()
-            game_loop(g)
-        pygame.display.flip()
+            if telemetry: telemetry.begin(g)
+            collector.settle()
+            recorder = ReplayWriter(run_path(args.record)) if args.record else None
+            try:
+                if args.render_thread:
+                    game_loop_threaded(g, recorder, governor, tuning, capture)
+                else:
+                    game_loop(g, recorder, governor, tuning, latency, LatePacer() if args.late_input else None, warp, collector, capture)
+            finally:
+                if recorder: recorder.close()
+                if latency: latency.report()
+                collector.menu()
+                if args.gc_stats: collector.report()
+        present()
         clock.tick(FPS)
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orbitalclash as oc  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def display():
+    oc.setup_display(headless=True)
+    yield
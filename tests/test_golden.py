@@ -0,0 +1,29 @@
+"""The golden check under the dummy driver: every scenario must match its committed image in tests/golden."""
+import json
+import os
+
+import pytest
+
+import orbitalclash as oc
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def test_goldens_match():
+    with open(os.path.join(GOLDEN, "golden.json")) as f:
+        made = json.load(f)
+    # The art ships with the repo and loads from next to the script; only the font is up to the machine.
+    font = oc.golden_setup()["font"]
+    if made["font"] != font:
+        pytest.skip(f"goldens were drawn with font {made['font']!r}, this machine has {font!r}")
+    assert oc.golden_check(GOLDEN, frames=0) == 0
+
+
+def test_golden_game_restores_globals_when_the_bot_fails(monkeypatch):
+    def boom(game):
+        raise RuntimeError("bot failed")
+    monkeypatch.setitem(oc.BOT_POLICIES, "boom", boom)
+    difficulty, stress = oc.DIFFICULTY, dict(oc.STRESS)
+    with pytest.raises(RuntimeError):
+        oc.golden_game(3, 1.0, "hell", {"aliens": 8.0}, policy="boom")
+    assert oc.DIFFICULTY == difficulty and oc.STRESS == stress
@@ -0,0 +1,58 @@
+"""Replay keyframes come from files other people send, so loading one may only build the game's own state."""
+import os
+import pickle
+import random
+import zlib
+
+import pytest
+
+import orbitalclash as oc
+
+
+class Shell:
+    def __reduce__(self):
+        return os.system, ("true",)
+
+
+def test_snapshot_round_trips_pending_timers():
+    g = oc.Game(persist=False)
+    minigun = g.player.weapons[0]
+    minigun.ammo, minigun.reloading = 0, True
+    g.timers.after(0.5, minigun.reloaded)
+    back = oc.Game.from_snapshot(g.snapshot())
+    (_, _, fn, args), = back.timers.heap
+    assert fn.__self__ is back.player.weapons[0] and fn.__name__ == "reloaded" and args == ()
+    back.timers.advance(1.0)
+    assert back.player.weapons[0].ammo == minigun.magazine and not back.player.weapons[0].reloading
+
+
+def test_snapshot_refuses_foreign_callables():
+    blob = zlib.compress(pickle.dumps((random.getstate(), Shell())))
+    with pytest.raises(pickle.UnpicklingError):
+        oc.Game.from_snapshot(blob)
+
+
+def test_snapshot_refuses_private_timer_callbacks():
+    g = oc.Game(persist=False)
+    g.timers.after(0.5, g.player.__init__, g)
+    with pytest.raises(pickle.UnpicklingError):
+        oc.Game.from_snapshot(g.snapshot())
+
+
+def record(path, frames=10):
+    random.seed(1)
+    g = oc.Game(persist=False)
+    w = oc.ReplayWriter(str(path))
+    for _ in range(frames):
+        w.record(g, oc.INPUT_SHOOT, 22)
+        g.step(oc.INPUT_SHOOT, 0.022)
+    w.close()
+
+
+def test_replay_refuses_the_other_numpy_setup(tmp_path, monkeypatch):
+    path = tmp_path / "run.ocr"
+    record(path)
+    oc.ReplayReader(str(path)).close()
+    monkeypatch.setattr(oc, "np", None if oc.np is not None else object())
+    with pytest.raises(ValueError, match="numpy"):
+        oc.ReplayReader(str(path))
@@ -0,0 +1,33 @@
+"""Alien steering pushes: spacing between neighbours and clearance from asteroids."""
+import pytest
+
+import orbitalclash as oc
+
+np = pytest.importorskip("numpy")
+
+
+def test_band_pairs_are_neighbours_along_x():
+    x = np.array([0.0, 300.0, 100.0, 200.0, 50.0])
+    y = np.array([10.0, 12.0, 11.0, 9.0, 500.0])  # the last one is in a band of its own
+    i, j = oc.band_pairs(x, y, 60.0)
+    assert sorted(zip(i.tolist(), j.tolist())) == [(0, 2), (1, 3), (2, 3)]
+
+
+def test_spacing_pushes_close_aliens_apart_equally():
+    x, y, half = np.array([100.0, 130.0, 400.0]), np.array([50.0, 55.0, 50.0]), np.array([20.0, 20.0, 20.0])
+    push = oc.spacing_push(x, y, half)
+    assert push[0] < 0 < push[1] and push[0] == -push[1] and push[2] == 0
+
+
+def test_spacing_scales_to_a_packed_swarm():
+    rng = np.random.default_rng(0)
+    n = 2000
+    x, y = rng.uniform(0, oc.WIDTH, n), rng.uniform(0, oc.HEIGHT, n)
+    i, j = oc.band_pairs(x, y, 2 * 48.0 + oc.SWARM_AVOID_GAP)
+    assert len(i) <= 2 * n and (i < j).all()
+
+
+def test_avoid_push_steers_away_from_an_asteroid():
+    x, y, half = np.array([90.0, 110.0, 400.0]), np.array([100.0, 100.0, 100.0]), np.array([20.0, 20.0, 20.0])
+    push = oc.avoid_push(x, y, half, np.array([100.0]), np.array([130.0]), np.array([32.0]))
+    assert push[0] < 0 < push[1] and push[2] == 0
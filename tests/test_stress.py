@@ -0,0 +1,17 @@
+"""--stress specs are checked before they reach the simulation."""
+import argparse
+
+import pytest
+
+import orbitalclash as oc
+
+
+@pytest.mark.parametrize("spec", ["0", "-1", "fire_rate=0", "aliens=-2", "asteroids=nan", "inf", "bogus=2", "x"])
+def test_rejects_bad_multipliers(spec):
+    with pytest.raises(argparse.ArgumentTypeError):
+        oc.parse_stress(spec)
+
+
+def test_accepts_positive_multipliers():
+    assert oc.parse_stress("2") == dict.fromkeys(oc.STRESS, 2.0)
+    assert oc.parse_stress("asteroids=4, aliens=0.5") == {"asteroids": 4.0, "aliens": 0.5}
@@ -0,0 +1,121 @@
+"""Swept collisions at large dt: one step carries each projectile from short of its target to past it,
+so only the sweep in sweep_probes can register the hit."""
+import pytest
+
+import orbitalclash as oc
+
+DTS = (0.1, 0.25, 0.5)
+X, TARGET_Y = 300.0, 300.0
+
+
+@pytest.fixture
+def game():
+    g = oc.Game(persist=False, particles=False)
+    for group in (g.asteroids, g.aliens, g.bullets, g.alien_bullets, g.missiles, g.beams, g.powerups):
+        group.clear()
+    g.dormant = []
+    g.player.invincible = 0.0
+    g.player.shield = 0.0
+    return g
+
+
+def tiny_asteroid():
+    a = oc.Asteroid(0)
+    a.x, a.y = X, TARGET_Y
+    a.rect.center = (int(X), int(TARGET_Y))
+    return a
+
+
+def dart():
+    al = oc.Alien([t.name for t in oc.ALIENS].index("Dart"))
+    al.x, al.y = X, TARGET_Y
+    al.rect.topleft = (int(X - al.w // 2), int(TARGET_Y - al.h // 2))
+    return al
+
+
+def starts(travel, reach, dt, n=9):
+    """Distances ahead of the target to start from, spread over every start from which one step goes
+    from clear of the target (more than reach away) to clear past it. Steps too short to clear it at
+    all start halfway; at the largest dt every projectile here clears its target."""
+    lo, hi = reach + 1, travel - reach - 1
+    if hi <= lo:
+        assert dt < max(DTS), f"a {travel:.0f}px step doesn't clear a {reach}px reach: not a tunnelling case"
+        return [travel / 2]
+    return [lo + (hi - lo) * i / (n - 1) for i in range(n)]
+
+
+def clear_of(rect, target_rect, travel, reach):
+    """Neither end of a step that clears the target touches it, so only the sweep can find the hit."""
+    return travel <= 2 * reach + 2 or not rect.colliderect(target_rect)
+
+
+def player_bullet(y):
+    return oc.Bullet(X, y, -13, 0, 1, "minigun")
+
+
+def missile(y):
+    return oc.Missile(X, y, 100, 150)
+
+
+def travel_up(make, dt):
+    p = make(0.0)
+    p.update(dt)
+    return -p.y
+
+
+@pytest.mark.parametrize("dt", DTS)
+@pytest.mark.parametrize("make_target, group, reach", [
+    (tiny_asteroid, "asteroids", oc.TIERS[0].radius + 8),
+    (dart, "aliens", None),
+])
+def test_bullet_hits_at_large_dt(game, dt, make_target, group, reach):
+    travel = travel_up(player_bullet, dt)
+    reach = reach or make_target().h // 2 + 8
+    for ahead in starts(travel, reach, dt):
+        target = make_target()
+        getattr(game, group)[:] = [target]
+        b = player_bullet(TARGET_Y + ahead)
+        game.bullets[:] = [b]
+        b.update(dt)
+        assert clear_of(b.rect, target.rect, travel, reach)
+        game.handle_collisions(dt)
+        assert target.hp < target.max_hp, f"bullet tunnelled through {group} from {ahead:.0f}px at dt {dt}"
+        assert b not in game.bullets
+
+
+@pytest.mark.parametrize("dt", DTS)
+@pytest.mark.parametrize("make_target, group", [(tiny_asteroid, "asteroids"), (dart, "aliens")])
+def test_missile_hits_at_large_dt(game, dt, make_target, group):
+    travel = travel_up(missile, dt)
+    reach = 16 + make_target().rect.h // 2
+    for ahead in starts(travel, reach, dt):
+        target = make_target()
+        getattr(game, group)[:] = [target]
+        m = missile(TARGET_Y + ahead)
+        game.missiles[:] = [m]
+        m.update(dt)
+        assert clear_of(m.rect, target.rect, travel, reach)
+        game.handle_collisions(dt)
+        assert m.exploded, f"missile tunnelled through {group} from {ahead:.0f}px at dt {dt}"
+        assert abs(m.y - TARGET_Y) <= 16 + make_target().rect.h, "missile went off away from what it hit"
+        assert target not in getattr(game, group)  # 100 damage at the blast centre kills either
+
+
+@pytest.mark.parametrize("dt", DTS)
+def test_alien_bullet_hits_player_at_large_dt(game, dt):
+    p = game.player
+    probe = oc.AlienBullet(p.x, 0.0, 0.5)
+    probe.update(0.0, dt)
+    travel = probe.y
+    reach = p.h // 2 + 16
+    ship = oc.pygame.Rect(int(p.x - p.w // 2), int(p.y - p.h // 2), p.w, p.h)
+    for ahead in starts(travel, reach, dt):
+        p.invincible = 0.0
+        hearts = p.hearts
+        ab = oc.AlienBullet(p.x, p.y - ahead, 0.5)
+        game.alien_bullets[:] = [ab]
+        ab.update(0.0, dt)
+        assert clear_of(ab.rect, ship, travel, reach)
+        game.handle_collisions(dt)
+        assert p.hearts < hearts, f"alien bullet tunnelled through the player from {ahead:.0f}px at dt {dt}"
+        assert ab not in game.alien_bullets
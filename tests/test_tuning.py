@@ -0,0 +1,25 @@
+"""Tuning files may only touch the config tables, and a bad one leaves the running config as it was."""
+import pytest
+
+import orbitalclash as oc
+
+
+@pytest.fixture(autouse=True)
+def defaults():
+    yield
+    oc.apply_tuning({})
+
+
+@pytest.mark.parametrize("name", ["WIDTH", "FPS", "REPLAY_VERSION", "NET_PORT", "TUNING_DEFAULTS", "nope"])
+def test_rejects_names_outside_the_config_tables(name):
+    before = {k: getattr(oc, k, None) for k in ("WIDTH", "FPS", "REPLAY_VERSION", "NET_PORT")}
+    with pytest.raises(ValueError, match="unknown tuning key"):
+        oc.apply_tuning({name: 1})
+    assert {k: getattr(oc, k, None) for k in before} == before
+
+
+def test_applies_and_resets_a_table_entry():
+    oc.apply_tuning({"ALIEN_TYPES": {"Dart": {"speed": 9}}, "ALIEN_BASE_CHANCE": 0.3})
+    assert oc.ALIENS[[t.name for t in oc.ALIENS].index("Dart")].speed == 9.0 and oc.ALIEN_BASE_CHANCE == 0.3
+    oc.apply_tuning({})
+    assert oc.ALIEN_BASE_CHANCE == oc.TUNING_DEFAULTS["ALIEN_BASE_CHANCE"]